@@ -0,0 +1,139 @@
+# apps/orchestrator/approvals.py
+from __future__ import annotations
+import asyncio, logging, time, uuid
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .policy import policy
+from .tools.registry import canonical_tool_name, lookup_tool
+
+logger = logging.getLogger("uvicorn.error")
+
+_CFG: Dict[str, Any] = policy.cfg.get("approvals", {}) or {}
+APPROVAL_TOOLS = [str(t) for t in (_CFG.get("tools") or [])]
+APPROVAL_TIMEOUT_SEC = float(_CFG.get("timeout_sec", 600))
+
+
+class Verdict(NamedTuple):
+    approved: bool
+    args: Dict[str, Any]
+    decision: str           # approved | edited | rejected | timeout | not_required
+    reason: str = ""
+    approval_id: str = ""
+    wait_ms: float = 0.0
+
+
+class RunChannel:
+    """
+    The human side of one run. Calls to tools in `tools` are parked until the
+    client approves (optionally with edited args) or rejects them; other calls,
+    including the rest of a parallel batch, keep running. Hints queue up and are
+    added to the conversation before the planner's next turn. Requests and
+    answers go out as run events through `emit` (the run's event log).
+    """
+    def __init__(self, run_id: str, emit: Callable[[dict], Any], tools: Optional[List[str]] = None,
+                 timeout_sec: float = APPROVAL_TIMEOUT_SEC):
+        self.run_id = run_id
+        self.emit = emit
+        self.tools = {canonical_tool_name(t) for t in (APPROVAL_TOOLS if tools is None else tools)}
+        self.timeout_sec = timeout_sec
+        self.closed = False
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._hints: List[str] = []
+        self.stats = {"requested": 0, "approved": 0, "edited": 0, "rejected": 0, "timeout": 0, "hints": 0}
+
+    def needs_approval(self, tool: str) -> bool:
+        # aliases and fuzzy matches are gated like the tool they resolve to
+        return canonical_tool_name(tool) in self.tools or lookup_tool(tool).name in self.tools
+
+    async def review(self, tool: str, args: Dict[str, Any], remaining_sec: Optional[float] = None) -> Verdict:
+        if self.closed or not self.needs_approval(tool):
+            return Verdict(True, args, "not_required")
+        approval_id = uuid.uuid4().hex[:8]
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[approval_id] = {"future": fut, "tool": tool, "args": args, "since": time.time()}
+        self.stats["requested"] += 1
+        timeout = self.timeout_sec if remaining_sec is None else max(0.0, min(self.timeout_sec, remaining_sec))
+        print(f"Run {self.run_id}: {tool} waits for approval {approval_id}")
+        self.emit({"evt": "approval.request", "id": approval_id, "tool": tool, "args": args, "timeout_sec": timeout})
+        t0 = time.perf_counter()
+        try:
+            answer = await asyncio.wait_for(fut, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"run {self.run_id}: approval {approval_id} for {tool} unanswered after {timeout:g}s")
+            answer = {"type": "timeout", "reason": f"no answer in {timeout:g}s"}
+        finally:
+            self._pending.pop(approval_id, None)
+        wait_ms = round((time.perf_counter() - t0) * 1000, 2)
+        if answer["type"] == "approve":
+            edited = isinstance(answer.get("args"), dict)
+            verdict = Verdict(True, answer["args"] if edited else args, "edited" if edited else "approved",
+                              str(answer.get("reason") or ""), approval_id, wait_ms)
+        else:
+            verdict = Verdict(False, args, "timeout" if answer["type"] == "timeout" else "rejected",
+                              str(answer.get("reason") or ""), approval_id, wait_ms)
+        self.stats[verdict.decision] += 1
+        self.emit({"evt": "approval.resolved", "id": approval_id, "tool": tool, "decision": verdict.decision,
+                   **({"args": verdict.args} if verdict.decision == "edited" else {}),
+                   **({"reason": verdict.reason} if verdict.reason else {}), "wait_ms": wait_ms})
+        return verdict
+
+    def handle(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """One client message: approve / edit / reject a parked call, or add a hint."""
+        kind = msg.get("type")
+        if kind == "hint":
+            text = str(msg.get("text") or "").strip()
+            if not text:
+                return {"ok": False, "error": "empty_hint"}
+            self._hints.append(text)
+            self.stats["hints"] += 1
+            return {"ok": True, "action": "hint", "queued": len(self._hints)}
+        if kind not in ("approve", "edit", "reject"):
+            return {"ok": False, "error": f"unknown_message_type: {kind}"}
+        approval_id = str(msg.get("id") or "")
+        pending = self._pending.get(approval_id)
+        if pending is None or pending["future"].done():
+            return {"ok": False, "error": f"unknown_approval: {approval_id}"}
+        if kind == "edit" and not isinstance(msg.get("args"), dict):
+            return {"ok": False, "error": "edit_needs_args"}
+        answer = {"type": "reject" if kind == "reject" else "approve", "reason": msg.get("reason")}
+        if kind == "edit" or (kind == "approve" and isinstance(msg.get("args"), dict)):
+            answer["args"] = msg["args"]
+        pending["future"].set_result(answer)
+        return {"ok": True, "action": kind, "id": approval_id}
+
+    def take_hints(self) -> List[str]:
+        hints, self._hints = self._hints, []
+        return hints
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [{"id": aid, "tool": p["tool"], "args": p["args"], "since": p["since"]}
+                for aid, p in self._pending.items()]
+
+    def close(self) -> None:
+        """Run over: anything still parked is rejected, later calls are not gated."""
+        self.closed = True
+        for p in list(self._pending.values()):
+            if not p["future"].done():
+                p["future"].set_result({"type": "reject", "reason": "run_ended"})
+
+
+_channels: Dict[str, RunChannel] = {}
+
+
+def open_channel(run_id: str, emit: Callable[[dict], Any], options: Optional[dict] = None) -> RunChannel:
+    opts = options or {}
+    tools = opts.get("approval_tools")
+    channel = RunChannel(run_id, emit, list(tools) if tools is not None else None,
+                         float(opts.get("approval_timeout_sec", APPROVAL_TIMEOUT_SEC)))
+    _channels[run_id] = channel
+    return channel
+
+
+def get_channel(run_id: str) -> Optional[RunChannel]:
+    return _channels.get(run_id)
+
+
+def close_channel(run_id: str) -> None:
+    channel = _channels.pop(run_id, None)
+    if channel is not None:
+        channel.close()
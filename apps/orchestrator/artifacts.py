@@ -0,0 +1,147 @@
+# apps/orchestrator/artifacts.py
+from __future__ import annotations
+import hashlib, json, os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .policy import policy
+
+_CFG: Dict[str, Any] = policy.cfg.get("artifacts", {}) or {}
+ARTIFACT_ROOT = Path(_CFG.get("root", "data/artifacts"))
+INLINE_MAX_BYTES = int(_CFG.get("inline_max_bytes", 4096))
+_PREVIEW_HEAD_LINES = 20
+_PREVIEW_TAIL_LINES = 10
+_PREVIEW_LINE_CHARS = 200
+
+# Fields that hold bulk text vs. bulk structures, by tool output shape
+_TEXT_FIELDS = ("content", "text", "stdout", "stderr", "body")
+_SKIP_TOOLS = {"artifact_read"}
+
+
+class ArtifactStore:
+    """
+    Content-addressed blob store on disk: data/artifacts/<ab>/<sha256>.
+    Identical payloads (across steps and runs) are written once.
+    """
+    def __init__(self, root: Path = ARTIFACT_ROOT):
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: str | bytes) -> str:
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(raw)
+            os.replace(tmp, path)
+        return f"sha256:{digest}"
+
+    def get(self, handle: str) -> Optional[bytes]:
+        digest = handle.split(":", 1)[-1]
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            return None
+        path = self._path(digest)
+        return path.read_bytes() if path.exists() else None
+
+
+store = ArtifactStore()
+
+
+# ---------- previews ----------
+def _clip(line: str) -> str:
+    return line if len(line) <= _PREVIEW_LINE_CHARS else line[:_PREVIEW_LINE_CHARS] + "…"
+
+def _text_preview(text: str) -> Dict[str, Any]:
+    lines = text.splitlines()
+    if len(lines) <= _PREVIEW_HEAD_LINES + _PREVIEW_TAIL_LINES:
+        return {"lines": len(lines), "head": text[:1000]}
+    return {
+        "lines": len(lines),
+        "head": [_clip(l) for l in lines[:_PREVIEW_HEAD_LINES]],
+        "tail": [_clip(l) for l in lines[-_PREVIEW_TAIL_LINES:]],
+    }
+
+def _rows_preview(rows: list) -> Dict[str, Any]:
+    schema = list(rows[0].keys()) if rows and isinstance(rows[0], dict) else None
+    return {"rows": len(rows), "schema": schema, "sample": rows[:3]}
+
+def _list_preview(items: list) -> Dict[str, Any]:
+    return {"items": len(items), "last": items[-5:] if all(isinstance(i, str) for i in items) else None}
+
+def _json_preview(v: Any) -> Dict[str, Any]:
+    if isinstance(v, dict):
+        return {"type": "object", "keys": list(v.keys())[:50], "key_count": len(v)}
+    if isinstance(v, list):
+        return {"type": "array", "items": len(v), "sample": v[:2]}
+    return {"type": type(v).__name__}
+
+def _preview(tool: str, field: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, str):
+        return _text_preview(value)
+    if field == "rows" and isinstance(value, list):
+        return _rows_preview(value)
+    if field in ("logs", "results", "entries") and isinstance(value, list):
+        return _list_preview(value)
+    return _json_preview(value)
+
+
+def reduce_observation(tool: str, obs: Any, inline_max_bytes: int = INLINE_MAX_BYTES) -> Any:
+    """
+    Move oversized top-level fields of a tool observation into the artifact store.
+    Each one is replaced by {"artifact": handle, "bytes": n, "preview": {...}} so the
+    model, the step list and the event stream carry a handle plus a per-tool preview;
+    artifact_read pages through the full value on demand.
+    """
+    if not isinstance(obs, dict) or tool in _SKIP_TOOLS or inline_max_bytes <= 0:
+        return obs
+    out = None
+    for field, value in obs.items():
+        if isinstance(value, (bool, int, float)) or value is None:
+            continue
+        blob = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+        size = len(blob.encode("utf-8"))
+        if size <= inline_max_bytes:
+            continue
+        if out is None:
+            out = dict(obs)
+        try:
+            handle = store.put(blob)
+        except OSError:
+            continue  # store unavailable: keep the value inline
+        out[field] = {
+            "artifact": handle,
+            "bytes": size,
+            "kind": "text" if isinstance(value, str) else "json",
+            "preview": _preview(tool, field, value),
+        }
+    return out if out is not None else obs
+
+
+# ---------- retrieval tool ----------
+def artifact_read(handle: str, offset: int = 0, limit: int = 4000, as_json: bool = False) -> Dict[str, Any]:
+    """Page through an artifact by character offset (or return parsed JSON when small enough)."""
+    raw = store.get(handle)
+    if raw is None:
+        return {"ok": False, "error": f"artifact_not_found: {handle}"}
+    text = raw.decode("utf-8", errors="replace")
+    limit = max(1, min(int(limit), INLINE_MAX_BYTES))  # before as_json: a huge limit must not inline everything
+    if as_json and len(text) <= limit:
+        try:
+            return {"ok": True, "artifact": handle, "data": json.loads(text)}
+        except ValueError:
+            pass
+    offset = max(0, int(offset))
+    chunk = text[offset:offset + limit]
+    nxt = offset + len(chunk)
+    return {
+        "ok": True,
+        "artifact": handle,
+        "offset": offset,
+        "content": chunk,
+        "total_chars": len(text),
+        "next_offset": nxt if nxt < len(text) else None,
+    }
@@ -0,0 +1,161 @@
+# apps/orchestrator/batches.py
+from __future__ import annotations
+import asyncio, time, uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .jobs import QUEUED, Job, JobQueue
+from .policy import policy
+from .streams import RunEventLog, StreamHub
+
+_CFG: Dict[str, Any] = policy.cfg.get("batches", {}) or {}
+
+
+def _quantile(sorted_ms: List[float], q: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+class Batch:
+    """Many goals with shared options, run `parallelism` at a time; each goal is a Job."""
+    def __init__(self, jobs: List[Job], parallelism: int):
+        self.id = "b" + uuid.uuid4().hex[:11]
+        self.jobs = jobs
+        self.parallelism = parallelism
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def item(self, index: int) -> Dict[str, Any]:
+        job = self.jobs[index]
+        latency = (job.finished_at - job.started_at) * 1000 if job.started_at and job.finished_at else None
+        return {"index": index, "job_id": job.id, "goal": job.req.goal, "status": job.status, "steps": job.steps,
+                "latency_ms": round(latency, 2) if latency is not None else None,
+                "queued_ms": round((job.started_at - job.created_at) * 1000, 2) if job.started_at else None,
+                "error": job.error}
+
+    def report(self) -> Dict[str, Any]:
+        """Aggregate so far: status counts, throughput and per-goal latency (running time, not queueing)."""
+        items = [self.item(n) for n in range(len(self.jobs))]
+        counts: Dict[str, int] = {}
+        for it in items:
+            counts[it["status"]] = counts.get(it["status"], 0) + 1
+        lat = sorted(it["latency_ms"] for it in items if it["latency_ms"] is not None)
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        finished = sum(1 for j in self.jobs if j.done)
+        return {
+            "batch_id": self.id,
+            "status": "finished" if self.done else "running",
+            "goals": len(self.jobs),
+            "parallelism": self.parallelism,
+            "by_status": counts,
+            "elapsed_sec": round(elapsed, 3),
+            "throughput_per_min": round(finished / elapsed * 60, 2) if elapsed > 0 else None,
+            "latency_ms": {"p50": _quantile(lat, 0.5), "p95": _quantile(lat, 0.95), "max": lat[-1] if lat else None,
+                           "mean": round(sum(lat) / len(lat), 2) if lat else None},
+            "items": items,
+        }
+
+
+class BatchRunner:
+    """
+    Runs batches through the job queue's run() so every goal is a normal job
+    (GET /tasks/{job_id}, its own event stream, cancel), but outside the queue's
+    fixed workers: each batch has its own parallelism. Cross-run limits still
+    apply per tool call (leases), and goals share the process-wide LLM client
+    pool and browser contexts. Batch-level progress goes to the stream hub
+    under the batch id.
+    """
+    def __init__(self, queue: JobQueue, hub: StreamHub, max_goals: int = 500,
+                 default_parallelism: int = 4, max_parallelism: int = 16, keep_finished: int = 50):
+        self.queue = queue
+        self.hub = hub
+        self.max_goals = max_goals
+        self.default_parallelism = default_parallelism
+        self.max_parallelism = max_parallelism
+        self.keep_finished = keep_finished
+        self.batches: "OrderedDict[str, Batch]" = OrderedDict()
+
+    def submit(self, reqs: List[Any], llm_factory: Callable[[], Any], parallelism: Optional[int] = None) -> Batch:
+        if not reqs:
+            raise ValueError("empty_batch")
+        if len(reqs) > self.max_goals:
+            raise ValueError(f"batch_too_large: {len(reqs)} goals (max {self.max_goals})")
+        n = max(1, min(int(parallelism or self.default_parallelism), self.max_parallelism))
+        batch = Batch([Job(req, None) for req in reqs], n)
+        for job in batch.jobs:
+            self.queue.track(job)
+        self.batches[batch.id] = batch
+        self._evict()
+        batch.task = asyncio.create_task(self._run(batch, self.hub.open(batch.id), llm_factory))
+        return batch
+
+    async def _run(self, batch: Batch, log: RunEventLog, llm_factory: Callable[[], Any]) -> None:
+        log.append({"evt": "batch.start", "batch_id": batch.id, "goals": len(batch.jobs),
+                    "parallelism": batch.parallelism})
+        sem = asyncio.Semaphore(batch.parallelism)
+
+        async def one(index: int, job: Job) -> None:
+            async with sem:
+                if job.status != QUEUED:
+                    return  # cancelled before its turn
+                job.llm = llm_factory()  # a planner session per goal, created when its turn comes
+                log.append({"evt": "goal.start", "index": index, "job_id": job.id})
+                await self.queue.run(job)
+                log.append({"evt": "goal.end", **self.item_event(batch, index)})
+
+        try:
+            await asyncio.gather(*(one(n, job) for n, job in enumerate(batch.jobs)))
+        except asyncio.CancelledError:
+            for job in batch.jobs:
+                self.queue.cancel(job.id)
+            raise
+        finally:
+            batch.finished_at = time.time()
+            report = batch.report()
+            print(f"Batch {batch.id} finished: {report['by_status']} in {report['elapsed_sec']}s")
+            log.append({"evt": "batch.end", **{k: v for k, v in report.items() if k != "items"}})
+            log.close()
+
+    @staticmethod
+    def item_event(batch: Batch, index: int) -> Dict[str, Any]:
+        it = batch.item(index)
+        return {k: it[k] for k in ("index", "job_id", "status", "steps", "latency_ms", "error")}
+
+    def get(self, batch_id: str) -> Optional[Batch]:
+        return self.batches.get(batch_id)
+
+    def cancel(self, batch_id: str) -> Optional[Batch]:
+        batch = self.batches.get(batch_id)
+        if batch is None or batch.done:
+            return batch
+        for job in batch.jobs:
+            if not job.done:
+                self.queue.cancel(job.id)
+        return batch
+
+    def _evict(self) -> None:
+        finished = [b.id for b in self.batches.values() if b.done]
+        for batch_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.batches[batch_id]
+
+    async def shutdown(self) -> None:
+        tasks = [b.task for b in self.batches.values() if b.task is not None and not b.task.done()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def make_batch_runner(queue: JobQueue, hub: StreamHub) -> BatchRunner:
+    return BatchRunner(
+        queue, hub,
+        max_goals=int(_CFG.get("max_goals", 500)),
+        default_parallelism=int(_CFG.get("parallelism", 4)),
+        max_parallelism=int(_CFG.get("max_parallelism", 16)),
+        keep_finished=int(_CFG.get("keep_finished", 50)),
+    )
@@ -0,0 +1,147 @@
+# apps/orchestrator/compaction.py
+from __future__ import annotations
+import json
+from typing import Any, Dict, List
+
+# Rough local token estimate (~4 chars/token for English + JSON) plus per-message
+# framing overhead. Good enough for budgeting; no tokenizer download or API call.
+_CHARS_PER_TOKEN = 4
+_MSG_OVERHEAD = 4
+_SNIPPET = 240
+# Operator hints are user messages that start with this; like system notes they are never compacted
+HINT_PREFIX = "Operator hint: "
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    total = 0
+    for m in messages:
+        total += _MSG_OVERHEAD + _text_len(m.get("content")) // _CHARS_PER_TOKEN
+        for tc in m.get("tool_calls") or []:
+            fn = tc.get("function") or {}
+            total += (len(fn.get("name") or "") + len(fn.get("arguments") or "")) // _CHARS_PER_TOKEN
+    return total
+
+
+def _text_len(content: Any) -> int:
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return len(content)
+    return len(json.dumps(content, ensure_ascii=False))
+
+
+def clip_text(text: str, limit: int = _SNIPPET) -> str:
+    return text if len(text) <= limit else text[:limit] + f"... [{len(text) - limit} chars dropped]"
+
+
+def summarize_value(v: Any) -> Any:
+    """Shape of a value instead of its bulk: short scalars stay, long ones become sizes."""
+    if isinstance(v, str):
+        return clip_text(v, 120)
+    if isinstance(v, list):
+        return {"list_len": len(v)}
+    if isinstance(v, dict):
+        return {"keys": list(v.keys())[:20]}
+    return v
+
+
+def summarize_observation(obs: Any) -> Any:
+    if not isinstance(obs, dict):
+        return summarize_value(obs)
+    out: Dict[str, Any] = {}
+    for k, v in obs.items():
+        if k in ("ok", "error", "stop", "status", "path", "url", "code", "count"):
+            out[k] = v if not isinstance(v, str) else clip_text(v, 200)
+        else:
+            out[k] = summarize_value(v)
+    return out
+
+
+def _compact_tool_message(m: Dict[str, Any]) -> None:
+    try:
+        payload = json.loads(m.get("content") or "")
+    except Exception:
+        m["content"] = clip_text(str(m.get("content") or ""))
+        return
+    if not isinstance(payload, dict) or payload.get("compacted"):
+        return
+    m["content"] = json.dumps({
+        "compacted": True,
+        "tool": payload.get("tool"),
+        "args": {k: summarize_value(v) for k, v in (payload.get("args") or {}).items()},
+        "observation": summarize_observation(payload.get("observation")),
+    }, ensure_ascii=False)
+
+
+def _compact_assistant_message(m: Dict[str, Any]) -> None:
+    if isinstance(m.get("content"), str):
+        m["content"] = clip_text(m["content"])
+    for tc in m.get("tool_calls") or []:
+        fn = tc.get("function") or {}
+        raw = fn.get("arguments") or ""
+        if len(raw) > _SNIPPET:
+            try:
+                keys = list(json.loads(raw).keys())
+            except Exception:
+                keys = []
+            # keep it valid JSON; the model only needs to know what it asked for
+            fn["arguments"] = json.dumps({"compacted": True, "keys": keys})
+
+
+def _pinned(m: Dict[str, Any]) -> bool:
+    if m.get("role") == "system":
+        return True  # the prompt and notes added mid-run (e.g. pending approvals)
+    return m.get("role") == "user" and str(m.get("content") or "").startswith(HINT_PREFIX)
+
+
+def compact_messages(messages: List[Dict[str, Any]], budget_tokens: int, keep_turns: int = 4) -> Dict[str, Any]:
+    """
+    Shrink `messages` in place until its estimate fits `budget_tokens`.
+
+    The system prompt, the goal (first user message), system notes and operator
+    hints anywhere in the conversation, and the last `keep_turns` assistant
+    turns (with their tool answers) stay verbatim. Older tool
+    observations are replaced by compact summaries first; if that is not enough,
+    the oldest turns are dropped whole so tool_call/tool pairs stay consistent.
+    Returns stats for last_raw.
+    """
+    before = estimate_tokens(messages)
+    stats = {"est_tokens_before": before, "est_tokens_after": before, "budget": budget_tokens,
+             "summarized": 0, "dropped": 0}
+    if budget_tokens <= 0 or before <= budget_tokens:
+        return stats
+
+    head = 0
+    while head < len(messages) and messages[head].get("role") == "system":
+        head += 1
+    if head < len(messages) and messages[head].get("role") == "user":
+        head += 1  # the goal
+
+    assistant_idx = [i for i in range(head, len(messages)) if messages[i].get("role") == "assistant"]
+    tail_start = assistant_idx[-keep_turns] if len(assistant_idx) >= keep_turns else head
+    if keep_turns <= 0:
+        tail_start = len(messages)
+
+    # 1) summarize older observations / assistant text
+    for m in messages[head:tail_start]:
+        if m.get("role") == "tool":
+            _compact_tool_message(m)
+            stats["summarized"] += 1
+        elif m.get("role") == "assistant":
+            _compact_assistant_message(m)
+            stats["summarized"] += 1
+
+    # 2) drop the oldest whole turns while still over budget (pinned messages stay where they are)
+    while estimate_tokens(messages) > budget_tokens:
+        start = next((i for i in range(head, tail_start) if not _pinned(messages[i])), None)
+        if start is None:
+            break
+        end = start + 1
+        while end < tail_start and messages[end].get("role") == "tool":
+            end += 1  # a turn = one assistant message + the tool answers that follow it
+        stats["dropped"] += end - start
+        del messages[start:end]
+        tail_start -= end - start
+
+    stats["est_tokens_after"] = estimate_tokens(messages)
+    return stats
@@ -0,0 +1,189 @@
+# apps/orchestrator/dispatch.py
+from __future__ import annotations
+import asyncio, functools, inspect, logging, time, uuid
+from typing import Any, Callable, Dict, Optional
+
+from .tools.registry import LazyTool, lookup_tool
+from .artifacts import reduce_observation
+from .tool_cache import tool_cache, CACHE_ENABLED_BY_DEFAULT
+from .replay import RECORD_BY_DEFAULT, Recording, RunRecorder
+from .plan_cache import PLAN_CACHE_ENABLED_BY_DEFAULT
+from .leases import LeaseTimeout, lease_manager
+from .executors import pool_for, run_in_pool
+from .tool_timeouts import latency_histograms, timeout_policy
+from .approvals import RunChannel
+from .warmup import WARMUP_ENABLED_BY_DEFAULT, RunWarmup
+from ..worker.cancel import CancelToken
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class RunContext:
+    """Per-run knobs and counters threaded through tool dispatch."""
+    def __init__(self, run_id: Optional[str] = None, options: Optional[dict] = None):
+        opts = options or {}
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.cache_enabled = bool(opts.get("tool_cache", CACHE_ENABLED_BY_DEFAULT))
+        self.cache_stats = {"hits": 0, "misses": 0, "revalidated": 0}
+        self.lease_stats = {"waited": 0, "wait_ms": 0.0}  # time spent queued behind other runs' leases
+        self.plan_cache_enabled = bool(opts.get("plan_cache", PLAN_CACHE_ENABLED_BY_DEFAULT))
+        self.result: Optional[dict] = None  # filled in by the agent loop when the run ends
+        self.recorder: Optional[RunRecorder] = RunRecorder(self.run_id) if opts.get("record", RECORD_BY_DEFAULT) else None
+        # Replaying a recording: serve its observations instead of running tools (unless replay_live)
+        self.replay: Optional[Recording] = None
+        self.replay_live = False
+        # Wall-clock cap for the whole run (limits.max_minutes); tool timeouts are clamped to what is left
+        self.deadline: Optional[float] = None
+        self.tool_timeouts: Dict[str, Any] = dict(opts.get("tool_timeouts") or {})
+        # Human in the loop (approvals.RunChannel): set for runs a client can answer
+        self.channel: Optional[RunChannel] = None
+        # Speculative backend warm-ups while the planner thinks (warmup.py)
+        self.warmup: Optional[RunWarmup] = RunWarmup(opts) if opts.get("warmup", WARMUP_ENABLED_BY_DEFAULT) else None
+
+    def remaining_sec(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_cancel(func: Callable[..., Any]) -> bool:
+    try:
+        return "cancel" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+async def invoke(func: Callable[..., Any], args: Dict[str, Any], timeout: float) -> Any:
+    """Call a sync or async tool under a timeout; raises asyncio.TimeoutError or the tool's exception."""
+    pool = pool_for(func)
+    # registry tools feed the latency history behind the learned timeouts
+    name = func.name if isinstance(func, LazyTool) else None
+    if isinstance(func, LazyTool):
+        # First use imports the tool's module; keep that off the event loop and outside the timeout
+        func = func.load() if func.loaded else await run_in_pool("io", func.load)
+    # Tools that take `cancel` are told to stop when we stop waiting; a thread can't be interrupted
+    token = CancelToken()
+    if _accepts_cancel(func):
+        args = {**args, "cancel": token}
+    t0 = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(func):
+            result = await asyncio.wait_for(func(**args), timeout=timeout)
+        else:
+            # Sync tools run in their own pool so a stuck UI call can't starve fs/network calls
+            result = await asyncio.wait_for(run_in_pool(pool, func, **args), timeout=timeout)
+    except asyncio.TimeoutError:
+        token.cancel("timeout")
+        if name:
+            latency_histograms.record_timeout(name, max(timeout * 1000, (time.perf_counter() - t0) * 1000))
+        raise
+    except asyncio.CancelledError:
+        token.cancel("cancelled")
+        raise
+    except Exception:
+        if name:
+            latency_histograms.record(name, (time.perf_counter() - t0) * 1000)
+        raise
+    if name:
+        latency_histograms.record(name, (time.perf_counter() - t0) * 1000)
+    return result
+
+
+async def cached_invoke(name: str, func: Callable[..., Any], args: Dict[str, Any], timeout: float,
+                        stats: Optional[Dict[str, int]] = None) -> Any:
+    """invoke() behind the read-only result cache (see tool_cache.py)."""
+    lk = tool_cache.begin(name, args)
+    if lk is None:
+        return await invoke(func, args, timeout)
+    if lk.hit is not None:
+        if stats is not None:
+            stats["hits"] += 1
+        return lk.hit
+    obs = await invoke(func, tool_cache.request_args(lk, args), timeout)
+    result = tool_cache.finish(lk, obs)
+    if stats is not None:
+        stats["revalidated" if result is not obs else "misses"] += 1
+    return result
+
+
+async def run_tool(tool_name: str, args: dict, timeout: Optional[float] = None,
+                   ctx: Optional[RunContext] = None) -> dict:
+    """
+    Look up and run one tool with its own timeout; failures become an error observation.
+    Without an explicit `timeout` the tool's learned/configured one is used (tool_timeouts.py),
+    never longer than what is left of the run's wall-clock budget.
+    """
+    if ctx is not None and ctx.replay is not None and not ctx.replay_live:
+        return ctx.replay.observation(tool_name, args)
+    if ctx is not None and ctx.warmup is not None:
+        ctx.warmup.used(tool_name)
+    call_args, verdict = args, None
+    if ctx is not None and ctx.channel is not None and ctx.channel.needs_approval(tool_name):
+        # Parked until a human answers; nothing is leased or timed while it waits
+        verdict = await ctx.channel.review(tool_name, args, ctx.remaining_sec())
+        if not verdict.approved:
+            error = "rejected_by_user" if verdict.decision == "rejected" else "approval_timeout"
+            return {"ok": False, "error": error, **({"reason": verdict.reason} if verdict.reason else {}),
+                    "approval": {"id": verdict.approval_id, "decision": verdict.decision}}
+        call_args = verdict.args
+    if timeout is None:
+        func = lookup_tool(tool_name).func
+        if isinstance(func, LazyTool) and not func.loaded:
+            # its own default timeout_sec bounds the learned one; the import is due now anyway
+            await run_in_pool("io", func.load)
+        timeout = timeout_policy.timeout_for(tool_name, call_args, ctx.tool_timeouts if ctx is not None else None, func)
+    remaining = ctx.remaining_sec() if ctx is not None else None
+    if remaining is not None:
+        if remaining <= 0:
+            return {"ok": False, "error": "run_time_budget_exceeded"}
+        timeout = min(timeout, remaining)
+    t0 = time.perf_counter()
+    obs = await _run_tool(tool_name, call_args, timeout, ctx)
+    if verdict is not None and isinstance(obs, dict):
+        obs = {**obs, "approval": {"id": verdict.approval_id, "decision": verdict.decision, "wait_ms": verdict.wait_ms,
+                                   **({"args": call_args} if verdict.decision == "edited" else {})}}
+    if ctx is not None and ctx.recorder is not None:
+        # keyed by the planner's args, which is what a replay looks up
+        ctx.recorder.tool(tool_name, args, obs, (time.perf_counter() - t0) * 1000)
+    return obs
+
+
+async def _run_tool(tool_name: str, args: dict, timeout: float, ctx: Optional[RunContext]) -> dict:
+    print(f"Looking up tool: {tool_name}")
+    match = lookup_tool(tool_name)
+    tool, matched_name = match.func, match.name
+    if not tool:
+        print(f"Tool not found: {tool_name}")
+        return {"ok": False, "error": f"unknown_tool: {tool_name}"}
+    print(f"Tool found: {matched_name} ({match.kind})")
+    if match.kind == "fuzzy":
+        # Surface guessed names so a bad match shows up in steps and traces
+        logger.warning(f"fuzzy tool match {tool_name!r} -> {matched_name!r} (score {match.score})")
+    try:
+        # Shared surfaces (desktop, browser profile, package manager, paths) are leased across runs
+        async with lease_manager.hold(matched_name, args, ctx.remaining_sec() if ctx is not None else None) as lease:
+            if ctx is not None and ctx.cache_enabled:
+                obs = await cached_invoke(matched_name, tool, args, timeout, ctx.cache_stats)
+            else:
+                obs = await invoke(tool, args, timeout)
+        print(f"Tool {matched_name} result: {obs}")
+        # Large fields go to the artifact store; everything downstream sees handle + preview
+        obs = reduce_observation(matched_name, obs)
+        if match.kind == "fuzzy" and isinstance(obs, dict):
+            obs = {**obs, "tool_match": {"requested": tool_name, "matched": matched_name,
+                                         "kind": match.kind, "score": match.score}}
+        if lease.wait_ms >= 1 and isinstance(obs, dict):
+            obs = {**obs, "lease_wait_ms": lease.wait_ms}
+            if ctx is not None:
+                ctx.lease_stats["waited"] += 1
+                ctx.lease_stats["wait_ms"] = round(ctx.lease_stats["wait_ms"] + lease.wait_ms, 2)
+        return obs
+    except LeaseTimeout as e:
+        print(f"Tool {matched_name} not run: {e}")
+        return {"ok": False, "error": str(e)}
+    except asyncio.TimeoutError:
+        print(f"Tool {matched_name} timed out")
+        return {"ok": False, "error": f"tool_timeout_{round(timeout, 1):g}s"}
+    except Exception as e:
+        print(f"Tool {matched_name} failed: {e}")
+        logger.exception(f"tool {tool_name} failed")
+        return {"ok": False, "error": f"tool_error: {e}"}
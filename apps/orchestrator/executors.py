@@ -0,0 +1,136 @@
+# apps/orchestrator/executors.py
+from __future__ import annotations
+import asyncio, functools, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .policy import policy
+from .metrics import (EXECUTOR_ACTIVE, EXECUTOR_LEAKED, EXECUTOR_LEAKED_TOTAL, EXECUTOR_QUEUE_DEPTH,
+                      EXECUTOR_TASKS, EXECUTOR_UTILIZATION)
+
+logger = logging.getLogger("uvicorn.error")
+
+_CFG: Dict[str, Any] = policy.cfg.get("executors", {}) or {}
+
+DEFAULT_POOL = "io"
+# name -> default size. desktop-ui and browser are single threads: UI Automation/COM and
+# Playwright's sync API are bound to the thread that started them. All pools are threads:
+# tools get a CancelToken (threading objects), which can't cross a process boundary.
+_POOLS = {
+    "io": 8,
+    "desktop-ui": 1,
+    "browser": 1,
+    "network": 8,
+}
+
+
+class _Call:
+    __slots__ = ("started", "finished", "abandoned")
+
+    def __init__(self):
+        self.started = self.finished = self.abandoned = False
+
+
+class ExecutorPool:
+    """A named thread pool, created on first use, with queue/utilization gauges."""
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0  # submitted and not yet finished
+        self.active = 0     # running right now
+        self.leaked = 0     # threads still running a call nobody waits for any more
+        EXECUTOR_LEAKED.labels(pool=name).set_function(lambda: self.leaked)
+        EXECUTOR_QUEUE_DEPTH.labels(pool=name).set_function(self.queue_depth)
+        EXECUTOR_ACTIVE.labels(pool=name).set_function(self.running)
+        EXECUTOR_UTILIZATION.labels(pool=name).set_function(lambda: self.running() / self.size)
+
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"pool-{self.name}")
+            return self._executor
+
+    def running(self) -> int:
+        return self.active
+
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.running())
+
+    def _tracked(self, call: Callable[[], Any], state: _Call) -> Any:
+        with self._lock:
+            self.active += 1
+            state.started = True
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self.active -= 1
+                state.finished = True
+                if state.abandoned:
+                    self.leaked -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        call = functools.partial(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        EXECUTOR_TASKS.labels(pool=self.name).inc()
+        state = _Call()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.executor(), self._tracked, call, state)
+        except asyncio.CancelledError:
+            # a call that hasn't started is dropped from the queue; one that has keeps its thread
+            with self._lock:
+                leaked = state.started and not state.finished
+                if leaked:
+                    state.abandoned = True
+                    self.leaked += 1
+            if leaked:
+                EXECUTOR_LEAKED_TOTAL.labels(pool=self.name).inc()
+                logger.warning(f"executor pool {self.name}: abandoned call {getattr(fn, '__name__', fn)} still running")
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"size": self.size, "running": self.running(), "queued": self.queue_depth(),
+                "leaked": self.leaked}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+
+
+_sizes: Dict[str, Any] = _CFG.get("sizes", {}) or {}
+POOLS: Dict[str, ExecutorPool] = {
+    name: ExecutorPool(name, int(_sizes.get(name, size))) for name, size in _POOLS.items()
+}
+# per-tool overrides of the pool a tool declares in the registry
+TOOL_POOL_OVERRIDES: Dict[str, str] = {k.lower(): v for k, v in (_CFG.get("tools", {}) or {}).items()}
+
+
+def pool_for(func: Any) -> str:
+    """Pool a registry entry runs in: config override, else what the tool declares."""
+    return TOOL_POOL_OVERRIDES.get(getattr(func, "name", None) or "") or getattr(func, "pool", None) or DEFAULT_POOL
+
+
+def get_pool(name: Optional[str]) -> ExecutorPool:
+    return POOLS.get(name or DEFAULT_POOL) or POOLS[DEFAULT_POOL]
+
+
+async def run_in_pool(pool: Optional[str], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await get_pool(pool).run(fn, *args, **kwargs)
+
+
+def pools_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: p.snapshot() for name, p in POOLS.items()}
+
+
+def shutdown_pools() -> None:
+    for p in POOLS.values():
+        p.shutdown()
@@ -0,0 +1,194 @@
+# apps/orchestrator/jobs.py
+from __future__ import annotations
+import asyncio, logging, time, uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .policy import policy
+
+logger = logging.getLogger("uvicorn.error")
+
+_CFG: Dict[str, Any] = policy.cfg.get("jobs", {}) or {}
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+_FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """One submitted goal: its request, lifecycle timestamps, live progress and final result."""
+    def __init__(self, req: Any, llm: Any):
+        self.id = uuid.uuid4().hex[:12]
+        self.req = req
+        self.llm = llm
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps = 0
+        self.last_event: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in _FINISHED
+
+    def progress(self, event: dict) -> None:
+        self.last_event = event.get("evt")
+        # parallel micro-calls carry an index and count as one step; inline plan calls are steps
+        if self.last_event == "tool.obs" and ("index" not in event or event.get("inline")):
+            self.steps += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "goal": self.req.goal,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": self.steps,
+            "last_event": self.last_event,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Bounded FIFO of agent runs served by a fixed number of worker tasks.
+    submit() fails fast with QueueFull once `max_queue` jobs are waiting;
+    finished jobs are kept (oldest evicted first) so results can be polled.
+    Workers are started on first submit, on the running event loop.
+    """
+    def __init__(self, runner: Callable[[Job], Awaitable[dict]], workers: int = 2,
+                 max_queue: int = 100, keep_finished: int = 500):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.keep_finished = keep_finished
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        # first use, or the previous loop is gone (e.g. app restarted in-process)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+
+    def submit(self, req: Any, llm: Any) -> Job:
+        self._ensure_workers()
+        job = Job(req, llm)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"job_queue_full: {self.max_queue} waiting")
+        self.jobs[job.id] = job
+        self._evict()
+        return job
+
+    def track(self, job: Job) -> None:
+        """Register a job run outside the queue (a batch goal) so status, result and cancel work for it."""
+        self.jobs[job.id] = job
+        self._evict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def position(self, job: Job) -> int:
+        """How many queued jobs are ahead of this one (0 once it runs)."""
+        if job.status != QUEUED:
+            return 0
+        return sum(1 for j in self.jobs.values() if j.status == QUEUED and j.created_at < job.created_at)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if job.status == QUEUED:
+            # the worker skips it when it is dequeued
+            self._finish(job, CANCELLED, error="cancelled")
+        elif job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for j in self.jobs.values():
+            counts[j.status] = counts.get(j.status, 0) + 1
+        return {"workers": self.workers, "max_queue": self.max_queue,
+                "queued": self._queue.qsize() if self._queue else 0, "by_status": counts}
+
+    async def run(self, job: Job) -> None:
+        """Run one job to a final status (skipped if it was cancelled while waiting)."""
+        if job.status != QUEUED:
+            job.llm = None
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.task = asyncio.create_task(self.runner(job))
+        try:
+            result = await job.task
+        except asyncio.CancelledError:
+            if not job.cancel_requested:
+                raise  # the worker itself is being shut down
+            self._finish(job, CANCELLED, error="cancelled")
+        except Exception as e:
+            logger.exception(f"job {job.id} failed")
+            self._finish(job, FAILED, error=f"job_error: {e}")
+        else:
+            ok = bool((result or {}).get("ok"))
+            self._finish(job, SUCCEEDED if ok else FAILED, result=result,
+                         error=None if ok else (result or {}).get("error"))
+        finally:
+            job.llm = None  # drop the planner session once the run is over
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.run(job)
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        print(f"Job {job.id} {status}" + (f": {error}" if error else ""))
+
+    def _evict(self) -> None:
+        finished = [j.id for j in self.jobs.values() if j.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        for job in self.jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+                self._finish(job, CANCELLED, error="shutdown")
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+def make_job_queue(runner: Callable[[Job], Awaitable[dict]]) -> JobQueue:
+    return JobQueue(
+        runner,
+        workers=int(_CFG.get("workers", 2)),
+        max_queue=int(_CFG.get("max_queue", 100)),
+        keep_finished=int(_CFG.get("keep_finished", 500)),
+    )
@@ -0,0 +1,131 @@
+# apps/orchestrator/leases.py
+from __future__ import annotations
+import asyncio, time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .policy import policy
+from .scheduler import Resource, conflicts, resource_keys
+
+_CFG: Dict[str, Any] = policy.cfg.get("leases", {}) or {}
+
+
+class LeaseTimeout(Exception):
+    pass
+
+
+def _name(r: Resource) -> str:
+    return r.kind if r.key == "*" else f"{r.kind}:{r.key}"
+
+
+class Lease:
+    """The resources one tool call holds and how long it waited for them."""
+    def __init__(self, resources: List[Resource]):
+        self.resources = resources
+        self.names = [_name(r) for r in resources]
+        self.wait_ms = 0.0
+
+
+class LeaseManager:
+    """
+    Resource leases shared by every run in the process: "desktop-ui",
+    "browser:<profile dir>", "pkg-manager:<manager>", "vscode" and "path:<abs path>".
+    Only resource kinds listed in `capacity` are leased. Holders conflict by the
+    scheduler's rules (conflicts()): a path conflicts with its ancestors and
+    descendants, and readers share, so only a writer on either side counts. A
+    call waits while `capacity` holders conflict with one of its resources, then
+    takes all of them at once, so two calls needing the same pair never deadlock.
+    """
+    def __init__(self, capacity: Dict[str, int], acquire_timeout: float = 300.0, enabled: bool = True):
+        self.capacity = {k: max(1, int(v)) for k, v in (capacity or {}).items()}
+        self.acquire_timeout = acquire_timeout
+        self.enabled = enabled
+        self._holders: List[Lease] = []
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.held: Dict[str, int] = {}
+        self.stats = {"acquired": 0, "waited": 0, "wait_ms": 0.0, "timeouts": 0}
+
+    def resources(self, tool: str, args: Dict[str, Any]) -> List[Resource]:
+        if not self.enabled:
+            return []
+        out: Dict[tuple, Resource] = {}
+        for r in resource_keys(tool, args):
+            if r.kind in self.capacity:
+                prev = out.get((r.kind, r.key))
+                out[(r.kind, r.key)] = r._replace(write=r.write or bool(prev and prev.write))
+        return [out[k] for k in sorted(out)]
+
+    def names(self, tool: str, args: Dict[str, Any]) -> List[str]:
+        return [_name(r) for r in self.resources(tool, args)]
+
+    def _blocked(self, resources: List[Resource]) -> Optional[str]:
+        """The first resource already held by `capacity` conflicting leases, if any."""
+        for r in resources:
+            if sum(1 for lease in self._holders if conflicts([r], lease.resources)) >= self.capacity[r.kind]:
+                return _name(r)
+        return None
+
+    def _wake(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # events bind to the loop they first wait on; start over on a new loop
+            self._loop = loop
+            self._holders = []
+            self.held = {}
+            self._changed = asyncio.Event()
+
+    @asynccontextmanager
+    async def hold(self, tool: str, args: Dict[str, Any], timeout: Optional[float] = None) -> AsyncIterator[Lease]:
+        """`timeout`: what is left of the caller's own deadline; the wait never outlasts it."""
+        lease = Lease(self.resources(tool, args))
+        if not lease.resources:
+            yield lease
+            return
+        self._bind()
+        wait = self.acquire_timeout if timeout is None else max(0.0, min(self.acquire_timeout, timeout))
+        t0 = time.perf_counter()
+        while (busy := self._blocked(lease.resources)) is not None:
+            left = wait - (time.perf_counter() - t0)
+            if left <= 0:
+                self.stats["timeouts"] += 1
+                raise LeaseTimeout(f"lease_timeout: {busy} busy for {wait:g}s")
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=left)
+            except asyncio.TimeoutError:
+                pass
+        # nothing awaited between the check and here: taking the lease is atomic
+        self._holders.append(lease)
+        for name in lease.names:
+            self.held[name] = self.held.get(name, 0) + 1
+        lease.wait_ms = round((time.perf_counter() - t0) * 1000, 2)
+        self.stats["acquired"] += 1
+        if lease.wait_ms >= 1:
+            self.stats["waited"] += 1
+            self.stats["wait_ms"] = round(self.stats["wait_ms"] + lease.wait_ms, 2)
+        try:
+            yield lease
+        finally:
+            if lease in self._holders:
+                self._holders.remove(lease)
+                for name in lease.names:
+                    if self.held.get(name, 0) > 1:
+                        self.held[name] -= 1
+                    else:
+                        self.held.pop(name, None)
+            self._wake()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "capacity": self.capacity, "held": dict(self.held), **self.stats}
+
+
+lease_manager = LeaseManager(
+    capacity=_CFG.get("capacity", {"desktop-ui": 1, "browser": 1, "pkg-manager": 1, "vscode": 1, "path": 1}),
+    acquire_timeout=float(_CFG.get("acquire_timeout_sec", 300)),
+    enabled=bool(_CFG.get("enabled", True)),
+)
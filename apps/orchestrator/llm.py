@@ -1,9 +1,43 @@
 import re
-import os, time, json
-from typing import Any, Dict, List, Optional
+import os, time, json, inspect, threading
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from .compaction import compact_messages
+from .llm_cache import LLMResponseCache, conversation_key
 load_dotenv()
 
+# One AsyncOpenAI client per process (keyed by API key) so every run reuses the
+# same keep-alive connection pool instead of opening a new client per step.
+_ASYNC_CLIENTS: Dict[str, Any] = {}
+
+def get_async_client(api_key: str):
+    client = _ASYNC_CLIENTS.get(api_key)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=float(os.getenv("OPENAI_TIMEOUT_SEC", "120")),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+        )
+        _ASYNC_CLIENTS[api_key] = client
+    return client
+
+async def aclose_clients() -> None:
+    """Close pooled clients (call from app shutdown)."""
+    for client in list(_ASYNC_CLIENTS.values()):
+        try:
+            await client.close()
+        except Exception:
+            pass
+    _ASYNC_CLIENTS.clear()
+
+async def maybe_await(value):
+    """Await `value` if it is awaitable; lets callers accept sync or async LLM shims."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
 SYSTEM_PROMPT = """
 You are a Desktop Operator that plans and executes tasks using tools.
 Always prefer robust, generic flows that will work across many sites/apps.
@@ -14,6 +48,8 @@ Assume Windows. Persist browser sessions using a profile when needed.
 - fs_move(src, dst)
 - fs_listdir(path)
 
+- artifact_read(handle, offset?=0, limit?=4000)  # big outputs arrive as {artifact, bytes, preview}; page the full value only if the preview is not enough
+
 - terminal_run(cmd, shell?="powershell", timeout_sec?=120)
 
 - vscode_open(path, line?)
@@ -103,23 +139,159 @@ Be decisive, resilient, and generic. Avoid site-specific hacks unless absolutely
 
 # Keep your SYSTEM_PROMPT exactly as you already have it above.
 
-class LLM:
+class _ToolCallAssembler:
+    """
+    Rebuilds streamed tool calls from their deltas. Argument fragments are scanned
+    incrementally (string/escape aware brace depth), so a call is reported the
+    moment its JSON object closes instead of when the whole response ends.
+    """
+    def __init__(self):
+        self._calls: Dict[int, Dict[str, Any]] = {}
+
+    def feed(self, index: int, call_id: Optional[str], name: Optional[str], fragment: Optional[str]):
+        st = self._calls.setdefault(index, {"id": None, "name": "", "args": [], "depth": 0,
+                                            "in_str": False, "esc": False, "started": False, "emitted": False})
+        if call_id:
+            st["id"] = call_id
+        if name:
+            st["name"] += name
+        if fragment:
+            st["args"].append(fragment)
+            for ch in fragment:
+                if st["in_str"]:
+                    if st["esc"]:
+                        st["esc"] = False
+                    elif ch == "\\":
+                        st["esc"] = True
+                    elif ch == '"':
+                        st["in_str"] = False
+                elif ch == '"':
+                    st["in_str"] = True
+                elif ch == "{":
+                    st["depth"] += 1
+                    st["started"] = True
+                elif ch == "}":
+                    st["depth"] -= 1
+        ready = []
+        if not st["emitted"] and st["started"] and st["depth"] == 0:
+            ready.append((index, self._emit(st)))
+        # A new index means every earlier call has received all of its arguments
+        for other_index, other in sorted(self._calls.items()):
+            if other_index < index and not other["emitted"]:
+                ready.append((other_index, self._emit(other)))
+        return ready
+
+    def flush(self):
+        return [(i, self._emit(st)) for i, st in sorted(self._calls.items()) if not st["emitted"]]
+
+    def raw_calls(self) -> List[Dict[str, Any]]:
+        return [{"id": st["id"], "type": "function", "name": st["name"] or None, "arguments": "".join(st["args"])}
+                for _, st in sorted(self._calls.items())]
+
+    @staticmethod
+    def _emit(st: Dict[str, Any]) -> Dict[str, Any]:
+        st["emitted"] = True
+        try:
+            args = json.loads("".join(st["args"]) or "{}")
+        except Exception:
+            args = {}
+        return {"name": st["name"] or None, "arguments": args}
+
+class LLMConfig:
+    """Process-wide planner settings, read from the environment once and shared by every session."""
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY", "")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.context_budget_tokens = int(os.getenv("LLM_CONTEXT_BUDGET_TOKENS", "12000"))
+        self.context_keep_turns = int(os.getenv("LLM_CONTEXT_KEEP_TURNS", "4"))
+        self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))
+        # Opt-in (LLM_CACHE=1): a conversation seen before is answered from disk, not the API
+        self.response_cache: Optional[LLMResponseCache] = None
+        if os.getenv("LLM_CACHE", "").strip().lower() in ("1", "true", "yes", "on"):
+            self.response_cache = LLMResponseCache(
+                os.getenv("LLM_CACHE_DIR", "data/llm_cache"),
+                ttl_sec=float(os.getenv("LLM_CACHE_TTL_SEC", str(7 * 86400))),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            )
+        try:
+            self.in_price = float(os.getenv("OPENAI_PRICE_INPUT_PER_1K", "0"))
+            self.out_price = float(os.getenv("OPENAI_PRICE_OUTPUT_PER_1K", "0"))
+            self.usd_to_inr = float(os.getenv("USD_TO_INR", "83.0"))
+        except Exception:
+            self.in_price = self.out_price = 0.0
+            self.usd_to_inr = 83.0
+        self.tool_specs: Optional[List[Dict[str, Any]]] = None  # built by the first session that needs them
+
+@lru_cache(maxsize=1)
+def llm_config() -> LLMConfig:
+    return LLMConfig()
+
+class UsageTotals:
+    """Token/cost counters across all sessions of this process."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.cost_usd = 0.0
+        self.cost_inr = 0.0
+
+    def add_session(self):
+        with self._lock:
+            self.sessions += 1
+
+    def add(self, prompt_tokens: int, completion_tokens: int, total_tokens: int, cost_usd: float, cost_inr: float):
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.total_tokens += total_tokens
+            self.cost_usd += cost_usd
+            self.cost_inr += cost_inr
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": self.sessions,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.total_tokens,
+                "cost_usd": round(self.cost_usd, 6),
+                "cost_inr": round(self.cost_inr, 2),
+            }
+
+usage_totals = UsageTotals()
+
+class LLM:
+    """
+    One planner session (one agent run): conversation-side state such as pending
+    tool_call ids, last_raw and this run's token/cost totals. Cheap to create;
+    the HTTP client pool (get_async_client) and LLMConfig are shared.
+    """
+    def __init__(self, config: Optional[LLMConfig] = None):
+        cfg = config or llm_config()
+        self.config = cfg
+        self.api_key = cfg.api_key
+        self.model = cfg.model
         self.start_time = time.time()
         self.last_raw: Dict[str, Any] | None = None
-        self._last_tool_call_id: str | None = None
+        # Tool calls of the last model turn still waiting for a tool message
+        self._pending_tool_calls: List[Dict[str, Any]] = []
         # Cost tracking
         self.total_prompt_tokens: int = 0
         self.total_completion_tokens: int = 0
         self.total_tokens: int = 0
         self.total_cost_usd: float = 0.0
         self.total_cost_inr: float = 0.0
+        # Conversation compaction (local token estimate, see compaction.py)
+        self.context_budget_tokens = cfg.context_budget_tokens
+        self.context_keep_turns = cfg.context_keep_turns
+        self._context: Dict[str, Any] = {}
+        usage_totals.add_session()
 
     def bootstrap(self, goal: str, dry_run: bool, budget_rupees: Optional[int]):
         # Reset per-run state to avoid leaking tool_call IDs across runs
-        self._last_tool_call_id = None
+        self._pending_tool_calls = []
         self.last_raw = None
         sys = SYSTEM_PROMPT + f"\nUser dry_run={dry_run}, budget_rupees={budget_rupees}.\n"
         return [
@@ -204,11 +376,22 @@ class LLM:
                 "required":["actions"], "additionalProperties": True
             }),
 
+            fn("artifact_read", {
+                "type":"object",
+                "properties":{"handle":{"type":"string"},"offset":{"type":"integer"},"limit":{"type":"integer"},"as_json":{"type":"boolean"}},
+                "required":["handle"], "additionalProperties": True
+            }),
+
             # WhatsApp Desktop chat tools (permissive schema to allow future args)
             fn("whatsapp_desktop_chat", any_obj),
             fn("whatsapp_send",         any_obj),
         ]
 
+    def _specs(self) -> List[Dict[str, Any]]:
+        if self.config.tool_specs is None:
+            self.config.tool_specs = self._tool_specs()
+        return self.config.tool_specs
+
     # -------------- Tool-call Parsing Helpers --------------
     def _extract_tool_from_text(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -238,67 +421,165 @@ class LLM:
         return None
 
     # ----------------- Next Tool Call -----------------
-    def next_tool_call(self, messages: List[Dict[str,Any]]) -> Optional[Dict[str,Any]]:
+    def _stub_call(self, messages: List[Dict[str,Any]]) -> Dict[str,Any]:
+        goal = [m for m in messages if m["role"] == "user"][-1]["content"].lower()
+        call: Dict[str, Any]
+        if ("youtube" in goal) or ("play " in goal):
+            call = {
+                "name": "browser.execute",
+                "arguments": {
+                    "actions": [
+                        {"op":"goto","params":{"url":"https://www.youtube.com/"}},
+                        {"op":"wait_for","params":{"locator":"role=combobox[name='Search']","timeout_ms":10000}},
+                        {"op":"type","params":{"locator":"role=combobox[name='Search']","text":"saiyaraa","press_enter":True}},
+                        {"op":"wait_for","params":{"locator":"ytd-video-renderer a#thumbnail","timeout_ms":15000}},
+                        {"op":"click","params":{"locator":"ytd-video-renderer a#thumbnail","nth":0}},
+                        {"op":"wait_ms","params":{"ms":1200}},
+                        {"op":"eval","params":{"js":"document.querySelector('video')?.play?.();"}}
+                    ]
+                }
+            }
+        elif ("flutter" in goal) or ("create project" in goal):
+            call = {"name":"terminal.run","arguments":{"cmd":"flutter --version","shell":"powershell","timeout_sec":180}}
+        else:
+            call = {"name":"fs.listdir","arguments":{"path":"."}}
+        # record for streaming debug
+        self.last_raw = {"path": "stub", "reason": "no_api_key", "emitted_call": call, "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}, "cost_usd": 0.0, "cost_inr": 0.0,
+                         "prompt_tokens_est": self._context.get("est_tokens_after"), "context": self._context}
+        return call
+
+    def _compact(self, messages: List[Dict[str,Any]]) -> None:
+        """Enforce the prompt token budget before each model turn; stats land in last_raw."""
+        self._context = compact_messages(messages, self.context_budget_tokens, self.context_keep_turns)
+
+    def _account_usage(self, usage: Any) -> Dict[str, Any]:
+        """Add one response's token usage to the running totals; returns the usage block for last_raw."""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
+        total_tokens = getattr(usage, "total_tokens", 0) if usage else (prompt_tokens + completion_tokens)
+        self.total_prompt_tokens += prompt_tokens
+        self.total_completion_tokens += completion_tokens
+        self.total_tokens += total_tokens
+        # Cost calculation (if env prices provided)
+        cfg = self.config
+        cost_usd = (prompt_tokens / 1000.0) * cfg.in_price + (completion_tokens / 1000.0) * cfg.out_price
+        cost_inr = cost_usd * cfg.usd_to_inr
+        self.total_cost_usd += cost_usd
+        self.total_cost_inr += cost_inr
+        usage_totals.add(prompt_tokens, completion_tokens, total_tokens, cost_usd, cost_inr)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "cost_usd": round(cost_usd, 6),
+            "cost_inr": round(cost_inr, 2),
+            "total_cost_usd": round(self.total_cost_usd, 6),
+            "total_cost_inr": round(self.total_cost_inr, 2),
+        }
+
+    def _finish_turn(self, messages: List[Dict[str,Any]], finish_reason: Any, content: Optional[str],
+                     tool_calls: List[Dict[str,Any]], usage: Dict[str,Any]) -> Optional[Dict[str,Any]]:
+        """Record last_raw for one model turn and turn it into the call main.py dispatches."""
+        self.last_raw = {
+            "finish_reason": finish_reason,
+            "message_content": content,
+            "tool_calls": tool_calls,
+            "usage": usage,
+            "prompt_tokens_est": self._context.get("est_tokens_after"),
+            "context": self._context,
+        }
+
+        # Prefer tool_calls if present
+        if tool_calls:
+            # The assistant turn must precede the tool messages that answer it
+            messages.append({
+                "role": "assistant",
+                "content": content,
+                "tool_calls": [
+                    {"id": tc.get("id"), "type": "function",
+                     "function": {"name": tc.get("name"), "arguments": tc.get("arguments") or "{}"}}
+                    for tc in tool_calls
+                ],
+            })
+            self._pending_tool_calls = [{"id": tc.get("id"), "name": tc.get("name")} for tc in tool_calls]
+            calls = []
+            for tc in tool_calls:
+                try:
+                    args = json.loads(tc.get("arguments") or "{}")
+                except Exception:
+                    args = {}
+                calls.append({"name": tc.get("name"), "arguments": args, "tool_call_id": tc.get("id")})
+            if len(calls) == 1:
+                return {"name": calls[0]["name"], "arguments": calls[0]["arguments"]}
+            # Several calls in one turn: hand them over as one parallel batch so none is dropped
+            return {"name": "multi_tool_use.parallel", "arguments": {"tool_uses": [
+                {"recipient_name": c["name"], "parameters": c["arguments"], "tool_call_id": c["tool_call_id"]}
+                for c in calls
+            ]}}
+
+        # Try to rescue a tool call from assistant text
+        rescued = self._extract_tool_from_text(content or "")
+        if rescued:
+            return rescued
+
+        # No tool call; append assistant text so the planner can iterate
+        messages.append({"role": "assistant", "content": content or ""})
+        return None
+
+    # ----------------- Response cache -----------------
+    def _cache_lookup(self, messages: List[Dict[str,Any]]) -> Tuple[Optional[str], Optional[Dict[str,Any]]]:
+        """(key, stored response) for this conversation; (None, None) when the cache is off."""
+        cache = self.config.response_cache
+        if cache is None:
+            return None, None
+        key = conversation_key(self.model, messages, self._specs(), self.config.temperature)
+        return key, cache.get(key)
+
+    def _cached_turn(self, messages: List[Dict[str,Any]], key: str, entry: Dict[str,Any]) -> Optional[Dict[str,Any]]:
+        # Same content and tool_call ids as the stored turn, so the rest of the conversation keys the same too
+        call = self._finish_turn(messages, entry.get("finish_reason"), entry.get("content"),
+                                 entry.get("tool_calls") or [], self._account_usage(None))
+        self.last_raw["cache"] = {"status": "hit", "key": key[:16], "age_sec": entry.get("age_sec"),
+                                  "saved_usage": entry.get("usage")}
+        return call
+
+    def _cache_store(self, key: Optional[str], finish_reason: Any, content: Optional[str],
+                     tool_calls: List[Dict[str,Any]], usage: Dict[str,Any]) -> None:
+        if key is None:
+            return
+        # truncated (length) or filtered turns are not answers worth replaying
+        stored = finish_reason in ("stop", "tool_calls")
+        if stored:
+            self.config.response_cache.put(key, {
+                "model": self.model, "finish_reason": finish_reason, "content": content, "tool_calls": tool_calls,
+                "usage": {k: usage.get(k) for k in ("prompt_tokens", "completion_tokens", "total_tokens")},
+            })
+        self.last_raw["cache"] = {"status": "miss", "key": key[:16], "stored": stored}
+
+    async def next_tool_call(self, messages: List[Dict[str,Any]]) -> Optional[Dict[str,Any]]:
+        self._compact(messages)
         # ---- Stub mode (no API key) ----
         if not self.api_key:
-            goal = [m for m in messages if m["role"] == "user"][-1]["content"].lower()
-            call: Dict[str, Any]
-            if ("youtube" in goal) or ("play " in goal):
-                call = {
-                    "name": "browser.execute",
-                    "arguments": {
-                        "actions": [
-                            {"op":"goto","params":{"url":"https://www.youtube.com/"}},
-                            {"op":"wait_for","params":{"locator":"role=combobox[name='Search']","timeout_ms":10000}},
-                            {"op":"type","params":{"locator":"role=combobox[name='Search']","text":"saiyaraa","press_enter":True}},
-                            {"op":"wait_for","params":{"locator":"ytd-video-renderer a#thumbnail","timeout_ms":15000}},
-                            {"op":"click","params":{"locator":"ytd-video-renderer a#thumbnail","nth":0}},
-                            {"op":"wait_ms","params":{"ms":1200}},
-                            {"op":"eval","params":{"js":"document.querySelector('video')?.play?.();"}}
-                        ]
-                    }
-                }
-            elif ("flutter" in goal) or ("create project" in goal):
-                call = {"name":"terminal.run","arguments":{"cmd":"flutter --version","shell":"powershell","timeout_sec":180}}
-            else:
-                call = {"name":"fs.listdir","arguments":{"path":"."}}
-            # record for streaming debug
-            self.last_raw = {"path": "stub", "reason": "no_api_key", "emitted_call": call, "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}, "cost_usd": 0.0, "cost_inr": 0.0}
-            return call
+            return self._stub_call(messages)
+
+        key, entry = self._cache_lookup(messages)
+        if entry is not None:
+            return self._cached_turn(messages, key, entry)
 
         # ---- Real API call ----
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            client = get_async_client(self.api_key)
 
-            resp = client.chat.completions.create(
+            resp = await client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                tools=self._tool_specs(),
+                tools=self._specs(),
                 tool_choice="auto",
-                temperature=0.2,
+                temperature=self.config.temperature,
             )
 
             # Token usage and cost estimation
-            usage = getattr(resp, "usage", None)
-            prompt_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
-            completion_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
-            total_tokens = getattr(usage, "total_tokens", 0) if usage else (prompt_tokens + completion_tokens)
-            self.total_prompt_tokens += prompt_tokens
-            self.total_completion_tokens += completion_tokens
-            self.total_tokens += total_tokens
-            # Cost calculation (if env prices provided)
-            try:
-                in_price = float(os.getenv("OPENAI_PRICE_INPUT_PER_1K", "0"))
-                out_price = float(os.getenv("OPENAI_PRICE_OUTPUT_PER_1K", "0"))
-                usd_to_inr = float(os.getenv("USD_TO_INR", "83.0"))
-            except Exception:
-                in_price = out_price = 0.0
-                usd_to_inr = 83.0
-            cost_usd = (prompt_tokens / 1000.0) * in_price + (completion_tokens / 1000.0) * out_price
-            cost_inr = cost_usd * usd_to_inr
-            self.total_cost_usd += cost_usd
-            self.total_cost_inr += cost_inr
+            usage = self._account_usage(getattr(resp, "usage", None))
 
             choice = resp.choices[0]
             msg = getattr(choice, "message", None)
@@ -314,56 +595,110 @@ class LLM:
                         "arguments": getattr(tc.function, "arguments", None) if getattr(tc, "function", None) else None,
                     })
 
-            self.last_raw = {
-                "finish_reason": choice.finish_reason,
-                "message_content": getattr(msg, "content", None),
-                "tool_calls": tool_calls,
-                "usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "cost_usd": round(cost_usd, 6),
-                    "cost_inr": round(cost_inr, 2),
-                    "total_cost_usd": round(self.total_cost_usd, 6),
-                    "total_cost_inr": round(self.total_cost_inr, 2),
-                },
-            }
+            content = getattr(msg, "content", None)
+            call = self._finish_turn(messages, choice.finish_reason, content, tool_calls, usage)
+            self._cache_store(key, choice.finish_reason, content, tool_calls, usage)
+            return call
 
-            # Prefer tool_calls if present
-            if tool_calls:
-                first = tool_calls[0]
-                self._last_tool_call_id = first.get("id")
-                args = {}
-                try:
-                    args = json.loads(first.get("arguments") or "{}")
-                except Exception:
-                    args = {}
-                return {"name": first.get("name"), "arguments": args}
+        except Exception as e:
+            # Surface the exception to your stream
+            self.last_raw = {"error": str(e)}
+            messages.append({"role": "assistant", "content": f"LLM error: {e}"})
+            return None
 
-            # Try to rescue a tool call from assistant text
-            assistant_text = getattr(msg, "content", None)
-            rescued = self._extract_tool_from_text(assistant_text or "")
-            if rescued:
-                return rescued
+    async def stream_tool_calls(self, messages: List[Dict[str,Any]]) -> AsyncGenerator[Dict[str,Any], None]:
+        """
+        Streaming variant of next_tool_call. Yields, in arrival order:
+          {"type": "delta", "text": ...}   partial assistant (planner) text
+          {"type": "call", "index": n, "call": {...}}   as soon as a tool call's
+                                           arguments form a complete JSON object
+          {"type": "done", "call": {...} | None}   what next_tool_call would return
+        State (last_raw, tool_call ids, cost totals) is the same as next_tool_call.
+        """
+        self._compact(messages)
+        if not self.api_key:
+            call = self._stub_call(messages)
+            yield {"type": "call", "index": 0, "call": call}
+            yield {"type": "done", "call": call}
+            return
+
+        key, entry = self._cache_lookup(messages)
+        if entry is not None:
+            if entry.get("content"):
+                yield {"type": "delta", "text": entry["content"]}
+            assembler = _ToolCallAssembler()
+            for index, tc in enumerate(entry.get("tool_calls") or []):
+                for i, done in assembler.feed(index, tc.get("id"), tc.get("name"), tc.get("arguments")):
+                    yield {"type": "call", "index": i, "call": done}
+            for index, done in assembler.flush():
+                yield {"type": "call", "index": index, "call": done}
+            yield {"type": "done", "call": self._cached_turn(messages, key, entry)}
+            return
 
-            # No tool call; append assistant text so the planner can iterate
-            messages.append({"role": "assistant", "content": assistant_text or ""})
-            return None
+        try:
+            client = get_async_client(self.api_key)
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=self._specs(),
+                tool_choice="auto",
+                temperature=self.config.temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            assembler = _ToolCallAssembler()
+            text_parts: List[str] = []
+            finish_reason = None
+            usage_obj = None
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage_obj = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+                if delta is None:
+                    continue
+                if getattr(delta, "content", None):
+                    text_parts.append(delta.content)
+                    yield {"type": "delta", "text": delta.content}
+                for tc in getattr(delta, "tool_calls", None) or []:
+                    fn = getattr(tc, "function", None)
+                    for index, done in assembler.feed(tc.index, tc.id, getattr(fn, "name", None),
+                                                      getattr(fn, "arguments", None)):
+                        yield {"type": "call", "index": index, "call": done}
+            for index, done in assembler.flush():
+                yield {"type": "call", "index": index, "call": done}
+
+            usage = self._account_usage(usage_obj)
+            content = "".join(text_parts) or None
+            raw_calls = assembler.raw_calls()
+            call = self._finish_turn(messages, finish_reason, content, raw_calls, usage)
+            self._cache_store(key, finish_reason, content, raw_calls, usage)
+            yield {"type": "done", "call": call}
 
         except Exception as e:
-            # Surface the exception to your stream
             self.last_raw = {"error": str(e)}
             messages.append({"role": "assistant", "content": f"LLM error: {e}"})
-            return None
+            yield {"type": "done", "call": None}
 
     # ----------------- Observe -----------------
     def observe(self, messages, tool_name, args, obs):
         payload = {"tool": tool_name, "args": args, "observation": obs}
-        # Only send a tool message when responding to a prior tool_call
-        if self._last_tool_call_id:
-            msg = {"role": "tool", "content": json.dumps(payload), "name": tool_name, "tool_call_id": self._last_tool_call_id}
-            self._last_tool_call_id = None
-            messages.append(msg)
+        # Only send tool messages when responding to prior tool_calls
+        if self._pending_tool_calls:
+            pending, self._pending_tool_calls = self._pending_tool_calls, []
+            results = (obs or {}).get("results") if tool_name == "multi_tool_use.parallel" else None
+            if len(pending) > 1 and isinstance(results, list) and len(results) == len(pending):
+                # One answer per tool_call_id, matched by position in the batch
+                for tc, res in zip(pending, results):
+                    item = {"tool": res.get("tool"), "args": res.get("args"), "observation": res.get("obs")}
+                    messages.append({"role": "tool", "content": json.dumps(item), "name": tc["name"], "tool_call_id": tc["id"]})
+            else:
+                for tc in pending:
+                    messages.append({"role": "tool", "content": json.dumps(payload), "name": tc["name"], "tool_call_id": tc["id"]})
         else:
             # No tool_call to respond to; provide a short assistant summary instead
             try:
@@ -0,0 +1,116 @@
+# apps/orchestrator/llm_cache.py
+from __future__ import annotations
+import hashlib, json, os, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def conversation_key(model: str, messages: List[Dict[str, Any]], tools: Any, temperature: float) -> str:
+    """sha256 over everything that decides the response; dict key order and whitespace don't matter."""
+    blob = json.dumps({"model": model, "messages": messages, "tools": tools, "temperature": temperature},
+                      sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Planner responses on disk, one JSON file per conversation key at
+    <root>/<key[:2]>/<key>.json, so repeated benchmark and test runs skip the
+    API. An entry older than `ttl_sec` is a miss (and is deleted). Every hit
+    touches the file's mtime; once the files pass `max_bytes` the least recently
+    used go first. Only finished turns (finish_reason "stop" or "tool_calls")
+    are stored.
+    """
+    def __init__(self, root: str = "data/llm_cache", ttl_sec: float = 7 * 86400, max_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root)
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self._bytes: Optional[int] = None  # counted on first store; other processes may add more
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evictions": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        if self.ttl_sec and time.time() - float(entry.get("stored_at", 0)) > self.ttl_sec:
+            self._remove(path)
+            with self._lock:
+                self.stats["misses"] += 1
+                self.stats["expired"] += 1
+            return None
+        try:
+            os.utime(path)  # recency for eviction
+        except OSError:
+            pass
+        with self._lock:
+            self.stats["hits"] += 1
+        return {**entry, "age_sec": round(time.time() - float(entry.get("stored_at", 0)), 3)}
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        path = self._path(key)
+        data = json.dumps({"key": key, "stored_at": time.time(), **response}, ensure_ascii=False, default=str)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old = path.stat().st_size if path.exists() else 0
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            return  # a cache that can't write just misses next time
+        with self._lock:
+            self.stats["stores"] += 1
+            if self._bytes is None:
+                self._bytes = self._scan_bytes()
+            else:
+                self._bytes += len(data.encode("utf-8")) - old
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _scan_bytes(self) -> int:
+        return sum(f.stat().st_size for f in self.root.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the total is back under max_bytes (lock held)."""
+        files = []
+        for f in self.root.glob("*/*.json"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if total <= self.max_bytes:
+                break
+            self._remove(f)
+            total -= size
+            self.stats["evictions"] += 1
+        self._bytes = total
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for f in self.root.glob("*/*.json"):
+                self._remove(f)
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "root": str(self.root), "bytes": self._bytes,
+                    "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0}
@@ -1,15 +1,115 @@
 # apps/orchestrator/llm_traced.py
 from __future__ import annotations
-import time, traceback
-from typing import Any
+import json, logging, random, time, traceback, uuid
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Optional
+
+from .llm import maybe_await
+from .policy import policy
+from .compaction import summarize_observation
+
+_CFG: dict[str, Any] = policy.cfg.get("trace", {}) or {}
+TRACE_CAPACITY = int(_CFG.get("capacity", 200))
+TRACE_SAMPLE_RATE = float(_CFG.get("sample_rate", 1.0))
+TRACE_MAX_FIELD_CHARS = int(_CFG.get("max_field_chars", 2000))
+_SPILL: dict[str, Any] = _CFG.get("spill", {}) or {}
+
+# Step events may be sampled away; bootstrap and errors are always kept
+_ALWAYS_KEEP = ("llm.bootstrap.begin", "llm.bootstrap.end", "llm.bootstrap.error", "llm.next.error", "llm.observe.error")
+_RAW_KEYS = ("finish_reason", "message_content", "tool_calls", "usage", "cost_usd", "cost_inr",
+             "prompt_tokens_est", "context", "path", "reason", "cache")
+
+
+def _clip(value: Any, limit: int, depth: int = 0) -> Any:
+    """Bounded copy of a JSON-ish value: long strings cut, long lists/dicts shortened."""
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + f"... [{len(value) - limit} chars]"
+    if depth >= 4:
+        return value if isinstance(value, (int, float, bool)) or value is None else f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        return {k: _clip(v, limit, depth + 1) for k, v in list(value.items())[:50]}
+    if isinstance(value, (list, tuple)):
+        items = [_clip(v, limit, depth + 1) for v in value[:20]]
+        return items + [f"... [{len(value) - 20} more]"] if len(value) > 20 else items
+    return value
+
+
+_spill_logger: Optional[logging.Logger] = None
+
+def _spill() -> Optional[logging.Logger]:
+    """Rotating JSONL file with untruncated records (trace.spill.enabled)."""
+    global _spill_logger
+    if _spill_logger is None and _SPILL.get("enabled"):
+        path = Path(_SPILL.get("path", "data/traces/llm_trace.jsonl"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=int(_SPILL.get("max_bytes", 10 * 1024 * 1024)),
+                                      backupCount=int(_SPILL.get("backups", 5)), encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        lg = logging.getLogger("desktop_operator.llm_trace")
+        lg.setLevel(logging.INFO)
+        lg.propagate = False
+        lg.addHandler(handler)
+        _spill_logger = lg
+    return _spill_logger
+
+
+class TraceBuffer:
+    """Fixed-capacity ring of compact trace records; old records fall off the front."""
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self._items: deque[dict[str, Any]] = deque(maxlen=max(1, capacity))
+        self.dropped = 0  # records pushed out by the ring
+        self.sampled_out = 0
+
+    def append(self, record: dict[str, Any]) -> None:
+        if len(self._items) == self._items.maxlen:
+            self.dropped += 1
+        self._items.append(record)
+
+    def tail(self, n: int = 1) -> list[dict[str, Any]]:
+        n = min(n, len(self._items))
+        return [self._items[-i] for i in range(n, 0, -1)]
+
+    def last(self) -> Optional[dict[str, Any]]:
+        return self._items[-1] if self._items else None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
 
 class TracedLLM:
-    def __init__(self, inner_llm):
+    def __init__(self, inner_llm, capacity: int = TRACE_CAPACITY, sample_rate: float = TRACE_SAMPLE_RATE,
+                 max_field_chars: int = TRACE_MAX_FIELD_CHARS):
         self.inner = inner_llm
-        self.trace: list[dict[str, Any]] = []
+        self.session_id = uuid.uuid4().hex[:12]
+        self.trace = TraceBuffer(capacity)
+        self.sample_rate = sample_rate
+        self.max_field_chars = max_field_chars
 
     def _log(self, evt: str, **data):
-        self.trace.append({"ts": time.time(), "evt": evt, **data})
+        spill = _spill()
+        if spill is not None:
+            spill.info(json.dumps({"ts": time.time(), "session": self.session_id, "evt": evt, **data},
+                                  ensure_ascii=False, default=str))
+        if self.sample_rate < 1.0 and evt not in _ALWAYS_KEEP and random.random() >= self.sample_rate:
+            self.trace.sampled_out += 1
+            return
+        self.trace.append({"ts": time.time(), "evt": evt, **self._compact(data)})
+
+    def _compact(self, data: dict[str, Any]) -> dict[str, Any]:
+        limit = self.max_field_chars
+        out: dict[str, Any] = {}
+        for k, v in data.items():
+            if k == "obs":
+                v = summarize_observation(v)
+            elif k == "last_raw" and isinstance(v, dict):
+                v = {rk: v[rk] for rk in _RAW_KEYS if rk in v}
+            out[k] = _clip(v, limit)
+        return out
 
     # ---- same API as your LLM ----
     def bootstrap(self, goal: str, dry_run: bool, budget_rupees: int | None):
@@ -23,10 +123,10 @@ class TracedLLM:
             self._log("llm.bootstrap.error", ok=False, error=str(e), tb=traceback.format_exc())
             raise
 
-    def next_tool_call(self, messages: list[dict]):
+    async def next_tool_call(self, messages: list[dict]):
         self._log("llm.next.begin", last_user=next((m for m in reversed(messages) if m.get("role") in {"user","system"}), None))
         try:
-            call = self.inner.next_tool_call(messages)
+            call = await maybe_await(self.inner.next_tool_call(messages))
             # Capture raw text if your inner LLM exposes it (optional)
             raw = getattr(self.inner, "last_raw", None)
             self._log("llm.next.end", ok=True, call=call, last_raw=raw)
@@ -35,6 +135,27 @@ class TracedLLM:
             self._log("llm.next.error", ok=False, error=str(e), tb=traceback.format_exc())
             raise
 
+    async def stream_tool_calls(self, messages: list[dict]):
+        self._log("llm.next.begin", stream=True, last_user=next((m for m in reversed(messages) if m.get("role") in {"user","system"}), None))
+        call = None
+        try:
+            if hasattr(self.inner, "stream_tool_calls"):
+                async for ev in self.inner.stream_tool_calls(messages):
+                    if ev.get("type") == "done":
+                        call = ev.get("call")
+                    yield ev
+            else:
+                # Inner LLM can't stream: behave like one non-streamed turn
+                call = await maybe_await(self.inner.next_tool_call(messages))
+                if call:
+                    yield {"type": "call", "index": 0, "call": call}
+                yield {"type": "done", "call": call}
+            raw = getattr(self.inner, "last_raw", None)
+            self._log("llm.next.end", ok=True, stream=True, call=call, last_raw=raw)
+        except Exception as e:
+            self._log("llm.next.error", ok=False, error=str(e), tb=traceback.format_exc())
+            raise
+
     def observe(self, messages: list[dict], tool_name: str, args: dict, obs: dict):
         self._log("llm.observe", tool=tool_name, args=args, obs=obs)
         try:
@@ -44,6 +165,10 @@ class TracedLLM:
             self._log("llm.observe.error", ok=False, error=str(e), tb=traceback.format_exc())
             raise
 
+    # O(1) access for the stream: the last record(s) without copying the buffer
+    def trace_tail(self, n: int = 1) -> list[dict]:
+        return self.trace.tail(n)
+
     # optional: expose trace so the runner can include it in results/stream
     def dump_trace(self) -> list[dict]:
         return list(self.trace)
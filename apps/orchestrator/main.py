@@ -24,45 +24,100 @@ from loguru import logger
 
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from loguru import logger
 from pathlib import Path
 
-from .tools.registry import TOOL_REGISTRY, get_tool
+from .tools.registry import tool_import_report
+from .compaction import HINT_PREFIX
 from .policy import policy
-from .llm import LLM
+from .dispatch import RunContext, run_tool
+from .scheduler import conflicts, resource_keys, run_dag
+from .leases import lease_manager
+from .approvals import close_channel, get_channel, open_channel
+from .executors import pools_snapshot, shutdown_pools
+from .tool_timeouts import latency_histograms, timeout_policy
+from .warmup import warmup_stats
+from .streams import (DEFAULT_VERBOSITY, STREAM_RETRY_MS, VERBOSITY_LEVELS, GzipFrames,
+                      stream_hub, summarize_steps, view_event)
+from .metrics import router as metrics_router
+from .jobs import Job, QueueFull, make_job_queue
+from .batches import make_batch_runner
+from .replay import ReplayLLM, load_recording
+from .plan_cache import plan_cache
+from .llm import LLM, aclose_clients, llm_config, maybe_await, usage_totals
 
 # If you saved TracedLLM as apps/orchestrator/llm_traced.py:
 from .llm_traced import TracedLLM
-from functools import lru_cache
 
 app = FastAPI()
+app.include_router(metrics_router)
 
 logger = logging.getLogger("uvicorn.error")  # prints into uvicorn console
 
 @app.on_event("startup")
 async def startup_event():
-    from . import llm
-    client = get_llm()
-    if client:
-        logger.info(f"✅ LLM initialized at startup with model {os.getenv('OPENAI_MODEL', 'gpt-4o-mini')}")
+    if llm_config().api_key:
+        logger.info(f"✅ LLM initialized at startup with model {llm_config().model}")
     else:
         logger.error("❌ LLM not initialized (missing OPENAI_API_KEY?)")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await batch_runner.shutdown()
+    await job_queue.shutdown()
+    await stream_hub.shutdown()
+    await aclose_clients()
+    shutdown_pools()
+    latency_histograms.flush()
+
 # ---------- UI (optional) ----------
 @app.get("/ui", response_class=HTMLResponse)
 def ui():
     html_path = Path(__file__).with_name("ui.html")
     return HTMLResponse(html_path.read_text(encoding="utf-8"))
 
+# ---------- Tool imports (lazy registry) ----------
+@app.get("/tools/imports")
+def tool_imports():
+    """Which tools have been imported so far, what each import cost, and any import errors."""
+    return tool_import_report()
+
+@app.get("/leases")
+def leases():
+    """Resource leases currently held across runs, capacities and wait totals."""
+    return lease_manager.snapshot()
+
+@app.get("/tools/latency")
+def tool_latency():
+    """Per-tool latency history (n, p50, p99, timeouts) and the timeout each tool currently gets."""
+    return timeout_policy.report()
+
+@app.get("/warmup")
+def warmup_report():
+    """Speculative warm-ups per backend: hits, misses and the cold-start time they saved."""
+    return {"ok": True, "backends": warmup_stats.snapshot()}
+
+@app.get("/executors")
+def executors():
+    """Tool executor pools: size, calls running and calls queued (also exported on /metrics)."""
+    return pools_snapshot()
+
 # ---------- LLM DI ----------
-@lru_cache
 def get_llm():
+    # One session per run: tool_call ids, last_raw and the trace never mix across
+    # concurrent runs. The OpenAI connection pool and LLMConfig stay process-wide.
     base = LLM()
     return TracedLLM(base)   # always wrap so dump_trace() exists
 
+@app.get("/llm/usage")
+def llm_usage():
+    """Token and cost totals across all runs since the process started, plus response cache counters."""
+    cache = llm_config().response_cache
+    return {**usage_totals.snapshot(), "response_cache": cache.snapshot() if cache else None}
+
 # ---------- Request model ----------
 class TaskRequest(BaseModel):
     goal: str
@@ -131,364 +186,622 @@ def _parse_inline_plan_text(goal_text: str) -> list[dict]:
     return calls
 
 # ---------- Helpers ----------
-def _sse(data: dict) -> bytes:
-    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
-
-# ---------- Batch endpoint (existing /tasks/run) ----------
-@app.post("/tasks/run")
-async def run_task(req: TaskRequest, llm: TracedLLM = Depends(get_llm)):
-    print("=== ENTERING run_task ===")
+def _sse(data: dict, event_id: int | None = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+def _parallel_limit(req: TaskRequest) -> int:
+    """Max calls of one batch (multi_tool_use.parallel or inline plan) that may run at once."""
+    limits = policy.cfg.get("limits", {}) or {}
+    return max(1, int((req.options or {}).get("max_parallel_tools", limits.get("max_parallel_tools", 4))))
+
+async def _run_parallel(tool_uses: list[dict], timeout: float | None, limit: int, ctx: RunContext,
+                        started: dict[int, asyncio.Task] | None = None,
+                        fail_fast: bool = False) -> AsyncGenerator[tuple[int, dict], None]:
+    """
+    Run the micro-calls of a multi_tool_use.parallel batch as a dependency graph
+    (see scheduler.run_dag): calls touching the same resource keep the planner's
+    order, independent ones run concurrently, at most `limit` at a time, each
+    under its own timeout (`timeout_sec` on the entry overrides `timeout`, and
+    without either the tool's learned timeout applies).
+    Yields (index, result) as each call finishes so callers can stream progress
+    and still rebuild the original order. Calls cut off by a stop signal (or by
+    `fail_fast`) are not run and yield nothing.
+    `started` holds calls already dispatched early by a streaming planner.
+    """
+    # strip any namespace like "functions."
+    calls = [{"name": (m.get("recipient_name") or "").removeprefix("functions."),
+              "arguments": dict(m.get("parameters") or {})} for m in tool_uses]
+
+    async def one(idx: int, call: dict) -> dict:
+        return await run_tool(call["name"], call["arguments"], tool_uses[idx].get("timeout_sec") or timeout, ctx)
+
+    async for kind, idx, micro_obs in run_dag(calls, one, limit, fail_fast, started):
+        if kind == "done":
+            yield idx, {"tool": tool_uses[idx].get("recipient_name") or "", "args": calls[idx]["arguments"], "obs": micro_obs}
+
+# ---------- Agent loop (shared by /tasks/run, /tasks/run_stream and background jobs) ----------
+def _run_limits(req: TaskRequest) -> tuple[int, float]:
     defaults = policy.defaults() or {}
+    limits = policy.cfg.get("limits", {}) or {}
     max_steps = int((req.options or {}).get("max_steps", defaults.get("max_total_steps", 40)))
-    per_tool_runtime_sec = int(defaults.get("max_tool_runtime_sec", 120))
-    overall_time_budget = max_steps * per_tool_runtime_sec
-
-    print("Hello from main function")
-
-    start_ts = time.time()
+    # per-tool timeouts come from tool_timeouts.timeout_policy; this caps the whole run
+    max_minutes = float((req.options or {}).get("max_minutes", limits.get("max_minutes", 20)))
+    return max_steps, max_minutes
+
+async def _agent_events(req: TaskRequest, llm, ctx: RunContext, stream_llm: bool = False) -> AsyncGenerator[dict, None]:
+    """
+    Run the plan/act/observe loop for one goal and yield progress events
+    (agent.start ... agent.end). The final result dict is left on `ctx.result`.
+    With `stream_llm` the planner is consumed incrementally: the first tool call
+    starts as soon as its arguments are complete, while the rest of the response
+    still arrives. A later call starts early only if it shares no resource with the
+    calls before it (scheduler.resource_keys); otherwise it is left to the batch.
+    """
+    max_steps, max_minutes = _run_limits(req)
+    overall_time_budget = max_minutes * 60
+    if ctx.deadline is None:
+        ctx.deadline = time.monotonic() + overall_time_budget
+    stream_llm = stream_llm and hasattr(llm, "stream_tool_calls")
+    trace_tail = getattr(llm, "trace_tail", None) or (lambda n=1: getattr(llm, "dump_trace", lambda: [])()[-n:])
     steps: list[dict] = []
     traces: list[str] = []
+    failure: str | None = None
+    recorder = ctx.recorder
+    if recorder is not None:
+        recorder.start(req.goal, req.dry_run, req.options, req.budget_rupees)
+    yield {"evt":"agent.start","run_id":ctx.run_id,"goal":req.goal,"dry_run":req.dry_run,"options":req.options}
 
     # Bootstrap conversation
     try:
         messages = llm.bootstrap(req.goal, req.dry_run, req.budget_rupees)
         print("LLM bootstrap successful")
+        if recorder is not None:
+            recorder.bootstrap(messages)
+        if ctx.channel is not None and ctx.channel.tools:
+            # the gate in run_tool asks the human; the model need not stop to ask in text
+            messages.append({"role": "system", "content": (
+                "A human reviews these tools before they run: " + ", ".join(sorted(ctx.channel.tools)) + ". "
+                "Call them directly instead of asking for approval in text; a rejected call comes back "
+                "as an error observation with the reviewer's reason.")})
+        tail = trace_tail(1)
+        yield {"evt":"llm.bootstrap","tail": tail[-1] if tail else None}
     except Exception as e:
         print(f"LLM bootstrap failed: {e}")
         logger.exception("LLM bootstrap failed")
-        return {"ok": False, "error": f"llm_bootstrap_failed: {e}"}
-
-    for i in range(max_steps):
-        if time.time() - start_ts > overall_time_budget:
-            print("Time budget exceeded; stopping.")
-            logger.warning("Time budget exceeded; stopping.")
-            break
-
-        try:
-            call = llm.next_tool_call(messages)
-            print(f"LLM next_tool_call result: {call}")
-        except Exception as e:
-            print(f"LLM next_tool_call failed: {e}")
-            logger.exception("LLM next_tool_call failed")
-            return {"ok": False, "error": f"llm_next_tool_call_failed: {e}"}
-
-        if not call:
-            # Inline plan fallback on first iteration
-            if i == 0:
-                inline_calls = _parse_inline_plan_text(req.goal or "")
-                if inline_calls:
-                    print(f"Planner empty; executing {len(inline_calls)} inline step(s).")
-                    logger.info(f"Planner empty; executing {len(inline_calls)} inline step(s).")
-                    for micro in inline_calls:
-                        tool_name = micro["name"]
-                        args = dict(micro.get("arguments") or {})
-                        print(f"Executing inline tool: {tool_name} with args: {args}")
-                        if tool_name == "browser.execute":
-                            prof = (req.options or {}).get("profile")
-                            if prof and "profile" not in args:
-                                args["profile"] = prof
-                        tool, matched_name = get_tool(tool_name, TOOL_REGISTRY)
-                        if not tool:
-                            print(f"Tool not found: {tool_name}")
-                            obs = {"ok": False, "error": f"unknown_tool: {tool_name}"}
-                        else:
-                            print(f"Tool found: {matched_name}")
-                            try:
-                                if asyncio.iscoroutinefunction(tool):
-                                    obs = await asyncio.wait_for(tool(**args), timeout=per_tool_runtime_sec)
-                                else:
-                                    loop = asyncio.get_event_loop()
-                                    obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**args)),
-                                                                 timeout=per_tool_runtime_sec)
-                                print(f"Tool {matched_name} result: {obs}")
-                            except asyncio.TimeoutError:
-                                print(f"Tool {matched_name} timed out")
-                                obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                            except Exception as e:
-                                print(f"Tool {matched_name} failed: {e}")
-                                logger.exception(f"tool {tool_name} failed (inline)")
-                                obs = {"ok": False, "error": f"tool_error: {e}"}
-                        try:
-                            messages = llm.observe(messages, tool_name, args, obs)
-                        except Exception:
-                            pass
-                        steps.append({"tool": tool_name, "args": args, "obs": obs})
-                        if obs.get("ok") and obs.get("stop"):
-                            break
-                    break
-            print("No tool call returned, ending.")
-            logger.info("No tool call returned, ending.")
-            break
-
-        tool_name = call.get("name")
-        args = call.get("arguments", {}) or {}
-        print(f"[step {i+1}/{max_steps}] {tool_name}({args})")
-        logger.info(f"[step {i+1}/{max_steps}] {tool_name}({args})")
-
-        # Dispatch
-        if tool_name == "multi_tool_use.parallel":
-            print("Handling multi_tool_use.parallel")
-            # Expand and run tools sequentially
-            obs_results = []
-            tool_uses = (args or {}).get("tool_uses") or []
-            for micro in tool_uses:
-                rname = micro.get("recipient_name") or ""
-                params = dict(micro.get("parameters") or {})
-                # strip any namespace like "functions."
-                short = rname.split(".")[-1]
-                print(f"Looking up tool: {short}")
-                tool, matched_name = get_tool(short, TOOL_REGISTRY)
-                if not tool:
-                    print(f"Tool not found: {short}")
-                    micro_obs = {"ok": False, "error": f"unknown_tool: {rname}"}
-                else:
-                    print(f"Tool found: {matched_name}")
-                    try:
-                        if asyncio.iscoroutinefunction(tool):
-                            micro_obs = await asyncio.wait_for(tool(**params), timeout=per_tool_runtime_sec)
-                        else:
-                            loop = asyncio.get_event_loop()
-                            micro_obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**params)),
-                                                               timeout=per_tool_runtime_sec)
-                        print(f"Tool {matched_name} result: {micro_obs}")
-                    except asyncio.TimeoutError:
-                        print(f"Tool {matched_name} timed out")
-                        micro_obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                    except Exception as e:
-                        print(f"Tool {matched_name} failed: {e}")
-                        logger.exception(f"tool {rname} failed")
-                        micro_obs = {"ok": False, "error": f"tool_error: {e}"}
-                obs_results.append({"tool": rname, "args": params, "obs": micro_obs})
-            # Respond once to the original parallel call to satisfy tool_call contract
-            obs = {"ok": True, "parallel": True, "results": obs_results}
-        else:
-            print(f"Looking up tool: {tool_name}")
-            tool, matched_name = get_tool(tool_name, TOOL_REGISTRY)
-            if not tool:
-                print(f"Tool not found: {tool_name}")
-                obs = {"ok": False, "error": f"unknown_tool: {tool_name}"}
-            else:
-                print(f"Tool found: {matched_name}")
-                try:
-                    if asyncio.iscoroutinefunction(tool):
-                        obs = await asyncio.wait_for(tool(**args), timeout=per_tool_runtime_sec)
-                    else:
-                        loop = asyncio.get_event_loop()
-                        obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**args)),
-                                                     timeout=per_tool_runtime_sec)
-                    print(f"Tool {matched_name} result: {obs}")
-                except asyncio.TimeoutError:
-                    print(f"Tool {matched_name} timed out")
-                    obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                except Exception as e:
-                    print(f"Tool {matched_name} failed: {e}")
-                    logger.exception(f"tool {tool_name} failed")
-                    obs = {"ok": False, "error": f"tool_error: {e}"}
-
-        try:
-            messages = llm.observe(messages, tool_name, args, obs)
-            print("LLM observe successful")
-        except Exception as e:
-            print(f"LLM observe failed: {e}")
-            logger.exception("LLM observe failed")
-            return {"ok": False, "error": f"llm_observe_failed: {e}"}
-
-        steps.append({"tool": tool_name, "args": args, "obs": obs})
-        if obs.get("ok") and obs.get("stop"):
-            print("Received stop signal from tool observation.")
-            logger.info("Received stop signal from tool observation.")
-            break
-
-    print("=== EXITING run_task ===")
-    return {
-        "ok": True,
-        "goal": req.goal,
-        "dry_run": req.dry_run,
-        "steps": steps,
-        "used_max_steps": len(steps),
-        "limits": {"max_steps": max_steps, "per_tool_runtime_sec": per_tool_runtime_sec},
-        "llm_trace_tail": getattr(llm, "dump_trace", lambda: [])()[-3:],  # helpful on planner silence
-        "traces": traces,
-    }
-
-# ---------- Streaming endpoint (live trace to UI) ----------
-@app.post("/tasks/run_stream")
-async def run_task_stream(req: TaskRequest, llm: TracedLLM = Depends(get_llm)):
-    print("=== ENTERING run_task_stream ===")
-    defaults = policy.defaults() or {}
-    max_steps = int((req.options or {}).get("max_steps", defaults.get("max_total_steps", 40)))
-    per_tool_runtime_sec = int(defaults.get("max_tool_runtime_sec", 120))
-    overall_time_budget = max_steps * per_tool_runtime_sec
-
-    async def gen() -> AsyncGenerator[bytes, None]:
-        print("=== ENTERING run_task_stream generator ===")
-        start_ts = time.time()
-        steps: list[dict] = []
-        traces: list[str] = []
-        yield _sse({"evt":"agent.start","goal":req.goal,"dry_run":req.dry_run,"options":req.options})
-
-        # Bootstrap
-        try:
-            messages = llm.bootstrap(req.goal, req.dry_run, req.budget_rupees)
-            print("LLM bootstrap successful (stream)")
-            tail = llm.dump_trace()[-1] if llm.dump_trace() else None
-            yield _sse({"evt":"llm.bootstrap","tail": tail})
-        except Exception as e:
-            print(f"LLM bootstrap failed (stream): {e}")
-            yield _sse({"evt":"error","where":"bootstrap","error":str(e)})
-            yield _sse({"evt":"agent.end","ok":False})
-            return
-
+        ctx.result = {"ok": False, "error": f"llm_bootstrap_failed: {e}"}
+        yield {"evt":"error","where":"bootstrap","error":str(e)}
+        yield {"evt":"agent.end","ok":False}
+        return
+
+    # A cached plan for this goal template runs without the planner until an observation differs
+    plan = plan_cache.lookup(req.goal, req.dry_run) if ctx.plan_cache_enabled else None
+    if plan is not None:
+        yield {"evt":"plan_cache.hit","template":plan.template,"steps":len(plan.entry["steps"])}
+    decisions: list[tuple[dict, int, Any]] = []  # (call, planner tokens, obs) for the plan cache
+    finished = False  # the planner said done (or a tool sent stop)
+
+    early: dict[int, tuple[str, asyncio.Task]] = {}
+    try:
         for i in range(max_steps):
-            if time.time() - start_ts > overall_time_budget:
-                print("Time budget exceeded (stream); stopping.")
-                yield _sse({"evt":"agent.timeout","after_sec": overall_time_budget})
+            if ctx.remaining_sec() <= 0:
+                print("Time budget exceeded; stopping.")
+                logger.warning("Time budget exceeded; stopping.")
+                yield {"evt":"agent.timeout","after_sec": overall_time_budget}
                 break
 
+            if ctx.channel is not None:
+                # hints sent mid-run join the same conversation before the next turn
+                for hint in ctx.channel.take_hints():
+                    messages.append({"role": "user", "content": f"{HINT_PREFIX}{hint}"})
+                    yield {"evt":"hint.applied","step":i+1,"text":hint}
+
+            early = {}
+            ready_keys: dict[int, list] = {}
+            decide_ts = time.perf_counter()
+            from_plan = plan is not None and plan.active
+            if ctx.warmup is not None and ctx.replay is None and not from_plan:
+                # backends the goal or the last calls point at get ready while the model thinks
+                ctx.warmup.speculate(req.goal, [s["tool"] for s in steps], req.dry_run)
             try:
-                call = llm.next_tool_call(messages)
-                print(f"LLM next_tool_call result (stream): {call}")
-                yield _sse({"evt":"llm.next","step":i+1,"call":call})
+                if from_plan:
+                    call = plan.next_call()
+                elif stream_llm:
+                    call = None
+                    async for ev in llm.stream_tool_calls(messages):
+                        if ev["type"] == "delta":
+                            yield {"evt":"llm.delta","step":i+1,"text":ev["text"]}
+                        elif ev["type"] == "call" and ev["index"] not in early:
+                            ready = ev["call"] or {}
+                            name = ready.get("name")
+                            early_args = ready.get("arguments") or {}
+                            keys = ready_keys[ev["index"]] = resource_keys(name or "", early_args)
+                            independent = all(n in ready_keys and not conflicts(ready_keys[n], keys) for n in range(ev["index"]))
+                            if name and name != "multi_tool_use.parallel" and independent:
+                                yield {"evt":"tool.dispatch","step":i+1,"tool":name,"args":early_args,"early":True}
+                                early[ev["index"]] = (name, asyncio.create_task(run_tool(name, early_args, None, ctx)))
+                        elif ev["type"] == "done":
+                            call = ev["call"]
+                else:
+                    call = await maybe_await(llm.next_tool_call(messages))
+                print(f"LLM next_tool_call result: {call}")
+                raw = {} if from_plan else (getattr(getattr(llm, "inner", llm), "last_raw", None) or {})
+                call_tokens = plan.last_tokens if from_plan else int((raw.get("usage") or {}).get("total_tokens") or 0)
+                if recorder is not None:
+                    recorder.decision(i+1, call, (time.perf_counter() - decide_ts) * 1000, raw.get("usage"))
+                yield {"evt":"llm.next","step":i+1,"call":call,**({"from_plan": True} if from_plan else {})}
             except Exception as e:
-                print(f"LLM next_tool_call failed (stream): {e}")
-                yield _sse({"evt":"error","where":"next_tool_call","error":str(e)})
+                print(f"LLM next_tool_call failed: {e}")
+                logger.exception("LLM next_tool_call failed")
+                for _, task in early.values():
+                    task.cancel()
+                failure = f"llm_next_tool_call_failed: {e}"
+                yield {"evt":"error","where":"next_tool_call","error":str(e)}
                 break
 
+            # Keep only early calls that match the final turn (it may differ, e.g. rescued from text)
+            if call and call.get("name") == "multi_tool_use.parallel":
+                final_names = {n: (m.get("recipient_name") or "") for n, m in enumerate((call.get("arguments") or {}).get("tool_uses") or [])}
+            else:
+                final_names = {0: (call or {}).get("name")}
+            for idx, (name, task) in list(early.items()):
+                if final_names.get(idx) != name:
+                    task.cancel()
+                    del early[idx]
+            early_task = early[0][1] if early and call and call.get("name") != "multi_tool_use.parallel" else None
+
             if not call:
-                # Inline plan fallback (first loop)
+                # Inline plan fallback on first iteration
                 if i == 0:
                     inline_calls = _parse_inline_plan_text(req.goal or "")
                     if inline_calls:
-                        print(f"Planner empty; executing {len(inline_calls)} inline step(s) (stream).")
-                        yield _sse({"evt":"planner.fallback","count":len(inline_calls)})
+                        print(f"Planner empty; executing {len(inline_calls)} inline step(s).")
+                        logger.info(f"Planner empty; executing {len(inline_calls)} inline step(s).")
+                        yield {"evt":"planner.fallback","count":len(inline_calls)}
                         for micro in inline_calls:
-                            tool_name = micro["name"]
-                            args = dict(micro.get("arguments") or {})
-                            print(f"Executing inline tool (stream): {tool_name} with args: {args}")
-                            if tool_name == "browser.execute":
+                            micro["arguments"] = dict(micro.get("arguments") or {})
+                            if micro["name"] == "browser.execute":
                                 prof = (req.options or {}).get("profile")
-                                if prof and "profile" not in args:
-                                    args["profile"] = prof
-                            yield _sse({"evt":"tool.dispatch","step":i+1,"tool":tool_name,"args":args})
-                            tool, matched_name = get_tool(tool_name, TOOL_REGISTRY)
-                            if not tool:
-                                print(f"Tool not found (stream): {tool_name}")
-                                obs = {"ok": False, "error": f"unknown_tool: {tool_name}"}
+                                if prof and "profile" not in micro["arguments"]:
+                                    micro["arguments"]["profile"] = prof
+
+                        async def run_inline(idx: int, micro: dict) -> dict:
+                            print(f"Executing inline tool: {micro['name']} with args: {micro['arguments']}")
+                            return await run_tool(micro["name"], micro["arguments"], None, ctx)
+
+                        inline_obs: dict[int, dict] = {}
+                        async for kind, idx, obs in run_dag(inline_calls, run_inline, _parallel_limit(req),
+                                                            (req.options or {}).get("fail_fast", False)):
+                            micro = inline_calls[idx]
+                            if kind == "start":
+                                yield {"evt":"tool.dispatch","step":i+1,"index":idx,"tool":micro["name"],"args":micro["arguments"]}
                             else:
-                                print(f"Tool found (stream): {matched_name}")
-                                try:
-                                    if asyncio.iscoroutinefunction(tool):
-                                        obs = await asyncio.wait_for(tool(**args), timeout=per_tool_runtime_sec)
-                                    else:
-                                        loop = asyncio.get_event_loop()
-                                        obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**args)),
-                                                                     timeout=per_tool_runtime_sec)
-                                    print(f"Tool {matched_name} result (stream): {obs}")
-                                except asyncio.TimeoutError:
-                                    print(f"Tool {matched_name} timed out (stream)")
-                                    obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                                except Exception as e:
-                                    print(f"Tool {matched_name} failed (stream): {e}")
-                                    obs = {"ok": False, "error": f"tool_error: {e}"}
-                            yield _sse({"evt":"tool.obs","step":i+1,"tool":tool_name,"obs":obs})
-                            steps.append({"tool": tool_name, "args": args, "obs": obs})
+                                inline_obs[idx] = obs
+                                yield {"evt":"tool.obs","step":i+1,"index":idx,"inline":True,"tool":micro["name"],"obs":obs}
+                        # observe in plan order, whatever order the calls finished in
+                        for idx in sorted(inline_obs):
+                            micro, obs = inline_calls[idx], inline_obs[idx]
+                            steps.append({"tool": micro["name"], "args": micro["arguments"], "obs": obs})
                             try:
-                                messages = llm.observe(messages, tool_name, args, obs)
-                                print("LLM observe successful (stream)")
-                                yield _sse({"evt":"llm.observe","step":i+1})
+                                messages = llm.observe(messages, micro["name"], micro["arguments"], obs)
+                                yield {"evt":"llm.observe","step":i+1}
                             except Exception:
-                                print("LLM observe failed (stream)")
                                 pass
                             if obs.get("ok") and obs.get("stop"):
-                                print("Received stop signal (stream)")
-                                yield _sse({"evt":"agent.stop_signal"})
+                                yield {"evt":"agent.stop_signal"}
                                 break
                         break
-                print("No tool call returned (stream), ending.")
-                yield _sse({"evt":"llm.silent","last": (llm.dump_trace()[-1] if llm.dump_trace() else None)})
+                finished = True
+                print("No tool call returned, ending.")
+                logger.info("No tool call returned, ending.")
+                tail = trace_tail(1)
+                yield {"evt":"llm.silent","last": tail[-1] if tail else None}
                 break
 
             tool_name = call.get("name")
             args = call.get("arguments", {}) or {}
-            print(f"[step {i+1}/{max_steps}] {tool_name}({args}) (stream)")
-            yield _sse({"evt":"tool.dispatch","step":i+1,"tool":tool_name,"args":args})
+            print(f"[step {i+1}/{max_steps}] {tool_name}({args})")
+            logger.info(f"[step {i+1}/{max_steps}] {tool_name}({args})")
+            if early_task is None:
+                yield {"evt":"tool.dispatch","step":i+1,"tool":tool_name,"args":args}
 
+            # Dispatch
             if tool_name == "multi_tool_use.parallel":
-                print("Handling multi_tool_use.parallel (stream)")
-                obs_results = []
+                print("Handling multi_tool_use.parallel")
                 tool_uses = (args or {}).get("tool_uses") or []
-                for micro in tool_uses:
-                    rname = micro.get("recipient_name") or ""
-                    params = dict(micro.get("parameters") or {})
-                    short = rname.split(".")[-1]
-                    print(f"Looking up tool (stream): {short}")
-                    yield _sse({"evt":"tool.dispatch","step":i+1,"tool":short,"args":params})
-                    tool, matched_name = get_tool(short, TOOL_REGISTRY)
-                    if not tool:
-                        print(f"Tool not found (stream): {short}")
-                        micro_obs = {"ok": False, "error": f"unknown_tool: {rname}"}
-                    else:
-                        print(f"Tool found (stream): {matched_name}")
-                        try:
-                            if asyncio.iscoroutinefunction(tool):
-                                micro_obs = await asyncio.wait_for(tool(**params), timeout=per_tool_runtime_sec)
-                            else:
-                                loop = asyncio.get_event_loop()
-                                micro_obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**params)),
-                                                                   timeout=per_tool_runtime_sec)
-                            print(f"Tool {matched_name} result (stream): {micro_obs}")
-                        except asyncio.TimeoutError:
-                            print(f"Tool {matched_name} timed out (stream)")
-                            micro_obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                        except Exception as e:
-                            print(f"Tool {matched_name} failed (stream): {e}")
-                            micro_obs = {"ok": False, "error": f"tool_error: {e}"}
-                    obs_results.append({"tool": rname, "args": params, "obs": micro_obs})
-                    yield _sse({"evt":"tool.obs","step":i+1,"tool":short,"obs":micro_obs})
-                    steps.append({"tool": short, "args": params, "obs": micro_obs})
-                # Respond once to the original parallel call
+                for idx, micro in enumerate(tool_uses):
+                    if idx not in early:
+                        short = (micro.get("recipient_name") or "").removeprefix("functions.")
+                        yield {"evt":"tool.dispatch","step":i+1,"tool":short,"args":dict(micro.get("parameters") or {})}
+                obs_results: list[dict] = [{} for _ in tool_uses]
+                started = {idx: task for idx, (_, task) in early.items()}
+                async for idx, result in _run_parallel(tool_uses, None, _parallel_limit(req), ctx, started,
+                                                       (req.options or {}).get("fail_fast", False)):
+                    obs_results[idx] = result
+                    yield {"evt":"tool.obs","step":i+1,"index":idx,"tool":result["tool"].removeprefix("functions."),"obs":result["obs"]}
+                # Respond once to the original parallel call to satisfy tool_call contract
                 obs = {"ok": True, "parallel": True, "results": obs_results}
+            elif early_task is not None:
+                obs = await early_task
             else:
-                print(f"Looking up tool (stream): {tool_name}")
-                tool, matched_name = get_tool(tool_name, TOOL_REGISTRY)
-                if not tool:
-                    print(f"Tool not found (stream): {tool_name}")
-                    obs = {"ok": False, "error": f"unknown_tool: {tool_name}"}
-                else:
-                    print(f"Tool found (stream): {matched_name}")
-                    try:
-                        if asyncio.iscoroutinefunction(tool):
-                            obs = await asyncio.wait_for(tool(**args), timeout=per_tool_runtime_sec)
-                        else:
-                            loop = asyncio.get_event_loop()
-                            obs = await asyncio.wait_for(loop.run_in_executor(None, lambda: tool(**args)),
-                                                         timeout=per_tool_runtime_sec)
-                        print(f"Tool {matched_name} result (stream): {obs}")
-                    except asyncio.TimeoutError:
-                        print(f"Tool {matched_name} timed out (stream)")
-                        obs = {"ok": False, "error": f"tool_timeout_{per_tool_runtime_sec}s"}
-                    except Exception as e:
-                        print(f"Tool {matched_name} failed (stream): {e}")
-                        obs = {"ok": False, "error": f"tool_error: {e}"}
-
-            yield _sse({"evt":"tool.obs","step":i+1,"tool":tool_name,"obs":obs})
+                obs = await run_tool(tool_name, args, None, ctx)
+
+            yield {"evt":"tool.obs","step":i+1,"tool":tool_name,"obs":obs}
             steps.append({"tool": tool_name, "args": args, "obs": obs})
+            decisions.append((call, call_tokens, obs))
+            if from_plan and not plan.check(i+1, obs):
+                yield {"evt":"plan_cache.fallback","step":i+1}
 
             try:
                 messages = llm.observe(messages, tool_name, args, obs)
-                print("LLM observe successful (stream)")
-                yield _sse({"evt":"llm.observe","step":i+1})
+                print("LLM observe successful")
+                yield {"evt":"llm.observe","step":i+1}
             except Exception as e:
-                print(f"LLM observe failed (stream): {e}")
-                yield _sse({"evt":"error","where":"observe","error":str(e)})
+                print(f"LLM observe failed: {e}")
+                logger.exception("LLM observe failed")
+                failure = f"llm_observe_failed: {e}"
+                yield {"evt":"error","where":"observe","error":str(e)}
                 break
 
             if obs.get("ok") and obs.get("stop"):
-                print("Received stop signal (stream)")
-                yield _sse({"evt":"agent.stop_signal"})
+                print("Received stop signal from tool observation.")
+                logger.info("Received stop signal from tool observation.")
+                finished = True
+                yield {"evt":"agent.stop_signal"}
                 break
 
-        print("=== EXITING run_task_stream generator ===")
-        yield _sse({"evt":"agent.end","ok": True, "steps": len(steps)})
+    finally:
+        # a cancelled run (or a closed stream) must not leave early dispatches running
+        for _, task in early.values():
+            task.cancel()
+        if ctx.channel is not None:
+            close_channel(ctx.run_id)
+
+    cache = {"enabled": ctx.cache_enabled, **ctx.cache_stats}
+    ctx.result = {
+        "ok": failure is None,
+        **({"error": failure} if failure else {}),
+        "goal": req.goal,
+        "dry_run": req.dry_run,
+        "steps": steps,
+        "used_max_steps": len(steps),
+        "limits": {"max_steps": max_steps, "max_minutes": max_minutes,
+                   "default_tool_timeout_sec": timeout_policy.default_sec},
+        "llm_trace_tail": trace_tail(3),  # helpful on planner silence
+        "traces": traces,
+        "cache": cache,
+        "leases": ctx.lease_stats,
+        **({"approvals": ctx.channel.stats} if ctx.channel is not None else {}),
+        **({"warmup": ctx.warmup.finish()} if ctx.warmup is not None else {}),
+    }
+    if ctx.plan_cache_enabled:
+        if failure is None and finished and decisions and (plan is None or plan.fell_back_at is not None):
+            plan_cache.store(req.goal, req.dry_run, decisions)
+        if plan is not None:
+            plan_cache.record_savings(plan)
+        ctx.result["plan_cache"] = {**(plan.report() if plan else {"hit": False}), "stats": plan_cache.snapshot()}
+    if recorder is not None:
+        try:
+            ctx.result["recording"] = recorder.save(ctx.result)
+        except OSError as e:
+            logger.warning(f"could not save run recording: {e}")
+    yield {"evt":"agent.end","ok": failure is None, "steps": len(steps), "cache": cache,
+           **({"recording": ctx.result["recording"]} if "recording" in ctx.result else {})}
+
+# ---------- Batch endpoint (existing /tasks/run) ----------
+@app.post("/tasks/run")
+async def run_task(req: TaskRequest, llm: TracedLLM = Depends(get_llm)):
+    print("=== ENTERING run_task ===")
+    verbosity = _verbosity((req.options or {}).get("verbosity"))
+    ctx = RunContext(options=req.options)
+    async for _ in _agent_events(req, llm, ctx):
+        pass
+    print("=== EXITING run_task ===")
+    if verbosity != "full":
+        # the steps repeat every observation; summary/ids keep their shape and artifact handles
+        return {**ctx.result, "steps": summarize_steps(ctx.result["steps"])}
+    return ctx.result
+
+# ---------- Replay a recorded run (options.record=true) ----------
+class ReplayRequest(BaseModel):
+    recording: str              # run id under recording.dir, or a path to the file
+    live_tools: bool = False    # re-execute tools instead of serving recorded observations
+
+@app.post("/tasks/replay")
+async def replay_task(body: ReplayRequest):
+    try:
+        recording = load_recording(body.recording)
+    except FileNotFoundError:
+        raise HTTPException(404, f"unknown_recording: {body.recording}")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    req = TaskRequest(**recording.request)
+    ctx = RunContext(options=req.options)
+    ctx.recorder = None
+    ctx.replay, ctx.replay_live = recording, body.live_tools
+    ctx.plan_cache_enabled = False  # replay the recorded decisions, never cached ones, and don't cache them again
+    t0 = time.perf_counter()
+    async for _ in _agent_events(req, TracedLLM(ReplayLLM(recording)), ctx):
+        pass
+    return {
+        **ctx.result,
+        "replay": {
+            "of": recording.run_id,
+            "live_tools": body.live_tools,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+            "misses": recording.misses,
+        },
+    }
+
+# ---------- Streaming endpoint (live trace to UI) ----------
+def _verbosity(value: Any) -> str:
+    v = str(value or DEFAULT_VERBOSITY).lower()
+    if v not in VERBOSITY_LEVELS:
+        raise HTTPException(400, f"bad_verbosity: {value} (one of {', '.join(VERBOSITY_LEVELS)})")
+    return v
+
+def _wants_gzip(request: Request, asked: Any) -> bool:
+    """Compress only when asked for (options.stream_compress / ?compress=gzip) and the client accepts gzip."""
+    if asked is None:
+        asked = (policy.cfg.get("streams", {}) or {}).get("compress", False)
+    return str(asked).lower() in ("gzip", "true", "1") and "gzip" in request.headers.get("accept-encoding", "")
+
+def _event_stream(run_id: str, after_id: int = 0, verbosity: str = "full", gzip: bool = False) -> StreamingResponse:
+    """SSE view of a run's event log from `after_id` on: ids for resuming, comments as heartbeats."""
+    async def frames() -> AsyncGenerator[bytes, None]:
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode("utf-8")
+        async for item in stream_hub.watch(run_id, after_id):
+            if item is None:
+                yield b": keep-alive\n\n"
+            else:
+                event_id, event = item
+                yield _sse(view_event(event, verbosity, f"/tasks/{run_id}/events/{event_id}"), event_id)
+        print(f"=== run {run_id} stream ended ===")
+
+    async def gzipped() -> AsyncGenerator[bytes, None]:
+        z = GzipFrames()
+        async for frame in frames():
+            yield z.frame(frame)
+        yield z.end()
+
+    headers = {"X-Run-Id": run_id, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if gzip:
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return StreamingResponse(gzipped() if gzip else frames(), media_type="text/event-stream", headers=headers)
+
+@app.post("/tasks/run_stream")
+async def run_task_stream(req: TaskRequest, request: Request, llm: TracedLLM = Depends(get_llm)):
+    print("=== ENTERING run_task_stream ===")
+    opts = req.options or {}
+    stream_llm = bool(opts.get("stream_llm", True))
+    verbosity = _verbosity(opts.get("verbosity"))
+    ctx = RunContext(options=req.options)
+    # The run lives in its own task: a dropped connection can resume with GET /tasks/{run_id}/events
+    log = stream_hub.start(ctx.run_id, _agent_events(req, llm, ctx, stream_llm))
+    if opts.get("approvals"):
+        # answered with POST /tasks/{run_id}/messages; set before the run's task first runs
+        ctx.channel = open_channel(ctx.run_id, log.append, opts)
+    return _event_stream(ctx.run_id, verbosity=verbosity, gzip=_wants_gzip(request, opts.get("stream_compress")))
+
+@app.get("/tasks/{run_id}/events")
+async def run_events(run_id: str, request: Request, after: Optional[int] = None,
+                     verbosity: Optional[str] = None, compress: Optional[str] = None):
+    """Attach to a streamed run or a job; resumes after Last-Event-ID or ?after=, whichever is later."""
+    if stream_hub.get(run_id) is None:
+        raise HTTPException(404, f"unknown_run: {run_id}")
+    last = request.headers.get("last-event-id")
+    try:
+        header_id = int(last or 0)
+    except ValueError:
+        raise HTTPException(400, f"bad_last_event_id: {last}")
+    # ?after= is fixed in an EventSource URL; the header advances with every automatic reconnect
+    after_id = max(after or 0, header_id)
+    return _event_stream(run_id, after_id, _verbosity(verbosity), _wants_gzip(request, compress))
+
+@app.get("/tasks/{run_id}/events/{event_id}")
+def run_event(run_id: str, event_id: int):
+    """One full event: what a summary or ids view's "ref" points at."""
+    log = stream_hub.get(run_id)
+    if log is None:
+        raise HTTPException(404, f"unknown_run: {run_id}")
+    event = log.get(event_id)
+    if event is None:
+        raise HTTPException(404, f"unknown_event: {event_id}")
+    return {"ok": True, "run_id": run_id, "id": event_id, "event": event}
+
+# ---------- Run channel: approvals and hints while a run is in flight ----------
+def _channel_message(run_id: str, msg: dict) -> dict:
+    """approve / edit / reject a parked call, queue a hint, or cancel the run."""
+    if msg.get("type") == "cancel":
+        job = job_queue.get(run_id)
+        cancelled = stream_hub.cancel(run_id)
+        if not cancelled and job is not None and not job.done:  # a finished job has nothing to cancel
+            cancelled = job_queue.cancel(run_id) is not None
+        return {"ok": cancelled, "action": "cancel", **({} if cancelled else {"error": f"not_running: {run_id}"})}
+    channel = get_channel(run_id)
+    if channel is None:
+        return {"ok": False, "error": f"no_channel: {run_id}"}
+    return channel.handle(msg)
+
+@app.post("/tasks/{run_id}/messages")
+def run_message(run_id: str, msg: dict):
+    """The HTTP side of the run channel, for SSE viewers and jobs started with options.approvals."""
+    out = _channel_message(run_id, msg)
+    channel = get_channel(run_id)
+    return {**out, "pending": channel.pending() if channel else []}
+
+@app.websocket("/tasks/ws")
+async def run_ws(ws: WebSocket, llm: TracedLLM = Depends(get_llm)):
+    """
+    One socket per run. The first message is {"type": "run", goal, dry_run, options}
+    or {"type": "attach", run_id, after}; then the server sends {"type": "event", id, event}
+    (approval.request among them) and the client may send approve/edit/reject/hint/cancel
+    at any time, each answered with {"type": "ack", ...}. Closed after agent.end.
+    """
+    await ws.accept()
+    try:
+        first = await ws.receive_json()
+        if first.get("type") == "run":
+            req = TaskRequest(**{k: v for k, v in first.items() if k != "type"})
+            opts = {"approvals": True, **(req.options or {})}
+            ctx = RunContext(options=opts)
+            log = stream_hub.start(ctx.run_id, _agent_events(req, llm, ctx, bool(opts.get("stream_llm", True))))
+            if opts.get("approvals"):
+                ctx.channel = open_channel(ctx.run_id, log.append, opts)
+            run_id, after_id, verbosity = ctx.run_id, 0, _verbosity(opts.get("verbosity"))
+        elif first.get("type") == "attach" and stream_hub.get(str(first.get("run_id"))) is not None:
+            run_id, after_id = str(first["run_id"]), int(first.get("after") or 0)
+            verbosity = _verbosity(first.get("verbosity"))
+        else:
+            await ws.send_json({"type": "error", "error": f"expected run or attach, got {first.get('type')}"})
+            await ws.close(code=1008)
+            return
+    except (ValueError, HTTPException) as e:
+        await ws.send_json({"type": "error", "error": str(getattr(e, "detail", e))})
+        await ws.close(code=1008)
+        return
+    except WebSocketDisconnect:
+        return
+    await ws.send_json({"type": "run", "run_id": run_id})
+    send_lock = asyncio.Lock()
+
+    async def send(payload: dict) -> None:
+        async with send_lock:
+            await ws.send_json(payload)
+
+    async def events() -> None:
+        async for item in stream_hub.watch(run_id, after_id):
+            if item is None:
+                await send({"type": "ping"})
+            else:
+                await send({"type": "event", "id": item[0],
+                            "event": view_event(item[1], verbosity, f"/tasks/{run_id}/events/{item[0]}")})
 
-    return StreamingResponse(gen(), media_type="text/event-stream")
+    async def answers() -> None:
+        while True:
+            msg = await ws.receive_json()
+            await send({"type": "ack", **_channel_message(run_id, msg if isinstance(msg, dict) else {})})
+
+    pump, reader = asyncio.create_task(events()), asyncio.create_task(answers())
+    try:
+        done, _ = await asyncio.wait({pump, reader}, return_when=asyncio.FIRST_COMPLETED)
+        if pump in done and pump.exception() is None:
+            await send({"type": "end", "run_id": run_id})
+            await ws.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        # a dropped socket leaves the run to the stream's reattach grace (see streams.StreamHub)
+        for t in (pump, reader):
+            t.cancel()
+        await asyncio.gather(pump, reader, return_exceptions=True)
+    print(f"=== run {run_id} socket closed ===")
+
+# ---------- Background jobs (submit now, poll later) ----------
+async def _run_job(job: Job) -> dict:
+    ctx = RunContext(run_id=job.id, options=job.req.options)
+    stream_llm = bool((job.req.options or {}).get("stream_llm", True))
+    log = stream_hub.open(job.id)  # viewers can follow a job too; nobody watching is fine
+    if (job.req.options or {}).get("approvals"):
+        ctx.channel = open_channel(job.id, log.append, job.req.options)
+    try:
+        async for event in _agent_events(job.req, job.llm, ctx, stream_llm):
+            job.progress(event)
+            log.append(event)
+    finally:
+        log.close()
+    return ctx.result
+
+job_queue = make_job_queue(_run_job)
+
+@app.post("/tasks/submit")
+async def submit_task(req: TaskRequest, llm: TracedLLM = Depends(get_llm)):
+    try:
+        job = job_queue.submit(req, llm)
+    except QueueFull as e:
+        raise HTTPException(429, str(e))
+    return {"ok": True, "job_id": job.id, "status": job.status, "position": job_queue.position(job)}
+
+@app.get("/tasks/jobs")
+def list_jobs():
+    return {"ok": True, **job_queue.stats(), "jobs": [j.summary() for j in job_queue.jobs.values()]}
+
+@app.get("/tasks/{job_id}")
+def task_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"unknown_job: {job_id}")
+    return {"ok": True, **job.summary(), "position": job_queue.position(job)}
+
+@app.get("/tasks/{job_id}/result")
+def task_result(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"unknown_job: {job_id}")
+    if not job.done:
+        return JSONResponse({"ok": False, **job.summary()}, status_code=202)
+    return {"ok": job.status == "succeeded", **job.summary(), "result": job.result}
+
+@app.post("/tasks/{job_id}/cancel")
+def cancel_task(job_id: str):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        if stream_hub.cancel(job_id):  # a streamed run
+            return {"ok": True, "run_id": job_id, "status": "cancelling"}
+        raise HTTPException(404, f"unknown_job: {job_id}")
+    return {"ok": True, **job.summary()}
+
+# ---------- Batches (many goals, shared options, one report) ----------
+batch_runner = make_batch_runner(job_queue, stream_hub)
+
+class BatchRequest(BaseModel):
+    goals: list[str | dict]     # a goal, or {"goal", "dry_run", "options"} on top of the shared ones
+    dry_run: bool = False
+    options: dict | None = None
+    budget_rupees: int | None = None
+    parallelism: int | None = None
+
+@app.post("/batches")
+async def submit_batch(body: BatchRequest):
+    reqs = []
+    for item in body.goals:
+        item = {"goal": item} if isinstance(item, str) else item
+        if not item.get("goal"):
+            raise HTTPException(400, f"goal_missing: item {len(reqs)}")
+        reqs.append(TaskRequest(goal=item["goal"], dry_run=item.get("dry_run", body.dry_run),
+                                options={**(body.options or {}), **(item.get("options") or {})} or None,
+                                budget_rupees=item.get("budget_rupees", body.budget_rupees)))
+    # each goal gets its own planner session, made the way Depends(get_llm) would (overrides included)
+    llm_factory = app.dependency_overrides.get(get_llm, get_llm)
+    try:
+        batch = batch_runner.submit(reqs, llm_factory, body.parallelism)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"ok": True, "batch_id": batch.id, "goals": len(batch.jobs), "parallelism": batch.parallelism,
+            "jobs": [j.id for j in batch.jobs], "events": f"/batches/{batch.id}/events"}
+
+@app.get("/batches")
+def list_batches():
+    return {"ok": True, "batches": [{k: v for k, v in b.report().items() if k != "items"}
+                                    for b in batch_runner.batches.values()]}
+
+@app.get("/batches/{batch_id}")
+def batch_report(batch_id: str):
+    batch = batch_runner.get(batch_id)
+    if batch is None:
+        raise HTTPException(404, f"unknown_batch: {batch_id}")
+    return {"ok": True, **batch.report()}
+
+@app.get("/batches/{batch_id}/events")
+async def batch_events(batch_id: str, after: int = 0):
+    """goal.start / goal.end per goal and a final batch.end; each goal's own events are at /tasks/{job_id}/events."""
+    if batch_runner.get(batch_id) is None or stream_hub.get(batch_id) is None:
+        raise HTTPException(404, f"unknown_batch: {batch_id}")
+    return _event_stream(batch_id, after)
+
+@app.post("/batches/{batch_id}/cancel")
+def cancel_batch(batch_id: str):
+    batch = batch_runner.cancel(batch_id)
+    if batch is None:
+        raise HTTPException(404, f"unknown_batch: {batch_id}")
+    return {"ok": True, **{k: v for k, v in batch.report().items() if k != "items"}}
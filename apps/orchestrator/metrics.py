@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Response
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 router = APIRouter()
 
 REQUESTS_TOTAL = Counter("requests_total", "Total API requests", ["path", "method", "code"])
 LATENCY = Histogram("request_latency_ms", "Request latency (ms)")
 
+# Tool executor pools (see executors.py); gauges are read at scrape time
+EXECUTOR_TASKS = Counter("executor_tasks_total", "Calls submitted to a tool executor pool", ["pool"])
+EXECUTOR_QUEUE_DEPTH = Gauge("executor_queue_depth", "Calls waiting for a free worker", ["pool"])
+EXECUTOR_ACTIVE = Gauge("executor_active", "Calls running in the pool", ["pool"])
+EXECUTOR_UTILIZATION = Gauge("executor_utilization", "Busy workers / pool size", ["pool"])
+EXECUTOR_LEAKED = Gauge("executor_leaked_threads", "Threads still running a timed-out or cancelled call", ["pool"])
+EXECUTOR_LEAKED_TOTAL = Counter("executor_leaked_calls_total", "Calls abandoned while their thread kept running", ["pool"])
+
 @router.get("/healthz")
 def healthz():
     return {"ok": True}
@@ -0,0 +1,193 @@
+# apps/orchestrator/plan_cache.py
+from __future__ import annotations
+import json, os, re, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .policy import policy
+
+_CFG: Dict[str, Any] = policy.cfg.get("plan_cache", {}) or {}
+PLAN_CACHE_ENABLED_BY_DEFAULT = bool(_CFG.get("enabled", False))
+
+# Goal parameters: quoted strings, URLs, paths (anything with a slash), numbers.
+# Bare words are part of the template, so quote names you want generalized
+# ("open project 'billing-api' in VS Code").
+_PARAM_RE = re.compile(
+    r'"([^"]+)"|\'([^\']+)\'|(https?://\S+)|((?:[A-Za-z]:)?[\w.~\-]*[\\/][\w.\-\\/]*)|(\b\d+(?:\.\d+)?\b)'
+)
+_SLOT = "\u27e6p{}\u27e7"  # ⟦p0⟧: a placeholder no real argument contains
+
+
+def goal_template(goal: str) -> Tuple[str, List[str]]:
+    """'Move "a.txt" to C:/tmp' -> ('move ⟦p0⟧ to ⟦p1⟧', ['a.txt', 'C:/tmp'])."""
+    params: List[str] = []
+
+    def slot(m: re.Match) -> str:
+        value = next(g for g in m.groups() if g is not None).rstrip(".,;:")
+        params.append(value)
+        return _SLOT.format(len(params) - 1)
+
+    text = _PARAM_RE.sub(slot, goal or "")
+    text = re.sub(r"\s+", " ", text).strip().lower().rstrip(".!?")
+    return text, params
+
+
+def _map_strings(value: Any, fn) -> Any:
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, dict):
+        return {k: _map_strings(v, fn) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_map_strings(v, fn) for v in value]
+    return value
+
+
+def _abstract(call: Any, params: List[str]) -> Any:
+    """Replace goal parameters inside call arguments with their slots (longest first)."""
+    order = sorted(((p, i) for i, p in enumerate(params) if len(p) >= 2), key=lambda t: -len(t[0]))
+
+    def fn(s: str) -> str:
+        for p, i in order:
+            s = s.replace(p, _SLOT.format(i))
+        return s
+    return _map_strings(call, fn)
+
+
+def _fill(call: Any, params: List[str]) -> Any:
+    def fn(s: str) -> str:
+        for i, p in enumerate(params):
+            s = s.replace(_SLOT.format(i), p)
+        return s
+    return _map_strings(call, fn)
+
+
+def _expectation(obs: Any) -> Dict[str, Any]:
+    if not isinstance(obs, dict):
+        return {"ok": None, "keys": []}
+    return {"ok": bool(obs.get("ok")), "stop": bool(obs.get("stop")), "keys": sorted(obs.keys())}
+
+
+class PlanRun:
+    """
+    Replays one cached plan for a run. next_call() hands out the filled-in calls;
+    check() compares each observation with what the plan saw and deactivates the
+    plan on the first mismatch, after which the agent loop asks the planner again.
+    """
+    def __init__(self, template: str, entry: Dict[str, Any], params: List[str]):
+        self.template = template
+        self.entry = entry
+        self.params = params
+        self.pos = 0
+        self.active = True
+        self.fell_back_at: Optional[int] = None
+        self.saved_tokens = 0
+        self.last_tokens = 0  # planner tokens the last served step cost when it was recorded
+
+    def next_call(self) -> Optional[Dict[str, Any]]:
+        steps = self.entry["steps"]
+        if self.pos >= len(steps):
+            self.active = False
+            return None  # the recorded run ended here: planner said done
+        step = steps[self.pos]
+        self.last_tokens = int(step.get("tokens") or 0)
+        self.saved_tokens += self.last_tokens
+        return _fill(step["call"], self.params)
+
+    def check(self, step_no: int, obs: Any) -> bool:
+        want = self.entry["steps"][self.pos]["expect"]
+        got = _expectation(obs)
+        self.pos += 1
+        ok = got["ok"] == want["ok"] and got.get("stop") == want.get("stop") and set(want["keys"]) <= set(got["keys"])
+        if not ok:
+            self.active = False
+            self.fell_back_at = step_no
+        return ok
+
+    def report(self) -> Dict[str, Any]:
+        return {"hit": True, "template": self.template, "steps_from_cache": self.pos,
+                "fell_back_at": self.fell_back_at, "saved_tokens_est": self.saved_tokens}
+
+
+class PlanCache:
+    """
+    Tool-call sequences of successful runs, keyed by (goal template, dry_run).
+    LRU-bounded; persisted as one JSON file when `path` is set.
+    """
+    def __init__(self, max_entries: int = 500, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "saved_tokens": 0}
+        self._load()
+
+    @staticmethod
+    def _key(template: str, dry_run: bool) -> str:
+        return f"{int(bool(dry_run))}|{template}"
+
+    def lookup(self, goal: str, dry_run: bool) -> Optional[PlanRun]:
+        template, params = goal_template(goal)
+        key = self._key(template, dry_run)
+        with self._lock:
+            self.stats["lookups"] += 1
+            entry = self._entries.get(key)
+            if entry is None or entry["n_params"] != len(params):
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return PlanRun(template, entry, params)
+
+    def store(self, goal: str, dry_run: bool, decisions: List[Tuple[Dict[str, Any], int, Any]]) -> None:
+        """decisions: (call, planner tokens spent on it, observation) per step, in order."""
+        template, params = goal_template(goal)
+        entry = {
+            "n_params": len(params),
+            "steps": [{"call": _abstract(call, params), "tokens": tokens, "expect": _expectation(obs)}
+                      for call, tokens, obs in decisions],
+        }
+        with self._lock:
+            key = self._key(template, dry_run)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def record_savings(self, run: PlanRun) -> None:
+        with self._lock:
+            self.stats["saved_tokens"] += run.saved_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {**self.stats, "entries": len(self._entries),
+                    "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._entries = OrderedDict(data.get("plans", {}))
+        except (OSError, ValueError):
+            self._entries = OrderedDict()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": 1, "plans": self._entries}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # cache stays in memory only
+
+
+plan_cache = PlanCache(max_entries=int(_CFG.get("max_entries", 500)), path=_CFG.get("path"))
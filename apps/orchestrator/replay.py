@@ -0,0 +1,126 @@
+# apps/orchestrator/replay.py
+from __future__ import annotations
+import gzip, json, time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .policy import policy
+from .tools.registry import canonical_tool_name
+
+_CFG: Dict[str, Any] = policy.cfg.get("recording", {}) or {}
+RECORD_BY_DEFAULT = bool(_CFG.get("enabled", False))
+RECORDING_DIR = Path(_CFG.get("dir", "data/recordings"))
+
+FORMAT = "desktop-operator.run"
+VERSION = 1
+
+
+def _freeze(value: Any) -> Any:
+    """JSON round-trip so later in-place edits (messages, args) don't change the record."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _tool_key(tool: str, args: Dict[str, Any]) -> str:
+    return canonical_tool_name(tool) + ":" + json.dumps(args or {}, sort_keys=True, default=str)
+
+
+class RunRecorder:
+    """
+    Collects one run as JSON lines: a header, the bootstrap messages, every
+    planner decision and every tool call with its (reduced) observation, then
+    an end line. save() writes data/recordings/<run_id>.jsonl.gz.
+    """
+    def __init__(self, run_id: str, root: Optional[Path] = None):
+        self.run_id = run_id
+        self.root = Path(root or RECORDING_DIR)
+        self._t0 = time.perf_counter()
+        self._lines: List[str] = []
+
+    def _add(self, kind: str, **data: Any) -> None:
+        rec = {"t": kind, "ms": round((time.perf_counter() - self._t0) * 1000, 2), **data}
+        self._lines.append(json.dumps(rec, ensure_ascii=False, default=str))
+
+    def start(self, goal: str, dry_run: bool, options: Optional[dict], budget_rupees: Optional[int]) -> None:
+        self._add("header", format=FORMAT, version=VERSION, run_id=self.run_id, created_at=time.time(),
+                  request={"goal": goal, "dry_run": dry_run, "options": options, "budget_rupees": budget_rupees})
+
+    def bootstrap(self, messages: List[Dict[str, Any]]) -> None:
+        self._add("bootstrap", messages=_freeze(messages))
+
+    def decision(self, step: int, call: Optional[Dict[str, Any]], elapsed_ms: float, usage: Any = None) -> None:
+        self._add("decision", step=step, call=_freeze(call), elapsed_ms=round(elapsed_ms, 2), usage=usage)
+
+    def tool(self, tool: str, args: Dict[str, Any], obs: Any, elapsed_ms: float) -> None:
+        self._add("tool", tool=tool, args=_freeze(args), obs=obs, elapsed_ms=round(elapsed_ms, 2))
+
+    def save(self, result: Dict[str, Any]) -> str:
+        self._add("end", ok=result.get("ok"), error=result.get("error"), steps=len(result.get("steps") or []))
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{self.run_id}.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write("\n".join(self._lines) + "\n")
+        return str(path)
+
+
+class Recording:
+    """A loaded run file; hands out recorded decisions and observations for replay."""
+    def __init__(self, records: List[Dict[str, Any]], source: str = ""):
+        header = records[0] if records else {}
+        if header.get("t") != "header" or header.get("format") != FORMAT:
+            raise ValueError(f"not_a_recording: {source}")
+        if int(header.get("version", 0)) > VERSION:
+            raise ValueError(f"unsupported_recording_version: {header.get('version')}")
+        self.source = source
+        self.run_id = header.get("run_id")
+        self.request: Dict[str, Any] = header.get("request") or {}
+        self.messages: List[Dict[str, Any]] = next((r["messages"] for r in records if r["t"] == "bootstrap"), [])
+        self.decisions = deque(r.get("call") for r in records if r["t"] == "decision")
+        # Parallel micro-calls finish in any order, so observations are served by (tool, args), FIFO per key
+        self._obs: Dict[str, deque] = defaultdict(deque)
+        for r in records:
+            if r["t"] == "tool":
+                self._obs[_tool_key(r["tool"], r.get("args"))].append(r.get("obs"))
+        self.records = records
+        self.misses = 0
+
+    def next_decision(self) -> Optional[Dict[str, Any]]:
+        return self.decisions.popleft() if self.decisions else None
+
+    def observation(self, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        q = self._obs.get(_tool_key(tool, args))
+        if not q:
+            self.misses += 1
+            return {"ok": False, "error": f"replay_miss: {tool}"}
+        return q.popleft()
+
+
+def load_recording(ref: str, root: Optional[Path] = None) -> Recording:
+    """`ref` is a run id or a .jsonl[.gz] file name/path inside the recording dir."""
+    base = Path(root or RECORDING_DIR).resolve()
+    path = Path(ref) if ref.endswith((".jsonl", ".jsonl.gz")) else base / f"{ref}.jsonl.gz"
+    path = (path if path.is_absolute() or path.exists() else base / path).resolve()
+    if not path.is_relative_to(base) or not path.exists():
+        raise FileNotFoundError(ref)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return Recording(records, str(path))
+
+
+class ReplayLLM:
+    """Planner stand-in that re-issues the decisions of a recording, in order."""
+    def __init__(self, recording: Recording):
+        self.recording = recording
+        self.last_raw: Dict[str, Any] | None = None
+
+    def bootstrap(self, goal: str, dry_run: bool, budget_rupees: Optional[int]):
+        return _freeze(self.recording.messages) or [{"role": "user", "content": f"Goal: {goal}"}]
+
+    def next_tool_call(self, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        call = self.recording.next_decision()
+        self.last_raw = {"path": "replay", "recording": self.recording.run_id, "emitted_call": call}
+        return call
+
+    def observe(self, messages, tool_name, args, obs):
+        return messages
@@ -0,0 +1,141 @@
+# apps/orchestrator/scheduler.py
+from __future__ import annotations
+import asyncio, os
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+from urllib.parse import urlparse
+
+from .tools.registry import canonical_tool_name
+from ..worker.profiles import profile_path
+
+
+class Resource(NamedTuple):
+    kind: str    # "path" | "cwd" | "browser" | "desktop-ui" | "vscode" | "pkg-manager" | "host" | "*"
+    key: str
+    write: bool
+
+
+# tool -> (arg names it reads, arg names it writes) for path-based tools
+_PATH_TOOLS: Dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "fs_read": (("path",), ()),
+    "fs_listdir": (("path",), ()),
+    "data_csv_read": (("path",), ()),
+    "data_json_read": (("path",), ()),
+    "fs_write": ((), ("path",)),
+    "fs_delete": ((), ("path",)),
+    "data_csv_write": ((), ("path",)),
+    "data_json_write": ((), ("path",)),
+    "fs_copy": (("src",), ("dst",)),
+    "fs_move": ((), ("src", "dst")),
+}
+_READ_ONLY = {"artifact_read"}
+_BARRIER = Resource("*", "*", True)
+
+
+def _norm_path(p: str) -> str:
+    return os.path.normcase(os.path.abspath(os.path.expanduser(os.path.expandvars(str(p)))))
+
+
+def resource_keys(tool: str, args: Dict[str, Any]) -> List[Resource]:
+    """
+    What a call touches, for ordering. Two calls conflict when they share a
+    resource and at least one writes it; tools we know nothing about act as a
+    barrier (conflict with everything) so unknown side effects keep their order.
+    """
+    t = canonical_tool_name(tool)
+    args = args or {}
+    if t in _READ_ONLY:
+        return []
+    if t in _PATH_TOOLS:
+        reads, writes = _PATH_TOOLS[t]
+        res = [Resource("path", _norm_path(args[a]), False) for a in reads if args.get(a)]
+        res += [Resource("path", _norm_path(args[a]), True) for a in writes if args.get(a)]
+        return res or [_BARRIER]
+    if t == "terminal_run":
+        # a command can touch anything under its working directory: ordered against paths there
+        # within a run (_overlap), but not leased as a path, which would lock the whole tree across runs
+        return [Resource("cwd", _norm_path(args.get("cwd") or "."), True)]
+    if t.startswith("browser"):
+        # the same dir the browser worker keys its persistent context by
+        return [Resource("browser", _norm_path(profile_path(args.get("profile") or "default")), True)]
+    if t.startswith(("ui_", "app_launch", "whatsapp")):
+        return [Resource("desktop-ui", "*", True)]
+    if t.startswith("vscode_"):
+        return [Resource("vscode", "*", t != "vscode_get_diagnostics")]
+    if t.startswith("pkg_"):
+        return [Resource("pkg-manager", str(args.get("manager") or "winget"), True)]
+    if t == "http_request":
+        host = urlparse(str(args.get("url") or "")).netloc.lower()
+        return [Resource("host", host, str(args.get("method", "GET")).upper() not in ("GET", "HEAD"))]
+    return [_BARRIER]
+
+
+def _overlap(a: Resource, b: Resource) -> bool:
+    if a.kind == "*" or b.kind == "*":
+        return True
+    if {a.kind, b.kind} <= {"path", "cwd"}:
+        # a directory (or a command's working dir) conflicts with anything inside it
+        return a.key == b.key or b.key.startswith(a.key.rstrip(os.sep) + os.sep) \
+            or a.key.startswith(b.key.rstrip(os.sep) + os.sep)
+    return a.kind == b.kind and a.key == b.key
+
+
+def conflicts(a: List[Resource], b: List[Resource]) -> bool:
+    return any((x.write or y.write) and _overlap(x, y) for x in a for y in b)
+
+
+def build_deps(calls: List[Dict[str, Any]]) -> List[Set[int]]:
+    """deps[j] = earlier calls that j must wait for (plan order is kept between conflicting calls)."""
+    keys = [resource_keys(c.get("name") or "", c.get("arguments") or {}) for c in calls]
+    return [{i for i in range(j) if conflicts(keys[i], keys[j])} for j in range(len(calls))]
+
+
+async def run_dag(calls: List[Dict[str, Any]], run_one: Callable[[int, Dict[str, Any]], Awaitable[Any]],
+                  limit: int = 4, fail_fast: bool = False,
+                  started: Optional[Dict[int, asyncio.Task]] = None) -> AsyncGenerator[tuple[str, int, Any], None]:
+    """
+    Run `calls` ({"name", "arguments"}) as a dependency graph, at most `limit` at
+    once. Yields ("start", idx, None) when a call is launched and ("done", idx, obs)
+    when it finishes, so callers can stream progress and rebuild plan order.
+
+    A stop signal ({"ok": True, "stop": True}) stops launching calls that come
+    after it in the plan; with `fail_fast` a failed call stops launching anything
+    new. Calls already running are allowed to finish. `started` holds calls that
+    were dispatched before the batch was complete (streaming planner).
+    """
+    deps = build_deps(calls)
+    started = dict(started or {})
+    running: Dict[asyncio.Task, int] = {}
+    done: Set[int] = set()
+    launched: Set[int] = set()
+    cutoff = len(calls)  # calls at or after this index are not launched
+    limit = max(1, limit)
+
+    for idx, task in started.items():
+        running[task] = idx
+        launched.add(idx)
+    try:
+        while True:
+            for j in range(len(calls)):
+                if len(running) >= limit:
+                    break
+                if j in launched or j >= cutoff or not deps[j] <= done:
+                    continue
+                launched.add(j)
+                running[asyncio.create_task(run_one(j, calls[j]))] = j
+                yield ("start", j, None)
+            if not running:
+                return
+            finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(finished, key=lambda t: running[t]):
+                idx = running.pop(task)
+                obs = task.result()
+                done.add(idx)
+                if isinstance(obs, dict):
+                    if obs.get("ok") and obs.get("stop"):
+                        cutoff = min(cutoff, idx + 1)
+                    elif fail_fast and not obs.get("ok"):
+                        cutoff = 0
+                yield ("done", idx, obs)
+    finally:
+        for task in running:
+            task.cancel()
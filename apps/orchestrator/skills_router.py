@@ -9,16 +9,21 @@ from pydantic import BaseModel
 
 from .validation import validate_input
 from .policy import policy
-from .tools.registry import TOOL_REGISTRY
+from .tools.registry import LazyTool, lookup_tool
+from .dispatch import invoke, cached_invoke
+from .leases import LeaseTimeout, lease_manager
+from .tool_timeouts import timeout_policy
+from .llm import maybe_await
+from .tool_cache import CACHE_ENABLED_BY_DEFAULT
 
-# Your concrete skill impls
-from ..worker.skills.files_organize import run as files_organize_run
-from ..worker.skills.shopify_bulk import run as shopify_bulk_run
-from ..worker.skills.whatsapp_chat import run_chat
-from fastapi import Request
-from ..worker.skills.whatsapp_desktop_chat import run_desktop_chat
 from fastapi import Request
 
+# Your concrete skill impls (imported on first request: playwright, requests, uiautomation)
+files_organize_run = LazyTool("files.organize", "apps.worker.skills.files_organize:run")
+shopify_bulk_run = LazyTool("shopify.bulk_upload", "apps.worker.skills.shopify_bulk:run")
+run_chat = LazyTool("whatsapp.chat", "apps.worker.skills.whatsapp_chat:run_chat")
+run_desktop_chat = LazyTool("whatsapp.desktop_chat", "apps.worker.skills.whatsapp_desktop_chat:run_desktop_chat")
+
 
 # Prefix so paths are /skills/...
 router = APIRouter(prefix="/skills", tags=["skills"])
@@ -48,13 +53,13 @@ class WhatsappChatReq(BaseModel):
 
 @router.post("/whatsapp.chat/run")
 async def whatsapp_chat(req: WhatsappChatReq):
-    return await run_chat(
+    return await maybe_await(run_chat(
         contact=req.contact,
         profile_dir=req.profile_dir,
         initial_message=req.initial_message,
         duration_sec=req.duration_sec,
         allow_llm=req.allow_llm,
-    )
+    ))
 
 # class WhatsappDesktopReq(BaseModel):
 #     contact: str
@@ -132,19 +137,22 @@ def whatsapp_desktop_chat(req: WhatsappDesktopReq, request: Request):
 
 async def _dispatch_tool(tool: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """Call a tool from TOOL_REGISTRY with a per-tool timeout; works for sync/async."""
-    func = TOOL_REGISTRY.get(tool)
-    if not func:
+    match = lookup_tool(tool)
+    # exact names and dot/underscore aliases only; never guess for a direct API call
+    if not match.func or match.kind == "fuzzy":
         raise HTTPException(404, f"unknown_tool: {tool}")
+    func = match.func
 
-    timeout = int((policy.defaults() or {}).get("max_tool_runtime_sec", 120))
+    timeout = timeout_policy.timeout_for(match.name, payload)
     try:
-        if asyncio.iscoroutinefunction(func):
-            return await asyncio.wait_for(func(**payload), timeout=timeout)
-        else:
-            loop = asyncio.get_event_loop()
-            return await asyncio.wait_for(loop.run_in_executor(None, lambda: func(**payload)), timeout=timeout)
+        async with lease_manager.hold(match.name, payload):
+            if CACHE_ENABLED_BY_DEFAULT:
+                return await cached_invoke(tool, func, payload, timeout)
+            return await invoke(func, payload, timeout)
+    except LeaseTimeout as e:
+        raise HTTPException(503, str(e))
     except asyncio.TimeoutError:
-        raise HTTPException(504, f"tool_timeout_{timeout}s")
+        raise HTTPException(504, f"tool_timeout_{timeout:g}s")
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,305 @@
+# apps/orchestrator/streams.py
+from __future__ import annotations
+import asyncio, json, logging, time, zlib
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+
+from .compaction import clip_text, summarize_value
+from .policy import policy
+
+logger = logging.getLogger("uvicorn.error")
+
+_CFG: Dict[str, Any] = policy.cfg.get("streams", {}) or {}
+STREAM_RETRY_MS = int(_CFG.get("retry_ms", 3000))  # reconnect delay suggested to EventSource clients
+VERBOSITY_LEVELS = ("full", "summary", "ids")
+DEFAULT_VERBOSITY = str(_CFG.get("verbosity", "full"))
+SUMMARY_INLINE_BYTES = int(_CFG.get("summary_inline_bytes", 512))
+COMPRESS_LEVEL = int(_CFG.get("compress_level", 6))
+
+
+# ---------- per-viewer event views ----------
+# The log always holds full events; a viewer picks how much of each it receives.
+#   full    - the event as produced
+#   summary - values over SUMMARY_INLINE_BYTES become their shape (clipped text,
+#             list lengths, dict keys); artifact handles stay, their previews go
+#   ids     - evt/step/index/tool/ok only
+# A reduced event carries "ref", the path of the full event (GET /tasks/{run_id}/events/{id}).
+_ID_KEYS = ("evt", "step", "index", "tool", "ok", "error", "inline", "early")
+
+
+def _size(v: Any) -> int:
+    if isinstance(v, str):
+        return len(v)
+    return len(json.dumps(v, ensure_ascii=False, default=str))
+
+
+def _shrink(v: Any, depth: int = 0) -> Any:
+    if v is None or isinstance(v, (bool, int, float)) or _size(v) <= SUMMARY_INLINE_BYTES:
+        return v
+    if isinstance(v, dict) and "artifact" in v:
+        return {k: v[k] for k in ("artifact", "bytes", "kind") if k in v}
+    if isinstance(v, dict) and depth == 0:
+        return {k: _shrink(x, 1) for k, x in v.items()}
+    return summarize_value(v)
+
+
+def view_event(event: dict, verbosity: str = "full", ref: Optional[str] = None) -> dict:
+    if verbosity == "ids":
+        out = {k: event[k] for k in _ID_KEYS if k in event}
+        obs = event.get("obs")
+        if isinstance(obs, dict) and "ok" in obs:
+            out["ok"] = obs["ok"]
+        if isinstance(out.get("error"), str):
+            out["error"] = clip_text(out["error"], 200)
+    elif verbosity == "summary":
+        out = {k: (v if k == "evt" else _shrink(v)) for k, v in event.items()}
+    else:
+        return event
+    if ref and out != event:
+        out["ref"] = ref
+    return out
+
+
+def summarize_steps(steps: List[dict]) -> List[dict]:
+    """The step list of a run result with each call's args and observation shrunk like a summary view."""
+    return [{k: (_shrink(v) if k in ("args", "obs") else v) for k, v in s.items()} for s in steps]
+
+
+class GzipFrames:
+    """
+    gzip for a long-lived SSE body: every frame is sync-flushed, so the client
+    decodes it as soon as it arrives instead of when the stream ends.
+    """
+    def __init__(self, level: int = COMPRESS_LEVEL):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def frame(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def end(self) -> bytes:
+        return self._z.flush()
+
+
+class RunEventLog:
+    """
+    Every event of one run, numbered 1, 2, 3, ... The newest `capacity` events are
+    kept in memory; older ones are appended to <spill_dir>/<run_id>.jsonl as they
+    fall out, so a viewer can resume from any id. Viewers pull at their own pace
+    (see follow()), so a slow one never makes the run buffer more.
+    """
+    def __init__(self, run_id: str, capacity: int = 1000, spill_dir: Optional[Path] = None):
+        self.run_id = run_id
+        self.capacity = max(1, capacity)
+        self.spill_path = Path(spill_dir) / f"{run_id}.jsonl" if spill_dir else None
+        self._mem: deque[Tuple[int, dict]] = deque()
+        self.last_id = 0
+        self.spilled = 0
+        self.closed = False
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    def append(self, event: dict) -> int:
+        self.last_id += 1
+        self._mem.append((self.last_id, event))
+        if len(self._mem) > self.capacity:
+            self._spill(*self._mem.popleft())
+        self._wake()
+        return self.last_id
+
+    def close(self) -> None:
+        self.closed = True
+        self.finished_at = time.time()
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _spill(self, event_id: int, event: dict) -> None:
+        self.spilled += 1
+        if self.spill_path is None:
+            return  # no spill dir: the oldest events are simply gone
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"id": event_id, "event": event}, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass
+
+    def _from_disk(self, after_id: int, upto_id: int) -> List[Tuple[int, dict]]:
+        if self.spill_path is None or not self.spill_path.exists():
+            return []
+        out = []
+        with self.spill_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                if after_id < rec["id"] < upto_id:
+                    out.append((rec["id"], rec["event"]))
+        return out
+
+    def since(self, after_id: int, limit: int) -> List[Tuple[int, dict]]:
+        """Up to `limit` events with id > after_id, oldest first."""
+        first_mem = self._mem[0][0] if self._mem else self.last_id + 1
+        out = self._from_disk(after_id, first_mem)[:limit] if after_id + 1 < first_mem else []
+        for event_id, event in self._mem:
+            if len(out) >= limit:
+                break
+            if event_id > after_id:
+                out.append((event_id, event))
+        return out
+
+    def get(self, event_id: int) -> Optional[dict]:
+        found = self.since(event_id - 1, 1)
+        return found[0][1] if found and found[0][0] == event_id else None
+
+    async def follow(self, after_id: int = 0, heartbeat_sec: float = 15.0,
+                     batch: int = 100) -> AsyncIterator[Optional[Tuple[int, dict]]]:
+        """
+        Events after `after_id` until the run ends; yields None when nothing happened
+        for `heartbeat_sec` (the caller sends a keep-alive). The consumer's own pace is
+        the backpressure: nothing is queued per viewer.
+        """
+        cursor = after_id
+        while True:
+            changed = self._changed
+            pending = self.since(cursor, batch)
+            for event_id, event in pending:
+                cursor = event_id
+                yield event_id, event
+            if pending:
+                continue
+            if self.closed:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat_sec)
+            except asyncio.TimeoutError:
+                yield None
+
+    def discard(self) -> None:
+        if self.spill_path is not None:
+            self.spill_path.unlink(missing_ok=True)
+
+
+class _Run:
+    __slots__ = ("log", "task", "viewers", "cancel_when_unwatched", "_grace")
+
+    def __init__(self, log: RunEventLog, cancel_when_unwatched: bool):
+        self.log = log
+        self.task: Optional[asyncio.Task] = None
+        self.viewers = 0
+        self.cancel_when_unwatched = cancel_when_unwatched
+        self._grace: Optional[asyncio.TimerHandle] = None
+
+
+class StreamHub:
+    """
+    Runs whose events can be watched live: each run executes in its own task and
+    writes to a RunEventLog; any number of viewers attach and detach. A streamed
+    run nobody watches for `reattach_grace_sec` is cancelled (closing the tab still
+    stops the run, a dropped connection has time to come back). Background jobs
+    publish here too but are never cancelled for lack of viewers.
+    """
+    def __init__(self, capacity: int = 1000, spill_dir: Optional[str] = "data/streams",
+                 heartbeat_sec: float = 15.0, reattach_grace_sec: float = 30.0, keep_finished: int = 200):
+        self.capacity = capacity
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.heartbeat_sec = heartbeat_sec
+        self.reattach_grace_sec = reattach_grace_sec
+        self.keep_finished = keep_finished
+        self._runs: "OrderedDict[str, _Run]" = OrderedDict()
+
+    def open(self, run_id: str, cancel_when_unwatched: bool = False) -> RunEventLog:
+        log = RunEventLog(run_id, self.capacity, self.spill_dir)
+        self._runs[run_id] = _Run(log, cancel_when_unwatched)
+        self._evict()
+        return log
+
+    def start(self, run_id: str, events: AsyncGenerator[dict, None], cancel_when_unwatched: bool = True) -> RunEventLog:
+        """Drive `events` in a background task, appending each one to the run's log."""
+        log = self.open(run_id, cancel_when_unwatched)
+        run = self._runs[run_id]
+
+        async def pump() -> None:
+            try:
+                async for event in events:
+                    log.append(event)
+            except asyncio.CancelledError:
+                log.append({"evt": "agent.cancelled"})
+                raise
+            except Exception as e:
+                logger.exception(f"run {run_id} failed")
+                log.append({"evt": "error", "where": "run", "error": str(e)})
+            finally:
+                await events.aclose()
+                log.close()
+
+        run.task = asyncio.create_task(pump())
+        # the caller attaches right away; if it never does, the grace timer still applies
+        self._arm_grace(run)
+        return log
+
+    def get(self, run_id: str) -> Optional[RunEventLog]:
+        run = self._runs.get(run_id)
+        return run.log if run else None
+
+    def cancel(self, run_id: str) -> bool:
+        run = self._runs.get(run_id)
+        if run is None or run.task is None or run.task.done():
+            return False
+        run.task.cancel()
+        return True
+
+    async def watch(self, run_id: str, after_id: int = 0) -> AsyncIterator[Optional[Tuple[int, dict]]]:
+        """follow() the run's log, counted as a viewer while the generator is open."""
+        run = self._runs[run_id]
+        run.viewers += 1
+        if run._grace is not None:
+            run._grace.cancel()
+            run._grace = None
+        try:
+            async for item in run.log.follow(after_id, self.heartbeat_sec):
+                yield item
+        finally:
+            run.viewers -= 1
+            if run.viewers == 0:
+                self._arm_grace(run)
+
+    def _arm_grace(self, run: _Run) -> None:
+        if not run.cancel_when_unwatched or run.log.closed or run.viewers:
+            return
+        if run._grace is not None:
+            run._grace.cancel()
+
+        def expire() -> None:
+            run._grace = None
+            if run.viewers == 0 and run.task is not None and not run.task.done():
+                print(f"Run {run.log.run_id}: no viewers for {self.reattach_grace_sec:g}s; cancelling")
+                logger.info(f"run {run.log.run_id} unwatched; cancelling")
+                run.task.cancel()
+
+        run._grace = asyncio.get_running_loop().call_later(self.reattach_grace_sec, expire)
+
+    async def shutdown(self) -> None:
+        tasks = [r.task for r in self._runs.values() if r.task is not None and not r.task.done()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {run_id: {"last_id": r.log.last_id, "viewers": r.viewers, "closed": r.log.closed,
+                         "spilled": r.log.spilled} for run_id, r in self._runs.items()}
+
+    def _evict(self) -> None:
+        finished = [rid for rid, r in self._runs.items() if r.log.closed]
+        for rid in finished[:max(0, len(finished) - self.keep_finished)]:
+            self._runs.pop(rid).log.discard()
+
+
+stream_hub = StreamHub(
+    capacity=int(_CFG.get("buffer_events", 1000)),
+    spill_dir=_CFG.get("spill_dir", "data/streams"),
+    heartbeat_sec=float(_CFG.get("heartbeat_sec", 15)),
+    reattach_grace_sec=float(_CFG.get("reattach_grace_sec", 30)),
+    keep_finished=int(_CFG.get("keep_finished", 200)),
+)
@@ -0,0 +1,163 @@
+# apps/orchestrator/tool_cache.py
+from __future__ import annotations
+import json, os, re, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .policy import policy
+from .tools.registry import canonical_tool_name as canonical_tool
+
+# Read-only tools whose results can be memoized, with the arg that names the file
+_FILE_TOOLS = {"fs_read": "path", "fs_listdir": "path", "data_csv_read": "path", "data_json_read": "path"}
+
+
+def _key(tool: str, args: Dict[str, Any]) -> str:
+    return canonical_tool(tool) + ":" + json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    if not isinstance(headers, dict):
+        return None
+    for k, v in headers.items():
+        if k.lower() == name:
+            return v
+    return None
+
+
+class _Lookup:
+    """One cache consultation: either a hit, or what to validate/store after the call."""
+    __slots__ = ("key", "kind", "validator", "hit", "conditional")
+
+    def __init__(self, key: str, kind: str):
+        self.key = key
+        self.kind = kind
+        self.validator: Any = None
+        self.hit: Optional[Dict[str, Any]] = None
+        self.conditional: Dict[str, str] = {}
+
+
+class ToolResultCache:
+    """
+    LRU memo of read-only tool results, capped by (approximate) serialized bytes.
+    File entries are valid while the path's mtime and size are unchanged;
+    GET entries live for their max-age/TTL and are then revalidated with
+    If-None-Match / If-Modified-Since when the response carried validators.
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, http_ttl_sec: int = 300):
+        self.max_bytes = max_bytes
+        self.http_ttl_sec = http_ttl_sec
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+    # ---------- validators ----------
+    @staticmethod
+    def _file_validator(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def begin(self, tool: str, args: Dict[str, Any]) -> Optional[_Lookup]:
+        """Returns None when the call is not cacheable."""
+        t = canonical_tool(tool)
+        if t in _FILE_TOOLS:
+            path = args.get(_FILE_TOOLS[t])
+            if not path or args.get("recursive"):
+                return None  # recursive listings depend on more than one mtime
+            lk = _Lookup(_key(t, args), "file")
+            lk.validator = self._file_validator(path)
+            if lk.validator is None:
+                return None
+        elif t == "http_request" and str(args.get("method", "GET")).upper() == "GET":
+            lk = _Lookup(_key(t, args), "http")
+        else:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(lk.key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return lk
+            if lk.kind == "file":
+                if entry["validator"] == lk.validator:
+                    lk.hit = entry["obs"]
+                else:
+                    self._drop(lk.key)
+            elif time.time() < entry["expires"]:
+                lk.hit = entry["obs"]
+            elif entry.get("etag") or entry.get("last_modified"):
+                if entry.get("etag"):
+                    lk.conditional["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    lk.conditional["If-Modified-Since"] = entry["last_modified"]
+            else:
+                self._drop(lk.key)
+            if lk.hit is not None:
+                self._entries.move_to_end(lk.key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+        return lk
+
+    def request_args(self, lk: _Lookup, args: Dict[str, Any]) -> Dict[str, Any]:
+        if not lk.conditional:
+            return args
+        return {**args, "headers": {**(args.get("headers") or {}), **lk.conditional}}
+
+    def finish(self, lk: _Lookup, obs: Any) -> Any:
+        """Store a fresh result, or turn a 304 into the cached one. Returns the observation to use."""
+        if not isinstance(obs, dict):
+            return obs
+        with self._lock:
+            if lk.conditional and obs.get("status") == 304 and lk.key in self._entries:
+                entry = self._entries[lk.key]
+                entry["expires"] = time.time() + self._ttl(obs.get("headers"))
+                self._entries.move_to_end(lk.key)
+                self.stats["revalidated"] += 1
+                return entry["obs"]
+            if not obs.get("ok"):
+                return obs
+            entry: Dict[str, Any] = {"obs": obs, "validator": lk.validator}
+            if lk.kind == "http":
+                headers = obs.get("headers")
+                entry["expires"] = time.time() + self._ttl(headers)
+                entry["etag"] = _header(headers, "etag")
+                entry["last_modified"] = _header(headers, "last-modified")
+            entry["size"] = len(json.dumps(obs, default=str))
+            if entry["size"] > self.max_bytes:
+                return obs
+            self._drop(lk.key)
+            self._entries[lk.key] = entry
+            self._bytes += entry["size"]
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return obs
+
+    def _ttl(self, headers: Any) -> int:
+        cc = _header(headers, "cache-control") or ""
+        if "no-store" in cc or "no-cache" in cc:
+            return 0
+        m = re.search(r"max-age=(\d+)", cc)
+        return int(m.group(1)) if m else self.http_ttl_sec
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry["size"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_CFG: Dict[str, Any] = policy.cfg.get("tool_cache", {}) or {}
+CACHE_ENABLED_BY_DEFAULT = bool(_CFG.get("enabled", False))
+tool_cache = ToolResultCache(
+    max_bytes=int(_CFG.get("max_bytes", 32 * 1024 * 1024)),
+    http_ttl_sec=int(_CFG.get("http_ttl_sec", 300)),
+)
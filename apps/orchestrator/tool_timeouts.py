@@ -0,0 +1,198 @@
+# apps/orchestrator/tool_timeouts.py
+from __future__ import annotations
+import inspect, json, math, os, threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .policy import policy
+from .tools.registry import TOOL_REGISTRY, LazyTool, canonical_tool_name
+
+_CFG: Dict[str, Any] = policy.cfg.get("timeouts", {}) or {}
+
+# Log-spaced latency buckets: 10 ms * 1.25^k, up to about an hour
+_BASE_MS = 10.0
+_GROWTH = 1.25
+_N_BUCKETS = 58
+
+
+def _bucket(ms: float) -> int:
+    if ms <= _BASE_MS:
+        return 0
+    return min(_N_BUCKETS - 1, int(math.ceil(math.log(ms / _BASE_MS, _GROWTH))))
+
+
+def _upper_ms(i: int) -> float:
+    return _BASE_MS * _GROWTH ** i
+
+
+class LatencyHistograms:
+    """
+    Per-tool latency histograms. A timed-out call is counted and binned at the
+    time it was given (its real latency is at least that), so a limit learned
+    too tight widens again. Persisted as one JSON file so the
+    learned timeouts survive restarts; saved every `save_every` calls and on shutdown.
+    """
+    def __init__(self, path: Optional[str] = None, save_every: int = 50):
+        self.path = Path(path) if path else None
+        self.save_every = max(1, save_every)
+        self._hist: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._load()
+
+    def _entry(self, tool: str) -> Dict[str, Any]:
+        return self._hist.setdefault(tool, {"counts": [0] * _N_BUCKETS, "n": 0, "timeouts": 0, "max_ms": 0.0})
+
+    def record(self, tool: str, elapsed_ms: float) -> None:
+        with self._lock:
+            e = self._entry(canonical_tool_name(tool))
+            e["counts"][_bucket(elapsed_ms)] += 1
+            e["n"] += 1
+            e["max_ms"] = round(max(e["max_ms"], elapsed_ms), 2)
+            self._dirty += 1
+            if self._dirty >= self.save_every:
+                self._save()
+
+    def record_timeout(self, tool: str, elapsed_ms: float) -> None:
+        self.record(tool, elapsed_ms)
+        with self._lock:
+            self._entry(canonical_tool_name(tool))["timeouts"] += 1
+
+    def quantile_ms(self, tool: str, q: float) -> Optional[float]:
+        """Upper edge of the bucket holding the q-quantile (None without history)."""
+        with self._lock:
+            e = self._hist.get(canonical_tool_name(tool))
+            if not e or not e["n"]:
+                return None
+            want, seen = q * e["n"], 0
+            for i, c in enumerate(e["counts"]):
+                seen += c
+                if seen >= want:
+                    return min(_upper_ms(i), max(e["max_ms"], _BASE_MS))
+            return e["max_ms"]
+
+    def samples(self, tool: str) -> int:
+        e = self._hist.get(canonical_tool_name(tool))
+        return e["n"] if e else 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for tool in sorted(self._hist):
+            e = self._hist[tool]
+            out[tool] = {"n": e["n"], "timeouts": e["timeouts"], "max_ms": e["max_ms"],
+                         "p50_ms": self.quantile_ms(tool, 0.5), "p99_ms": self.quantile_ms(tool, 0.99)}
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._save()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            hist = data.get("tools", {})
+            if data.get("buckets") == [_BASE_MS, _GROWTH, _N_BUCKETS]:
+                self._hist = hist
+        except (OSError, ValueError):
+            self._hist = {}
+
+    def _save(self) -> None:
+        self._dirty = 0
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": 1, "buckets": [_BASE_MS, _GROWTH, _N_BUCKETS], "tools": self._hist}),
+                           encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # history stays in memory only
+
+
+def own_timeout_sec(func: Any) -> Optional[float]:
+    """Default of the tool's own `timeout_sec` parameter, if it has one."""
+    if isinstance(func, LazyTool):
+        if not func.loaded:
+            return None
+        func = func.load()
+    try:
+        param = inspect.signature(func).parameters.get("timeout_sec")
+    except (TypeError, ValueError):
+        return None
+    default = param.default if param is not None else None
+    if isinstance(default, bool) or not isinstance(default, (int, float)) or default <= 0:
+        return None
+    return float(default)
+
+
+class TimeoutPolicy:
+    """
+    Timeout for one tool call, first match wins:
+      1. the call's own `timeout_sec` argument (+ grace, so the tool's own limit fires first)
+      2. options.tool_timeouts[tool] for the run
+      3. timeouts.tools[tool] in guardrails.yaml
+      4. learned: quantile of the tool's history x multiplier, within [floor, ceiling], and
+         never below the tool's own default timeout_sec (+ grace): quick calls in the
+         history must not cut short a slow one (terminal_run: echo, then npm install)
+      5. default_sec
+    """
+    def __init__(self, histograms: LatencyHistograms, cfg: Dict[str, Any]):
+        self.hist = histograms
+        self._default_sec = cfg.get("default_sec")
+        self.learn = bool(cfg.get("learn", True))
+        self.min_samples = int(cfg.get("min_samples", 20))
+        self.quantile = float(cfg.get("quantile", 0.99))
+        self.multiplier = float(cfg.get("multiplier", 3.0))
+        self.floor_sec = float(cfg.get("floor_sec", 5))
+        self.ceiling_sec = float(cfg.get("ceiling_sec", 900))
+        self.grace_sec = float(cfg.get("grace_sec", 5))
+        self.fixed = {canonical_tool_name(k): float(v) for k, v in (cfg.get("tools", {}) or {}).items()}
+
+    @property
+    def default_sec(self) -> float:
+        if self._default_sec is not None:
+            return float(self._default_sec)
+        return float((policy.defaults() or {}).get("max_tool_runtime_sec", 120))
+
+    def learned(self, tool: str) -> Optional[float]:
+        if not self.learn or self.hist.samples(tool) < self.min_samples:
+            return None
+        q = self.hist.quantile_ms(tool, self.quantile)
+        if q is None:
+            return None
+        return round(min(self.ceiling_sec, max(self.floor_sec, q / 1000 * self.multiplier)), 1)
+
+    def timeout_for(self, tool: str, args: Optional[Dict[str, Any]] = None,
+                    overrides: Optional[Dict[str, Any]] = None, func: Any = None) -> float:
+        """`func`: the tool being called (defaults to its registry entry), for its own default limit."""
+        name = canonical_tool_name(tool)
+        own = (args or {}).get("timeout_sec")
+        if isinstance(own, (int, float)) and own > 0:
+            return float(own) + self.grace_sec
+        for table in ({canonical_tool_name(k): v for k, v in (overrides or {}).items()}, self.fixed):
+            if name in table:
+                return float(table[name])
+        learned = self.learned(name)
+        if learned is None:
+            return self.default_sec
+        entry = func if func is not None else TOOL_REGISTRY.get(name)
+        if isinstance(entry, LazyTool) and not entry.loaded:
+            return self.default_sec  # its own limit is unknown until it is imported: don't undercut it
+        own_default = own_timeout_sec(entry)
+        return max(learned, own_default + self.grace_sec) if own_default is not None else learned
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {tool: {**stats, "timeout_sec": self.timeout_for(tool)} for tool, stats in self.hist.snapshot().items()}
+
+
+latency_histograms = LatencyHistograms(path=_CFG.get("path"), save_every=int(_CFG.get("save_every", 50)))
+timeout_policy = TimeoutPolicy(latency_histograms, _CFG)
@@ -0,0 +1,182 @@
+# apps/orchestrator/tools/browser_tools.py
+"""
+Browser tool wrappers. Importing this module picks the backend (Selenium on
+Windows when available, else system commands; async Playwright elsewhere), so
+the registry only loads it when a browser tool is first used.
+"""
+from __future__ import annotations
+import sys
+import asyncio
+from typing import Dict, Any
+
+from ..executors import run_in_pool
+
+# --- Simple browser solution for Windows ---
+BROWSER_METHOD = "none"
+
+if sys.platform == "win32":
+    try:
+        # Try Selenium first
+        from ...worker.browser_selenium import (
+            browser_nav_selenium, browser_click_selenium, browser_type_selenium,
+            browser_wait_ms_selenium, browser_eval_selenium
+        )
+        BROWSER_METHOD = "selenium"
+        print("Using Selenium for browser automation")
+        
+        # Map to consistent names
+        browser_nav_impl = browser_nav_selenium
+        browser_click_impl = browser_click_selenium
+        browser_type_impl = browser_type_selenium
+        browser_wait_ms_impl = browser_wait_ms_selenium
+        browser_eval_impl = browser_eval_selenium
+        
+    except ImportError:
+        # Fallback to system command approach
+        BROWSER_METHOD = "system"
+        print("Using system commands for browser automation")
+        
+        import subprocess
+        import webbrowser
+        
+        def browser_nav_system(url: str, **kwargs) -> Dict[str, Any]:
+            try:
+                webbrowser.open(url)
+                return {"ok": True, "url": url, "title": "opened_in_default_browser"}
+            except Exception as e:
+                return {"ok": False, "error": f"system_nav_error: {e}"}
+        
+        def browser_click_system(selector: str, **kwargs) -> Dict[str, Any]:
+            return {"ok": False, "error": "click_not_supported_in_system_mode"}
+        
+        def browser_type_system(selector: str, text: str, **kwargs) -> Dict[str, Any]:
+            return {"ok": False, "error": "type_not_supported_in_system_mode"}
+        
+        def browser_wait_ms_system(ms: int = 500, **kwargs) -> Dict[str, Any]:
+            import time
+            time.sleep(max(ms, 0) / 1000.0)
+            return {"ok": True, "waited_ms": ms}
+        
+        def browser_eval_system(js: str, **kwargs) -> Dict[str, Any]:
+            return {"ok": False, "error": "eval_not_supported_in_system_mode"}
+        
+        browser_nav_impl = browser_nav_system
+        browser_click_impl = browser_click_system
+        browser_type_impl = browser_type_system
+        browser_wait_ms_impl = browser_wait_ms_system
+        browser_eval_impl = browser_eval_system
+        
+else:
+    # Non-Windows: try async Playwright
+    try:
+        from ...worker.browser import (
+            browser_nav, browser_click, browser_type, browser_wait_ms, browser_eval
+        )
+        BROWSER_METHOD = "playwright_async"
+        browser_nav_impl = browser_nav
+        browser_click_impl = browser_click
+        browser_type_impl = browser_type
+        browser_wait_ms_impl = browser_wait_ms
+        browser_eval_impl = browser_eval
+    except ImportError:
+        BROWSER_METHOD = "none"
+        def browser_error(**kwargs):
+            return {"ok": False, "error": "browser_not_available"}
+        browser_nav_impl = browser_error
+        browser_click_impl = browser_error
+        browser_type_impl = browser_error
+        browser_wait_ms_impl = browser_error
+        browser_eval_impl = browser_error
+
+_PW_BOUND = False
+pw_browser_download = None  # type: ignore
+
+def ensure_playwright_bound() -> None:
+    global _PW_BOUND, BROWSER_METHOD
+    global browser_nav_impl, browser_click_impl, browser_type_impl, browser_wait_ms_impl, browser_eval_impl
+    global pw_browser_download
+    if _PW_BOUND:
+        return
+    try:
+        from ...worker.browser import (
+            browser_nav as pw_browser_nav,
+            browser_click as pw_browser_click,
+            browser_type as pw_browser_type,
+            browser_wait_ms as pw_browser_wait_ms,
+            browser_eval as pw_browser_eval,
+            browser_download as _pw_browser_download,
+        )
+        BROWSER_METHOD = "playwright_async"
+        browser_nav_impl = pw_browser_nav
+        browser_click_impl = pw_browser_click
+        browser_type_impl = pw_browser_type
+        browser_wait_ms_impl = pw_browser_wait_ms
+        browser_eval_impl = pw_browser_eval
+        pw_browser_download = _pw_browser_download
+        _PW_BOUND = True
+    except Exception:
+        # Leave as-is; wrappers will continue to use current impls
+        pass
+
+# Create async wrappers
+async def browser_nav_wrapper(url: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async":
+        return await browser_nav_impl(url, profile, headless=headless)
+    else:
+        # Playwright's sync API is bound to one thread: always the browser pool
+        return await run_in_pool("browser", browser_nav_impl, url, profile, headless)
+
+async def browser_click_wrapper(selector: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async":
+        return await browser_click_impl(selector, profile)
+    else:
+        return await run_in_pool("browser", browser_click_impl, selector, profile, headless)
+
+async def browser_type_wrapper(selector: str, text: str, profile: str = "default", 
+                              clear: bool = False, press_enter: bool = False, headless: bool = False) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async":
+        return await browser_type_impl(selector, text, profile, clear, press_enter)
+    else:
+        return await run_in_pool("browser", browser_type_impl, selector, text, profile, clear, press_enter, headless)
+
+async def browser_wait_ms_wrapper(ms: int = 500) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async":
+        return await browser_wait_ms_impl(ms)
+    else:
+        return await run_in_pool("browser", browser_wait_ms_impl, ms)
+
+async def browser_eval_wrapper(js: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async":
+        return await browser_eval_impl(js, profile)
+    else:
+        return await run_in_pool("browser", browser_eval_impl, js, profile, headless)
+
+# Stub for browser_download
+async def browser_download_stub(**kwargs) -> Dict[str, Any]:
+    return {"ok": False, "error": f"download_not_available_in_{BROWSER_METHOD}_mode"}
+
+async def browser_download_wrapper(**kwargs) -> Dict[str, Any]:
+    if BROWSER_METHOD != "playwright_async":
+        ensure_playwright_bound()
+    if BROWSER_METHOD == "playwright_async" and pw_browser_download:
+        return await pw_browser_download(**kwargs)
+    return await browser_download_stub(**kwargs)
+
+# Optional multi-step browser executor
+try:
+    from ...worker.browser_actions import browser_execute as browser_execute_impl
+except Exception:
+    async def browser_execute_impl(**kwargs) -> dict:
+        return {"ok": False, "error": f"browser_execute_not_available_in_{BROWSER_METHOD}_mode"}
+
+print(f"Browser automation method: {BROWSER_METHOD}")
@@ -1,321 +1,297 @@
 from __future__ import annotations
-import sys
-import asyncio
-from typing import Dict, Callable, Awaitable, Any
+import importlib
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Callable, Awaitable, Any, Mapping, NamedTuple
 import difflib
 
-# --- Simple browser solution for Windows ---
-BROWSER_METHOD = "none"
-
-if sys.platform == "win32":
-    try:
-        # Try Selenium first
-        from ...worker.browser_selenium import (
-            browser_nav_selenium, browser_click_selenium, browser_type_selenium,
-            browser_wait_ms_selenium, browser_eval_selenium
-        )
-        BROWSER_METHOD = "selenium"
-        print("Using Selenium for browser automation")
-        
-        # Map to consistent names
-        browser_nav_impl = browser_nav_selenium
-        browser_click_impl = browser_click_selenium
-        browser_type_impl = browser_type_selenium
-        browser_wait_ms_impl = browser_wait_ms_selenium
-        browser_eval_impl = browser_eval_selenium
-        
-    except ImportError:
-        # Fallback to system command approach
-        BROWSER_METHOD = "system"
-        print("Using system commands for browser automation")
-        
-        import subprocess
-        import webbrowser
-        
-        def browser_nav_system(url: str, **kwargs) -> Dict[str, Any]:
-            try:
-                webbrowser.open(url)
-                return {"ok": True, "url": url, "title": "opened_in_default_browser"}
-            except Exception as e:
-                return {"ok": False, "error": f"system_nav_error: {e}"}
-        
-        def browser_click_system(selector: str, **kwargs) -> Dict[str, Any]:
-            return {"ok": False, "error": "click_not_supported_in_system_mode"}
-        
-        def browser_type_system(selector: str, text: str, **kwargs) -> Dict[str, Any]:
-            return {"ok": False, "error": "type_not_supported_in_system_mode"}
-        
-        def browser_wait_ms_system(ms: int = 500, **kwargs) -> Dict[str, Any]:
-            import time
-            time.sleep(max(ms, 0) / 1000.0)
-            return {"ok": True, "waited_ms": ms}
-        
-        def browser_eval_system(js: str, **kwargs) -> Dict[str, Any]:
-            return {"ok": False, "error": "eval_not_supported_in_system_mode"}
-        
-        browser_nav_impl = browser_nav_system
-        browser_click_impl = browser_click_system
-        browser_type_impl = browser_type_system
-        browser_wait_ms_impl = browser_wait_ms_system
-        browser_eval_impl = browser_eval_system
-        
-else:
-    # Non-Windows: try async Playwright
-    try:
-        from ...worker.browser import (
-            browser_nav, browser_click, browser_type, browser_wait_ms, browser_eval
-        )
-        BROWSER_METHOD = "playwright_async"
-        browser_nav_impl = browser_nav
-        browser_click_impl = browser_click
-        browser_type_impl = browser_type
-        browser_wait_ms_impl = browser_wait_ms
-        browser_eval_impl = browser_eval
-    except ImportError:
-        BROWSER_METHOD = "none"
-        def browser_error(**kwargs):
-            return {"ok": False, "error": "browser_not_available"}
-        browser_nav_impl = browser_error
-        browser_click_impl = browser_error
-        browser_type_impl = browser_error
-        browser_wait_ms_impl = browser_error
-        browser_eval_impl = browser_error
-
-_PW_BOUND = False
-pw_browser_download = None  # type: ignore
-
-def ensure_playwright_bound() -> None:
-    global _PW_BOUND, BROWSER_METHOD
-    global browser_nav_impl, browser_click_impl, browser_type_impl, browser_wait_ms_impl, browser_eval_impl
-    global pw_browser_download
-    if _PW_BOUND:
-        return
-    try:
-        from ...worker.browser import (
-            browser_nav as pw_browser_nav,
-            browser_click as pw_browser_click,
-            browser_type as pw_browser_type,
-            browser_wait_ms as pw_browser_wait_ms,
-            browser_eval as pw_browser_eval,
-            browser_download as _pw_browser_download,
-        )
-        BROWSER_METHOD = "playwright_async"
-        browser_nav_impl = pw_browser_nav
-        browser_click_impl = pw_browser_click
-        browser_type_impl = pw_browser_type
-        browser_wait_ms_impl = pw_browser_wait_ms
-        browser_eval_impl = pw_browser_eval
-        pw_browser_download = _pw_browser_download
-        _PW_BOUND = True
-    except Exception:
-        # Leave as-is; wrappers will continue to use current impls
-        pass
-
-# Create async wrappers
-async def browser_nav_wrapper(url: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async":
-        return await browser_nav_impl(url, profile, headless)
-    else:
-        # Run sync version in thread pool
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, browser_nav_impl, url, profile, headless)
-
-async def browser_click_wrapper(selector: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async":
-        return await browser_click_impl(selector, profile)
-    else:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, browser_click_impl, selector, profile, headless)
-
-async def browser_type_wrapper(selector: str, text: str, profile: str = "default", 
-                              clear: bool = False, press_enter: bool = False, headless: bool = False) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async":
-        return await browser_type_impl(selector, text, profile, clear, press_enter)
-    else:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, browser_type_impl, selector, text, profile, clear, press_enter, headless)
-
-async def browser_wait_ms_wrapper(ms: int = 500) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async":
-        return await browser_wait_ms_impl(ms)
-    else:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, browser_wait_ms_impl, ms)
-
-async def browser_eval_wrapper(js: str, profile: str = "default", headless: bool = False) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async":
-        return await browser_eval_impl(js, profile)
-    else:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, browser_eval_impl, js, profile, headless)
-
-# Stub for browser_download
-async def browser_download_stub(**kwargs) -> Dict[str, Any]:
-    return {"ok": False, "error": f"download_not_available_in_{BROWSER_METHOD}_mode"}
-
-async def browser_download_wrapper(**kwargs) -> Dict[str, Any]:
-    if BROWSER_METHOD != "playwright_async":
-        ensure_playwright_bound()
-    if BROWSER_METHOD == "playwright_async" and pw_browser_download:
-        return await pw_browser_download(**kwargs)
-    return await browser_download_stub(**kwargs)
-
-# Import other modules
-from ...worker.fs import fs_read, fs_write, fs_move, fs_copy, fs_delete, fs_listdir
-from ...worker.terminal import terminal_run
-from ...worker.pkg import pkg_install, pkg_uninstall, pkg_ensure
-from ...worker.http_tool import http_request
-from ...worker.data_utils import csv_read, csv_write, json_read, json_write
-from ...worker.ui import ui_focus, ui_click, ui_type, ui_menu_select, ui_wait, ui_shortcut
-from ...worker.vscode_bridge import vscode_open, vscode_save_all, vscode_get_diagnostics, vscode_install_extension
-
-# Optional multi-step browser executor
-try:
-    from ...worker.browser_actions import browser_execute as browser_execute_impl
-except Exception:
-    async def browser_execute_impl(**kwargs) -> dict:
-        return {"ok": False, "error": f"browser_execute_not_available_in_{BROWSER_METHOD}_mode"}
-
-try:
-    from ...worker.app_launch import launch
-except Exception:
-    def launch(name: str) -> dict:
-        return {"ok": False, "error": "app_launch_not_implemented"}
-
-# Register WhatsApp Desktop chat tool via lazy import wrapper to avoid import-time failures
-import asyncio
-async def whatsapp_desktop_chat(**kwargs):  # type: ignore
-    try:
-        # Lazy import so missing deps (e.g., uiautomation) don't break registry import
-        from ...worker.skills.whatsapp_desktop_chat import run_desktop_chat
-        import uiautomation as auto  # ensure available here for initializer
-    except ImportError as e:
-        return {"ok": False, "error": f"whatsapp_desktop_chat_dep_missing: {e}"}
-    except Exception as e:
-        return {"ok": False, "error": f"whatsapp_desktop_chat_import_error: {e}"}
-
-    def _invoke() -> dict:
-        # Initialize UIAutomation/COM in this thread
-        try:
-            with auto.UIAutomationInitializerInThread():
-                return run_desktop_chat(**kwargs)
-        except Exception as e:
-            return {"ok": False, "error": f"whatsapp_desktop_chat_runtime_error: {e}"}
-
-    loop = asyncio.get_event_loop()
-    try:
-        # run_desktop_chat is synchronous; run in thread with proper UIA init
-        return await loop.run_in_executor(None, _invoke)
-    except Exception as e:
-        return {"ok": False, "error": f"whatsapp_desktop_chat_runtime_error: {e}"}
 
-# TOOL REGISTRY
-TOOL_REGISTRY: Dict[str, Callable[..., Awaitable[dict]] | Callable[..., dict]] = {
+# --- Lazy tools: registered by "module:attr", imported on first use ---
+class LazyTool:
+    """
+    Registry entry that imports its implementation on first use. Import time and
+    any import error are kept on the entry (see tool_import_report). If the module
+    cannot be imported the tool resolves to a stub returning {"ok": False, ...}.
+    """
+    __slots__ = ("name", "target", "unavailable", "pool", "_func", "_lock", "import_ms", "error")
+
+    def __init__(self, name: str, target: str, unavailable: str | None = None, pool: str = "io"):
+        self.name = name
+        self.target = target
+        self.unavailable = unavailable or f"{name}_not_available"
+        self.pool = pool  # executor pool a sync implementation runs in (see executors.py)
+        self._func: Callable[..., Any] | None = None
+        self._lock = threading.Lock()
+        self.import_ms: float | None = None
+        self.error: str | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def load(self) -> Callable[..., Any]:
+        if self._func is not None:
+            return self._func
+        with self._lock:
+            if self._func is None:
+                module, _, attr = self.target.partition(":")
+                t0 = time.perf_counter()
+                try:
+                    func = getattr(importlib.import_module(module), attr)
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    func = self._stub()
+                self.import_ms = round((time.perf_counter() - t0) * 1000, 2)
+                self._func = func
+        return self._func
+
+    def _stub(self) -> Callable[..., dict]:
+        error = f"{self.unavailable}: {self.error}"
+        def unavailable(**kwargs) -> dict:
+            return {"ok": False, "error": error}
+        return unavailable
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyTool({self.name!r}, {self.target!r}, loaded={self.loaded})"
+
+
+# TOOL SPECS: name -> "module:attr" (optionally with the error code used when the import fails)
+_BROWSER = "apps.orchestrator.tools.browser_tools"
+TOOL_SPECS: Dict[str, str | tuple[str, str]] = {
     # Browser (using wrappers)
-    "browser_nav": browser_nav_wrapper,
-    "browser_type": browser_type_wrapper,
-    "browser_click": browser_click_wrapper,
-    "browser_wait_ms": browser_wait_ms_wrapper,
-    "browser_eval": browser_eval_wrapper,
-    "browser_download": browser_download_wrapper,
-    "browser_execute": browser_execute_impl,
-    
+    "browser_nav": f"{_BROWSER}:browser_nav_wrapper",
+    "browser_type": f"{_BROWSER}:browser_type_wrapper",
+    "browser_click": f"{_BROWSER}:browser_click_wrapper",
+    "browser_wait_ms": f"{_BROWSER}:browser_wait_ms_wrapper",
+    "browser_eval": f"{_BROWSER}:browser_eval_wrapper",
+    "browser_download": f"{_BROWSER}:browser_download_wrapper",
+    "browser_execute": f"{_BROWSER}:browser_execute_impl",
+
     # Filesystem
-    "fs_read": fs_read,
-    "fs_write": fs_write,
-    "fs_move": fs_move,
-    "fs_copy": fs_copy,
-    "fs_delete": fs_delete,
-    "fs_listdir": fs_listdir,
+    "fs_read": "apps.worker.fs:fs_read",
+    "fs_write": "apps.worker.fs:fs_write",
+    "fs_move": "apps.worker.fs:fs_move",
+    "fs_copy": "apps.worker.fs:fs_copy",
+    "fs_delete": "apps.worker.fs:fs_delete",
+    "fs_listdir": "apps.worker.fs:fs_listdir",
 
     # Terminal / Packages
-    "terminal_run": terminal_run,
-    "pkg_install": pkg_install,
-    "pkg_uninstall": pkg_uninstall,
-    "pkg_ensure": pkg_ensure,
+    "terminal_run": "apps.worker.terminal:terminal_run",
+    "pkg_install": "apps.worker.pkg:pkg_install",
+    "pkg_uninstall": "apps.worker.pkg:pkg_uninstall",
+    "pkg_ensure": "apps.worker.pkg:pkg_ensure",
 
     # HTTP / Data
-    "http_request": http_request,
-    "data_csv.read": csv_read,
-    "data_csv.write": csv_write,
-    "data_json.read": json_read,
-    "data_json.write": json_write,
+    "http_request": "apps.worker.http_tool:http_request",
+    "data_csv.read": "apps.worker.data_utils:csv_read",
+    "data_csv.write": "apps.worker.data_utils:csv_write",
+    "data_json.read": "apps.worker.data_utils:json_read",
+    "data_json.write": "apps.worker.data_utils:json_write",
 
     # Desktop UI
-    "ui_focus": ui_focus,
-    "ui_click": ui_click,
-    "ui_type": ui_type,
-    "ui_menu_select": ui_menu_select,
-    "ui_wait": ui_wait,
-    "ui_shortcut": ui_shortcut,
+    "ui_focus": "apps.worker.ui:ui_focus",
+    "ui_click": "apps.worker.ui:ui_click",
+    "ui_type": "apps.worker.ui:ui_type",
+    "ui_menu_select": "apps.worker.ui:ui_menu_select",
+    "ui_wait": "apps.worker.ui:ui_wait",
+    "ui_shortcut": "apps.worker.ui:ui_shortcut",
 
     # VS Code
-    "vscode_open": vscode_open,
-    "vscode_save_all": vscode_save_all,
-    "vscode_get_diagnostics": vscode_get_diagnostics,
-    "vscode_install_extension": vscode_install_extension,
+    "vscode_open": "apps.worker.vscode_bridge:vscode_open",
+    "vscode_save_all": "apps.worker.vscode_bridge:vscode_save_all",
+    "vscode_get_diagnostics": "apps.worker.vscode_bridge:vscode_get_diagnostics",
+    "vscode_install_extension": "apps.worker.vscode_bridge:vscode_install_extension",
 
     # App launch
-    "app_launch": launch,
+    "app_launch": ("apps.worker.app_launch:launch", "app_launch_not_implemented"),
+
+    # WhatsApp Desktop chat (imports the skill per call)
+    "whatsapp_desktop_chat": "apps.orchestrator.tools.whatsapp_tools:whatsapp_desktop_chat",
 
-    # WhatsApp Desktop chat (lazy wrapper)
-    "whatsapp_desktop_chat": whatsapp_desktop_chat,
+    # Large observation fields offloaded by the orchestrator
+    "artifact_read": "apps.orchestrator.artifacts:artifact_read",
 }
 
-print(f"Browser automation method: {BROWSER_METHOD}")
+# ---- Executor pool per tool (sync implementations only; default "io") ----
+TOOL_POOLS: Dict[str, str] = {
+    "http_request": "network",
+    "ui_focus": "desktop-ui",
+    "ui_click": "desktop-ui",
+    "ui_type": "desktop-ui",
+    "ui_menu_select": "desktop-ui",
+    "ui_wait": "desktop-ui",
+    "ui_shortcut": "desktop-ui",
+    "app_launch": "desktop-ui",
+}
 
 # ---- Aliases for dot/underscore variants and inline-plan names ----
-TOOL_REGISTRY.update({
+TOOL_ALIASES: Dict[str, str] = {
     # inline/dot style
-    "terminal.run": TOOL_REGISTRY.get("terminal_run"),
-    "fs.write": TOOL_REGISTRY.get("fs_write"),
-    "fs.move": TOOL_REGISTRY.get("fs_move"),
-    "fs.copy": TOOL_REGISTRY.get("fs_copy"),
-    "fs.delete": TOOL_REGISTRY.get("fs_delete"),
-    "fs.listdir": TOOL_REGISTRY.get("fs_listdir"),
-    "browser.execute": TOOL_REGISTRY.get("browser_execute"),
+    "terminal.run": "terminal_run",
+    "fs.write": "fs_write",
+    "fs.move": "fs_move",
+    "fs.copy": "fs_copy",
+    "fs.delete": "fs_delete",
+    "fs.listdir": "fs_listdir",
+    "browser.execute": "browser_execute",
     # underscore data tool names used in LLM specs
-    "data_csv_read": TOOL_REGISTRY.get("data_csv.read"),
-    "data_csv_write": TOOL_REGISTRY.get("data_csv.write"),
-    "data_json_read": TOOL_REGISTRY.get("data_json.read"),
-    "data_json_write": TOOL_REGISTRY.get("data_json.write"),
+    "data_csv_read": "data_csv.read",
+    "data_csv_write": "data_csv.write",
+    "data_json_read": "data_json.read",
+    "data_json_write": "data_json.write",
     # WhatsApp friendly aliases
-    "whatsapp_send": TOOL_REGISTRY.get("whatsapp_desktop_chat"),
-    "whatsapp.chat": TOOL_REGISTRY.get("whatsapp_desktop_chat"),
-})
+    "whatsapp_send": "whatsapp_desktop_chat",
+    "whatsapp.chat": "whatsapp_desktop_chat",
+}
+
+
+class _Registry(dict):
+    """name -> callable. Writes bump `version` so the frozen index rebuilds on next lookup."""
+    version = 0
+
+    def __setitem__(self, k, v):
+        super().__setitem__(k, v)
+        self.version += 1
+
+    def __delitem__(self, k):
+        super().__delitem__(k)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def setdefault(self, k, v=None):
+        self.version += 1
+        return super().setdefault(k, v)
+
+    def clear(self):
+        super().clear()
+        self.version += 1
 
-# --- Robust tool lookup: case-insensitive and fuzzy matching ---
-def get_tool(tool_name: str, registry: dict) -> tuple[object, str] | tuple[None, None]:
+
+def _build_registry() -> _Registry:
+    reg: Dict[str, Callable[..., Any]] = {}
+    for name, spec in TOOL_SPECS.items():
+        target, unavailable = spec if isinstance(spec, tuple) else (spec, None)
+        reg[name] = LazyTool(name, target, unavailable, TOOL_POOLS.get(name, "io"))
+    for alias, name in TOOL_ALIASES.items():
+        reg[alias] = reg[name]
+    # --- Ensure TOOL_REGISTRY keys are lowercase for robust matching ---
+    return _Registry((k.lower(), v) for k, v in reg.items())
+
+
+# TOOL REGISTRY
+TOOL_REGISTRY: Dict[str, Callable[..., Awaitable[dict]] | Callable[..., dict]] = _build_registry()
+
+
+def tool_import_report() -> Dict[str, Dict[str, Any]]:
+    """Per-tool import state: target, whether it has been imported, cost in ms, error."""
+    report: Dict[str, Dict[str, Any]] = {}
+    for name in TOOL_SPECS:
+        t = TOOL_REGISTRY.get(name.lower())
+        if isinstance(t, LazyTool):
+            report[name] = {"target": t.target, "loaded": t.loaded, "import_ms": t.import_ms, "error": t.error}
+    return report
+
+
+# --- Precompiled tool index: O(1) lookups, memoized fuzzy matches ---
+def canonical_tool_name(name: str) -> str:
+    """One key for every spelling: case, "functions." prefix, dots vs underscores."""
+    n = (name or "").strip().lower().removeprefix("functions.")
+    return n.replace(".", "_").replace("-", "_")
+
+
+class ToolMatch(NamedTuple):
+    func: Callable[..., Any] | None
+    name: str | None      # canonical tool name
+    kind: str             # "exact" | "alias" | "fuzzy" | "missing"
+    score: float = 1.0    # similarity for fuzzy matches
+
+
+class ToolIndex:
+    """
+    Immutable snapshot of a registry. Exact and alias lookups are dict hits;
+    names that need difflib are resolved once and memoized (hits and misses).
+    """
+    FUZZY_CUTOFF = 0.7
+    _MEMO_MAX = 1024
+
+    def __init__(self, registry: Mapping[str, Callable[..., Any]]):
+        by_key: Dict[str, Callable[..., Any]] = {}
+        for k, v in registry.items():
+            if v is not None:
+                by_key.setdefault(canonical_tool_name(k), v)
+        self._by_key: Mapping[str, Callable[..., Any]] = MappingProxyType(by_key)
+        self._exact = frozenset(k.lower() for k, v in registry.items() if v is not None)
+        self._keys = tuple(self._by_key)
+        self._memo: Dict[str, ToolMatch] = {}
+        self.version = getattr(registry, "version", 0)
+
+    def __contains__(self, name: str) -> bool:
+        return canonical_tool_name(name) in self._by_key
+
+    def names(self) -> tuple[str, ...]:
+        return self._keys
+
+    def lookup(self, tool_name: str) -> ToolMatch:
+        key = canonical_tool_name(tool_name)
+        func = self._by_key.get(key)
+        if func is not None:
+            kind = "exact" if (tool_name or "").lower() in self._exact else "alias"
+            return ToolMatch(func, key, kind)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        close = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.FUZZY_CUTOFF)
+        if close:
+            score = difflib.SequenceMatcher(None, key, close[0]).ratio()
+            hit = ToolMatch(self._by_key[close[0]], close[0], "fuzzy", round(score, 3))
+        else:
+            hit = ToolMatch(None, None, "missing", 0.0)
+        if len(self._memo) < self._MEMO_MAX:
+            self._memo[key] = hit
+        return hit
+
+
+TOOL_INDEX = ToolIndex(TOOL_REGISTRY)
+
+
+def refresh_tool_index() -> ToolIndex:
+    """Re-freeze the index after registering tools at runtime."""
+    global TOOL_INDEX
+    TOOL_INDEX = ToolIndex(TOOL_REGISTRY)
+    return TOOL_INDEX
+
+
+def lookup_tool(tool_name: str) -> ToolMatch:
+    index = TOOL_INDEX
+    if index.version != TOOL_REGISTRY.version:
+        index = refresh_tool_index()  # tools were registered/removed at runtime
+    return index.lookup(tool_name)
+
+
+def get_tool(tool_name: str, registry: dict | None = None) -> tuple[object, str] | tuple[None, None]:
     """
     Returns (tool_callable, matched_name) or (None, None) if not found.
-    Tries exact match (case-insensitive), then fuzzy match.
+    Uses the frozen TOOL_INDEX for the global registry; any other mapping
+    gets a throwaway index (same matching rules).
     """
-    tool_name_lc = tool_name.lower()
-    # Ensure registry keys are lowercase
-    registry_lc = {k.lower(): v for k, v in registry.items()}
-    # Exact match
-    if tool_name_lc in registry_lc:
-        return registry_lc[tool_name_lc], tool_name_lc
-    # Fuzzy match
-    close = difflib.get_close_matches(tool_name_lc, registry_lc.keys(), n=1, cutoff=0.7)
-    if close:
-        return registry_lc[close[0]], close[0]
-    return None, None
-
-# --- Ensure TOOL_REGISTRY keys are lowercase for robust matching ---
-TOOL_REGISTRY = {k.lower(): v for k, v in TOOL_REGISTRY.items()}
+    if registry is None or registry is TOOL_REGISTRY:
+        m = lookup_tool(tool_name)
+    else:
+        m = ToolIndex(registry).lookup(tool_name)
+    return (m.func, m.name) if m.func else (None, None)
 
 # Usage example (in orchestrator):
 #   tool, matched_name = get_tool(tool_name, TOOL_REGISTRY)
 #   if not tool:
-#       ... handle unknown tool ...
\ No newline at end of file
+#       ... handle unknown tool ...
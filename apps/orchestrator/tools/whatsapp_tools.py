@@ -0,0 +1,29 @@
+# apps/orchestrator/tools/whatsapp_tools.py
+from __future__ import annotations
+
+from ..executors import run_in_pool
+
+# WhatsApp Desktop chat tool; the skill (uiautomation, pyperclip) is imported per call
+async def whatsapp_desktop_chat(**kwargs):  # type: ignore
+    try:
+        # Lazy import so missing deps (e.g., uiautomation) don't break registry import
+        from ...worker.skills.whatsapp_desktop_chat import run_desktop_chat
+        import uiautomation as auto  # ensure available here for initializer
+    except ImportError as e:
+        return {"ok": False, "error": f"whatsapp_desktop_chat_dep_missing: {e}"}
+    except Exception as e:
+        return {"ok": False, "error": f"whatsapp_desktop_chat_import_error: {e}"}
+
+    def _invoke() -> dict:
+        # Initialize UIAutomation/COM in this thread
+        try:
+            with auto.UIAutomationInitializerInThread():
+                return run_desktop_chat(**kwargs)
+        except Exception as e:
+            return {"ok": False, "error": f"whatsapp_desktop_chat_runtime_error: {e}"}
+
+    try:
+        # run_desktop_chat is synchronous; run it on the desktop-ui thread with proper UIA init
+        return await run_in_pool("desktop-ui", _invoke)
+    except Exception as e:
+        return {"ok": False, "error": f"whatsapp_desktop_chat_runtime_error: {e}"}
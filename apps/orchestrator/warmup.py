@@ -0,0 +1,218 @@
+# apps/orchestrator/warmup.py
+from __future__ import annotations
+import asyncio, logging, os, re, shutil, sys, time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .policy import policy
+from .executors import POOLS, run_in_pool
+from .tools.registry import TOOL_REGISTRY, LazyTool, canonical_tool_name, lookup_tool
+
+logger = logging.getLogger("uvicorn.error")
+
+_CFG: Dict[str, Any] = policy.cfg.get("warmup", {}) or {}
+WARMUP_ENABLED_BY_DEFAULT = bool(_CFG.get("enabled", False))
+_GOAL_PROFILE_RE = re.compile(r"^\s*profile\s*:\s*(.+?)\s*$", re.I | re.M)  # same hint the inline plan reads
+
+
+class Backend:
+    """
+    A tool backend with a cold start worth hiding: which tools use it, which goal
+    words predict it, and how to warm it. `warm(options)` returns what it did
+    (None when it was already warm); `pool` is the executor pool it would load.
+    """
+    def __init__(self, name: str, tools: List[str], keywords: str, pool: str,
+                 warm: Callable[[Dict[str, Any]], Awaitable[Optional[str]]]):
+        self.name = name
+        self.tools = [canonical_tool_name(t) for t in tools]
+        self.keywords = re.compile(keywords, re.I)
+        self.pool = pool
+        self.warm = warm
+
+    def serves(self, tool: str) -> bool:
+        name = lookup_tool(tool).name or canonical_tool_name(tool)
+        return any(name == t or (t.endswith("_") and name.startswith(t)) for t in self.tools)
+
+
+async def _load_tools(prefixes: List[str]) -> bool:
+    """Import the modules behind registry entries (the lazy registry's first-use cost)."""
+    cold = [t for name, t in TOOL_REGISTRY.items()
+            if isinstance(t, LazyTool) and not t.loaded and any(name.startswith(p) for p in prefixes)]
+    for t in cold:
+        await run_in_pool("io", t.load)
+    return bool(cold)
+
+
+async def _warm_browser(options: Dict[str, Any]) -> Optional[str]:
+    did = ["imported"] if await _load_tools(["browser_"]) else []
+    browser_tools = sys.modules.get("apps.orchestrator.tools.browser_tools")
+    launch = _CFG.get("launch_browser", False) and not options.get("dry_run")  # a window is a side effect
+    if launch and getattr(browser_tools, "BROWSER_METHOD", None) == "playwright_async":
+        from ..worker import browser
+        # keyed exactly as the tools key it: their default "default", or the run's profile hint
+        profile = browser.profile_path(options.get("profile") or options.get("goal_profile") or "default")
+        if profile not in browser._CTX:
+            await browser._get_ctx(profile, headless=bool(options.get("headless", False)))
+            did.append(f"launched {profile}")
+    return ", ".join(did) or None
+
+
+_bridge_checked_at = 0.0
+
+
+async def _warm_vscode(options: Dict[str, Any]) -> Optional[str]:
+    global _bridge_checked_at
+    did = ["imported"] if await _load_tools(["vscode_"]) else []
+    if time.time() - _bridge_checked_at > float(_CFG.get("recheck_sec", 300)):
+        _bridge_checked_at = time.time()
+        from ..worker import vscode_bridge
+
+        def probe() -> bool:
+            try:
+                vscode_bridge.requests.get(vscode_bridge.BRIDGE, timeout=1)
+                return True
+            except Exception:
+                return False
+        # opens the connection pool to the bridge and tells us up front if the extension is down
+        did.append("bridge up" if await run_in_pool("network", probe) else "bridge down")
+    return ", ".join(did) or None
+
+
+_shell_primed_at = 0.0
+
+
+async def _warm_shell(options: Dict[str, Any]) -> Optional[str]:
+    global _shell_primed_at
+    did = ["imported"] if await _load_tools(["terminal_", "pkg_"]) else []
+    if time.time() - _shell_primed_at > float(_CFG.get("recheck_sec", 300)):
+        _shell_primed_at = time.time()
+        # terminal_run starts a fresh shell per call; a throwaway start pages its binary and profile in
+        argv = ["powershell", "-NoProfile", "-Command", "exit"] if os.name == "nt" else ["bash", "-lc", "true"]
+        if shutil.which(argv[0]):
+            proc = await asyncio.create_subprocess_exec(*argv, stdout=asyncio.subprocess.DEVNULL,
+                                                        stderr=asyncio.subprocess.DEVNULL)
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                proc.kill()
+            did.append(f"primed {argv[0]}")
+    return ", ".join(did) or None
+
+
+BACKENDS: List[Backend] = [
+    Backend("browser", ["browser_"],
+            r"https?://|\bwww\.|\.(com|org|net|in|io)\b|\bbrowser\b|\bwebsite\b|\bsite\b|\bweb ?page\b|\blog ?in\b|"
+            r"youtube|google|shopify|amazon|gmail", "browser", _warm_browser),
+    Backend("vscode", ["vscode_"],
+            r"vs ?code|visual studio code|\bproject\b|\brepo(sitory)?\b|\bextension\b|\bdiagnostics?\b", "io", _warm_vscode),
+    Backend("shell", ["terminal_", "pkg_"],
+            r"\bterminal\b|\bshell\b|\bcommand\b|\binstall\b|\bpip\b|\bnpm\b|\bgit\b|\bpowershell\b|\bwinget\b|\bchoco\b",
+            "io", _warm_shell),
+]
+
+
+class WarmupStats:
+    """Process-wide: per backend, warm-ups started, hits (a tool used it afterwards), misses and saved time."""
+    def __init__(self):
+        self._b: Dict[str, Dict[str, Any]] = {}
+
+    def entry(self, backend: str) -> Dict[str, Any]:
+        return self._b.setdefault(backend, {"started": 0, "hits": 0, "misses": 0, "skipped": 0,
+                                            "saved_ms": 0.0, "wasted_ms": 0.0})
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(e) for name, e in sorted(self._b.items())}
+
+
+warmup_stats = WarmupStats()
+_running = 0  # warm-ups in flight across runs
+_inflight: set = set()  # strong refs: a warm-up may outlive the run that started it
+
+
+class RunWarmup:
+    """
+    One run's speculative warm-ups. speculate() is called while the planner is
+    thinking: backends predicted by the goal's words and the run's recent calls
+    are warmed in the background, at most `max_per_run` per run and
+    `max_concurrent` at once, and only while the backend's pool is idle.
+    used() is called for every tool call: the first use of a warmed backend is a
+    hit and credits the cold start it hid. finish() counts the rest as misses.
+    """
+    def __init__(self, options: Optional[dict] = None):
+        self.options = dict(options or {})
+        self.max_per_run = int(_CFG.get("max_per_run", 3))
+        self.max_concurrent = int(_CFG.get("max_concurrent", 2))
+        self.recent_calls = int(_CFG.get("recent_calls", 3))
+        self._warmed: Dict[str, Dict[str, Any]] = {}
+        self.report: Dict[str, Any] = {"warmed": [], "hits": [], "misses": [], "skipped": []}
+
+    def predict(self, goal: str, recent: List[str]) -> List[Backend]:
+        tail = recent[-self.recent_calls:] if self.recent_calls else []
+        return [b for b in BACKENDS
+                if b.keywords.search(goal or "") or any(b.serves(t) for t in tail)]
+
+    def speculate(self, goal: str, recent: List[str], dry_run: bool = False) -> None:
+        global _running
+        self.options["dry_run"] = dry_run
+        m = _GOAL_PROFILE_RE.search(goal or "")
+        if m:
+            self.options["goal_profile"] = m.group(1)
+        for b in self.predict(goal, recent):
+            if b.name in self._warmed or len(self._warmed) >= self.max_per_run:
+                continue
+            pool = POOLS.get(b.pool)
+            if _running >= self.max_concurrent or (pool is not None and (pool.queue_depth() or pool.running() >= pool.size)):
+                # no idle capacity: a warm-up must never delay real work
+                if b.name not in self.report["skipped"]:
+                    self.report["skipped"].append(b.name)
+                    warmup_stats.entry(b.name)["skipped"] += 1
+                continue
+            state = self._warmed[b.name] = {"started": time.perf_counter(), "ms": None, "did": None, "used": False}
+            _running += 1
+            warmup_stats.entry(b.name)["started"] += 1
+            task = asyncio.create_task(self._warm(b, state))
+            _inflight.add(task)
+            task.add_done_callback(_inflight.discard)
+
+    async def _warm(self, b: Backend, state: Dict[str, Any]) -> None:
+        global _running
+        try:
+            state["did"] = await b.warm(self.options)
+        except Exception as e:
+            logger.warning(f"warm-up of {b.name} failed: {e}")
+            state["did"] = None
+        finally:
+            _running -= 1
+            state["ms"] = round((time.perf_counter() - state["started"]) * 1000, 2)
+        if state["did"]:
+            print(f"Warm-up {b.name}: {state['did']} in {state['ms']}ms")
+            self.report["warmed"].append({"backend": b.name, "did": state["did"], "ms": state["ms"]})
+
+    def used(self, tool: str) -> None:
+        for b in BACKENDS:
+            state = self._warmed.get(b.name)
+            if state is None or state["used"] or not b.serves(tool):
+                continue
+            state["used"] = True
+            partial = state["ms"] is None
+            if partial:
+                # still warming when the call came: it hid the part already done
+                saved = (time.perf_counter() - state["started"]) * 1000
+            elif state["did"]:
+                saved = state["ms"]
+            else:
+                continue  # was warm already; nothing to credit
+            e = warmup_stats.entry(b.name)
+            e["hits"] += 1
+            e["saved_ms"] = round(e["saved_ms"] + saved, 2)
+            self.report["hits"].append({"backend": b.name, "tool": tool, "saved_ms": round(saved, 2),
+                                        **({"partial": True} if partial else {})})
+
+    def finish(self) -> Dict[str, Any]:
+        for name, state in self._warmed.items():
+            if not state["used"] and state["did"]:
+                e = warmup_stats.entry(name)
+                e["misses"] += 1
+                e["wasted_ms"] = round(e["wasted_ms"] + (state["ms"] or 0), 2)
+                self.report["misses"].append(name)
+        # a warm-up still running keeps going: the backend is shared, a later run can use it
+        return self.report
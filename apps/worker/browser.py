@@ -17,6 +17,7 @@ from playwright.async_api import async_playwright, BrowserContext, Playwright, P
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse
 from playwright.async_api import Download
+from .profiles import profile_path
 # keep one persistent context per profile on disk
 _CTX: dict[str, Tuple[Playwright, BrowserContext]] = {}
 
@@ -121,19 +122,26 @@ async def browser_download(
         "page_url": page.url,
     }
 
+_CTX_LOCKS: dict[str, asyncio.Lock] = {}
+
 async def _get_ctx(profile_dir: str = "data/playwright-profiles/default",
                    headless: bool = False) -> Tuple[Playwright, BrowserContext]:
+    profile_dir = profile_path(profile_dir)
     os.makedirs(profile_dir, exist_ok=True)
     if profile_dir in _CTX:
         return _CTX[profile_dir]
-    pw = await async_playwright().start()
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=profile_dir,
-        headless=headless,
-        args=["--disable-dev-shm-usage", "--no-sandbox"],
-    )
-    _CTX[profile_dir] = (pw, ctx)
-    return pw, ctx
+    # concurrent runs (e.g. a batch) wait for the one launch instead of racing for the profile lock
+    async with _CTX_LOCKS.setdefault(profile_dir, asyncio.Lock()):
+        if profile_dir in _CTX:
+            return _CTX[profile_dir]
+        pw = await async_playwright().start()
+        ctx = await pw.chromium.launch_persistent_context(
+            user_data_dir=profile_dir,
+            headless=headless,
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+        )
+        _CTX[profile_dir] = (pw, ctx)
+        return pw, ctx
 
 async def _get_page(ctx: BrowserContext) -> Page:
     if ctx.pages:
@@ -4,7 +4,7 @@ import os, re, time, json, asyncio, pathlib, hashlib
 from typing import Any, Dict, List, Optional, Tuple
 
 from playwright.async_api import Download, Locator, Page
-from .browser import _get_ctx, _get_page  # uses your existing async Playwright ctx/page
+from .browser import _get_ctx, _get_page, profile_path  # uses your existing async Playwright ctx/page
 
 # ---------- utils ----------
 def _now() -> str:
@@ -31,13 +31,6 @@ def _safe_join(base_dir: str, name: str) -> str:
         raise ValueError("path_traversal_blocked")
     return str(target)
 
-def _profile_path(hint: Optional[str]) -> str:
-    if not hint:
-        return "data/playwright-profiles/default"
-    if os.path.isabs(hint) or hint.startswith("data/"):
-        return hint
-    return f"data/playwright-profiles/{hint}"
-
 # ---------- smart locator grammar ----------
 # Accepts: css=..., xpath=..., text=..., role=button[name='Sign in'], id=#q, data-test=[data-test=q]
 LOC_PREFIXES = ("css=", "xpath=", "text=", "role=", "id=", "data=", "aria=")
@@ -132,7 +125,7 @@ async def browser_execute(
     logs: List[str] = []
     results: List[Dict[str, Any]] = []
 
-    profile = _profile_path(profile)
+    profile = profile_path(profile)
     _, ctx = await _get_ctx(profile, headless=headless)
     page = await _get_page(ctx)
     page.set_default_timeout(default_timeout_ms)
@@ -0,0 +1,62 @@
+# apps/worker/cancel.py
+from __future__ import annotations
+import threading, time
+from typing import Callable, List, Optional
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """
+    Set by the orchestrator when nobody is waiting for a tool any more (timeout,
+    run cancelled, client gone). Sync tools that accept a `cancel` argument poll
+    it between units of work or sleep on it; on_cancel() callbacks run once, in
+    the cancelling thread, and can unblock a call (close a socket, kill a process).
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], object]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def on_cancel(self, cb: Callable[[], object]) -> None:
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(cb)
+                return
+        cb()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def sleep(self, seconds: float) -> bool:
+        """time.sleep that wakes up early on cancel; True if cancelled."""
+        return self._event.wait(seconds)
+
+
+def pause(cancel: Optional[CancelToken], seconds: float) -> bool:
+    """Sleep `seconds` (or until cancelled when a token is given); True if cancelled."""
+    if cancel is None:
+        time.sleep(seconds)
+        return False
+    return cancel.sleep(seconds)
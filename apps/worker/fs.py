@@ -1,7 +1,9 @@
 # apps/worker/fs.py
 from __future__ import annotations
 import os, shutil, glob, time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from .cancel import CancelToken
 
 def _ts(): return int(time.time())
 
@@ -24,11 +26,15 @@ def fs_move(src: str, dst: str, overwrite: bool = True) -> Dict[str, Any]:
     shutil.move(src, dst)
     return {"ok": True, "src": src, "dst": dst}
 
-def fs_copy(src: str, dst: str, overwrite: bool = True) -> Dict[str, Any]:
+def fs_copy(src: str, dst: str, overwrite: bool = True, cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
     os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
     if os.path.isdir(src):
         if overwrite and os.path.exists(dst): shutil.rmtree(dst)
-        shutil.copytree(src, dst)
+        def copy_file(s, d, *, follow_symlinks=True):
+            # checked per file so a cancelled tree copy stops instead of finishing in the background
+            if cancel is not None: cancel.raise_if_cancelled()
+            return shutil.copy2(s, d, follow_symlinks=follow_symlinks)
+        shutil.copytree(src, dst, copy_function=copy_file)
     else:
         if overwrite and os.path.exists(dst): os.remove(dst)
         shutil.copy2(src, dst)
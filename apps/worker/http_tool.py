@@ -3,12 +3,31 @@ from __future__ import annotations
 from typing import Dict, Any, Optional
 import requests
 
+from .cancel import CancelToken
+
+_MAX_TEXT = 100000
+_MAX_BYTES = 4 * _MAX_TEXT  # enough raw bytes for the capped text in any encoding
+
 def http_request(method: str, url: str, headers: Optional[dict] = None,
                  params: Optional[dict] = None, json: Any = None, data: Any = None,
-                 timeout_sec: int = 30) -> Dict[str, Any]:
-    r = requests.request(method.upper(), url, headers=headers, params=params, json=json, data=data, timeout=timeout_sec)
+                 timeout_sec: int = 30, cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
+    with requests.Session() as s:
+        if cancel is not None:
+            # closing the session's sockets unblocks a read that is stuck waiting
+            cancel.on_cancel(s.close)
+        r = s.request(method.upper(), url, headers=headers, params=params, json=json, data=data,
+                      timeout=timeout_sec, stream=True)
+        body = bytearray()
+        for chunk in r.iter_content(65536):
+            if cancel is not None and cancel.cancelled:
+                return {"ok": False, "error": "cancelled"}
+            body += chunk
+            if len(body) >= _MAX_BYTES:
+                break
+        r.close()
+    encoding = r.encoding or requests.utils.guess_json_utf(bytes(body)) or "utf-8"
     return {
         "ok": r.ok, "status": r.status_code, "headers": dict(r.headers),
-        "text": r.text[:100000],  # cap
+        "text": bytes(body).decode(encoding, errors="replace")[:_MAX_TEXT],  # cap
         "url": r.url,
     }
@@ -0,0 +1,14 @@
+# apps/worker/profiles.py
+"""Browser profile names and dirs. Import-light: the scheduler keys browser leases with it."""
+from __future__ import annotations
+import os
+from typing import Optional
+
+
+def profile_path(hint: Optional[str]) -> str:
+    """Profile name or dir -> the dir contexts are keyed by ("default" and "data/playwright-profiles/default" are one)."""
+    if not hint:
+        return "data/playwright-profiles/default"
+    if os.path.isabs(hint) or hint.startswith("data/"):
+        return hint
+    return f"data/playwright-profiles/{hint}"
@@ -1,8 +1,29 @@
 # apps/worker/terminal.py
 from __future__ import annotations
-import asyncio, os
+import asyncio, os, signal, subprocess
+from contextlib import suppress
 from typing import Dict, Any, Optional
 
+
+def kill_tree(pid: int) -> None:
+    """Kill a process and everything it started (proc.kill() alone leaves the children running)."""
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        for p in root.children(recursive=True) + [root]:
+            with suppress(psutil.Error):
+                p.kill()
+    except ImportError:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(pid)], capture_output=True)
+    except Exception:
+        pass  # already gone
+    if os.name != "nt":
+        # the shell runs in its own session: also catches children that were re-parented
+        with suppress(OSError):
+            os.killpg(pid, signal.SIGKILL)
+
+
 async def terminal_run(cmd: str, shell: str = "powershell", timeout_sec: int = 120,
                        cwd: Optional[str] = None, env: Optional[dict] = None) -> Dict[str, Any]:
     if shell.lower() in ("powershell", "pwsh"):
@@ -16,12 +37,19 @@ async def terminal_run(cmd: str, shell: str = "powershell", timeout_sec: int = 1
 
     proc = await asyncio.create_subprocess_exec(
         *full_cmd, cwd=cwd, env={**os.environ, **(env or {})},
-        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name != "nt",
     )
     try:
         out, err = await asyncio.wait_for(proc.communicate(), timeout=timeout_sec)
     except asyncio.TimeoutError:
-        proc.kill()
+        kill_tree(proc.pid)
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(proc.wait(), timeout=5)
         return {"ok": False, "error": f"timeout_{timeout_sec}s"}
+    except asyncio.CancelledError:
+        # the orchestrator gave up on this call (tool timeout, run cancelled, client gone)
+        kill_tree(proc.pid)
+        raise
     rc = proc.returncode
     return {"ok": rc == 0, "code": rc, "stdout": out.decode(errors="ignore"), "stderr": err.decode(errors="ignore")}
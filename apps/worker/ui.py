@@ -3,6 +3,8 @@ from __future__ import annotations
 import time, re
 from typing import Dict, Any, Optional
 
+from .cancel import CancelToken, pause
+
 # Safe import of uiautomation
 try:
     import uiautomation as auto  # type: ignore
@@ -13,7 +15,11 @@ def _dep_missing() -> Dict[str, Any]:
     return {"ok": False, "error": "uiautomation_not_installed"}
 
 
-def ui_focus(title_re: str, timeout_sec: int = 5) -> Dict[str, Any]:
+def _cancelled() -> Dict[str, Any]:
+    return {"ok": False, "error": "cancelled"}
+
+
+def ui_focus(title_re: str, timeout_sec: int = 5, cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
     if auto is None:
         return _dep_missing()
     deadline = time.time() + timeout_sec
@@ -24,11 +30,13 @@ def ui_focus(title_re: str, timeout_sec: int = 5) -> Dict[str, Any]:
                 title = getattr(w, "Name", "") or ""
                 if pat.search(title):
                     w.SetActive(); return {"ok": True, "title": title}
-        time.sleep(0.2)
+        if pause(cancel, 0.2):
+            return _cancelled()
     return {"ok": False, "error": "window_not_found"}
 
 
-def ui_find(name: str = "", control_type: str = "", timeout_sec: int = 5) -> Dict[str, Any]:
+def ui_find(name: str = "", control_type: str = "", timeout_sec: int = 5,
+            cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
     if auto is None:
         return _dep_missing()
     deadline = time.time() + timeout_sec
@@ -38,7 +46,8 @@ def ui_find(name: str = "", control_type: str = "", timeout_sec: int = 5) -> Dic
         fc = auto.GetFocusedControl()
         if fc:
             return {"ok": True, "name": fc.Name, "type": fc.ControlTypeName}
-        time.sleep(0.2)
+        if pause(cancel, 0.2):
+            return _cancelled()
     return {"ok": False, "error": "not_found"}
 
 
@@ -78,11 +87,20 @@ def ui_menu_select(path: str) -> Dict[str, Any]:
     return {"ok": True}
 
 
-def ui_wait(name: str, control_type: str = "TextControl", state: str = "exists", timeout_sec: int = 10) -> Dict[str, Any]:
+def ui_wait(name: str, control_type: str = "TextControl", state: str = "exists", timeout_sec: int = 10,
+            cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
     if auto is None:
         return _dep_missing()
+    if state != "exists":
+        return {"ok": False, "error": "unsupported_state"}
     root = auto.GetRootControl()
     ctrl = root.Control(searchDepth=10, Name=name, ControlType=control_type)
-    ok = ctrl.Exists(timeout_sec)
-    if state == "exists": return {"ok": ok}
-    return {"ok": False, "error": "unsupported_state"}
+    # short Exists() slices instead of one long one, so a cancel frees the desktop-ui thread
+    deadline = time.time() + timeout_sec
+    while True:
+        if ctrl.Exists(min(0.5, max(0.0, deadline - time.time()))):
+            return {"ok": True}
+        if time.time() >= deadline:
+            return {"ok": False}
+        if cancel is not None and cancel.cancelled:
+            return _cancelled()
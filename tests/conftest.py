@@ -129,15 +129,33 @@ class DummyLLM:
             ]
 
 
-        # 9) Unknown tool to test error path
+        # 9) Parallel fan-out (multi_tool_use.parallel)
+        if "parallel" in g:
+            return [
+                {"name": "multi_tool_use.parallel", "arguments": {"tool_uses": [
+                    {"recipient_name": "functions.fs_write",
+                     "parameters": {"path": "data/test_sandbox/notes/par.txt", "content": "parallel"}},
+                    {"recipient_name": "functions.fs_listdir", "parameters": {"path": "data/test_sandbox"}},
+                    {"recipient_name": "functions.does_not_exist", "parameters": {}},
+                ]}}
+            ]
+
+        # 10) Repeated read-only call (result cache)
+        if "list the sandbox twice" in g:
+            return [
+                {"name": "fs.listdir", "arguments": {"path": "data/test_sandbox"}},
+                {"name": "fs.listdir", "arguments": {"path": "data/test_sandbox"}},
+            ]
+
+        # 11) Unknown tool to test error path
         if "unknown tool" in g:
             return [{"name": "does.not.exist", "arguments": {}}]
 
-        # 10) Blocked tool test (terminal.run will be blocked by options in test)
+        # 12) Blocked tool test (terminal.run will be blocked by options in test)
         if "blocked terminal" in g:
             return [{"name": "terminal.run", "arguments":{"cmd":"echo should-be-blocked"}}]
 
-        # 11) Timeout test (long sleep; policy patched in test to short timeout)
+        # 13) Timeout test (long sleep; policy patched in test to short timeout)
         if "timeout test" in g:
             return [{"name":"terminal.run","arguments":{"cmd":"Start-Sleep -Seconds 5","shell":"powershell"}}]
 
@@ -0,0 +1,72 @@
+# tests/test_approvals.py
+from __future__ import annotations
+import asyncio, json
+from pathlib import Path
+from fastapi.testclient import TestClient
+from apps.orchestrator.main import app, get_llm
+from apps.orchestrator.approvals import RunChannel
+
+def _until(ws, evt):
+    seen = []
+    while True:
+        msg = ws.receive_json()
+        if msg["type"] == "event":
+            seen.append(msg["event"])
+            if msg["event"]["evt"] == evt:
+                return seen
+
+def test_socket_run_parks_risky_call_takes_edits_and_hints(dummy_llm):
+    app.dependency_overrides[get_llm] = lambda: dummy_llm
+    edited = Path("data/test_sandbox/out/edited.csv")
+    edited.unlink(missing_ok=True)
+    with TestClient(app) as c, c.websocket_connect("/tasks/ws") as ws:
+        ws.send_json({"type": "run", "goal": "Write a CSV and then read it back.", "dry_run": True,
+                      "options": {"approval_tools": ["data_csv.write"]}})
+        run_id = ws.receive_json()["run_id"]
+        request = _until(ws, "approval.request")[-1]
+        assert request["tool"] == "data.csv.write"
+
+        ws.send_json({"type": "hint", "text": "read the edited file"})
+        assert ws.receive_json() == {"type": "ack", "ok": True, "action": "hint", "queued": 1}
+        args = {**request["args"], "path": str(edited)}
+        ws.send_json({"type": "edit", "id": request["id"], "args": args})
+        events = _until(ws, "agent.end")
+        assert ws.receive_json() == {"type": "end", "run_id": run_id}
+
+    obs = next(e["obs"] for e in events if e["evt"] == "tool.obs")
+    assert obs["ok"] and obs["approval"]["decision"] == "edited" and edited.exists()
+    assert any(e["evt"] == "hint.applied" for e in events)
+    assert {"role": "user", "content": "Operator hint: read the edited file"} in dummy_llm.messages
+    edited.unlink()
+
+def test_rejected_and_unanswered_calls_become_errors():
+    async def go():
+        emitted = []
+        ch = RunChannel("r1", emitted.append, tools=["fs_delete"], timeout_sec=0.05)
+        assert not ch.needs_approval("fs_listdir") and ch.needs_approval("fs.delete")
+        waiting = asyncio.create_task(ch.review("fs.delete", {"path": "x"}))
+        await asyncio.sleep(0)
+        approval_id = emitted[0]["id"]
+        assert ch.handle({"type": "reject", "id": approval_id, "reason": "keep it"})["ok"]
+        rejected = await waiting
+        timed_out = await ch.review("fs_delete", {"path": "y"})
+        return rejected, timed_out, ch.stats, [e["evt"] for e in emitted]
+
+    rejected, timed_out, stats, evts = asyncio.run(go())
+    assert not rejected.approved and rejected.decision == "rejected" and rejected.reason == "keep it"
+    assert not timed_out.approved and timed_out.decision == "timeout"
+    assert stats["rejected"] == 1 and stats["timeout"] == 1
+    assert evts == ["approval.request", "approval.resolved"] * 2
+
+def test_cancel_message_for_finished_job_is_not_running():
+    from apps.orchestrator.jobs import SUCCEEDED, Job
+    from apps.orchestrator.main import job_queue
+    job = Job(None, None)
+    job.status = SUCCEEDED
+    job_queue.jobs[job.id] = job
+    try:
+        with TestClient(app) as c:
+            r = c.post(f"/tasks/{job.id}/messages", json={"type": "cancel"}).json()
+    finally:
+        job_queue.jobs.pop(job.id, None)
+    assert r["ok"] is False and r["error"] == f"not_running: {job.id}" and job.status == SUCCEEDED
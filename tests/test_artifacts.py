@@ -0,0 +1,14 @@
+# tests/test_artifacts.py
+from __future__ import annotations
+import json
+from apps.orchestrator import artifacts
+from apps.orchestrator.artifacts import ArtifactStore, artifact_read
+
+def test_artifact_read_never_inlines_more_than_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "store", ArtifactStore(tmp_path))
+    big = artifacts.store.put(json.dumps({"rows": ["x" * 100] * 500}))
+    page = artifact_read(big, limit=10**9, as_json=True)
+    assert "data" not in page and len(page["content"]) == artifacts.INLINE_MAX_BYTES and page["next_offset"]
+
+    small = artifacts.store.put(json.dumps({"ok": 1}))
+    assert artifact_read(small, as_json=True)["data"] == {"ok": 1}
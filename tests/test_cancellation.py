@@ -0,0 +1,53 @@
+# tests/test_cancellation.py
+from __future__ import annotations
+import asyncio, os, threading, time
+import pytest
+from apps.orchestrator.dispatch import invoke
+from apps.orchestrator.executors import POOLS
+from apps.worker.terminal import terminal_run
+
+psutil = pytest.importorskip("psutil")
+
+def _gone(pid: int) -> bool:
+    try:
+        return psutil.Process(pid).status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+
+@pytest.mark.skipif(os.name == "nt", reason="uses bash")
+def test_terminal_timeout_kills_the_whole_tree(tmp_path):
+    pidfile = tmp_path / "child.pid"
+    obs = asyncio.run(terminal_run(f"sleep 30 & echo $! > {pidfile}; wait", shell="bash", timeout_sec=5))
+    assert obs == {"ok": False, "error": "timeout_5s"}
+    child = int(pidfile.read_text())
+    deadline = time.time() + 3
+    while not _gone(child) and time.time() < deadline:
+        time.sleep(0.05)
+    assert _gone(child)
+
+def test_timeout_cancels_tools_that_take_a_token():
+    stopped = threading.Event()
+    def slow(cancel=None):
+        cancel.sleep(5)
+        stopped.set()
+        return {"ok": True}
+    slow.pool = "io"
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(invoke(slow, {}, 0.05))
+    assert stopped.wait(1)
+
+def test_uncancellable_thread_is_reported_as_leaked():
+    release = threading.Event()
+    def stuck():
+        release.wait(5)
+        return {"ok": True}
+    stuck.pool = "network"
+    pool = POOLS["network"]
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(invoke(stuck, {}, 0.05))
+    assert pool.leaked == 1 and pool.snapshot()["leaked"] == 1
+    release.set()
+    deadline = time.time() + 2
+    while pool.leaked and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.leaked == 0
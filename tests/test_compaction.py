@@ -0,0 +1,45 @@
+# tests/test_compaction.py
+from __future__ import annotations
+import json
+from apps.orchestrator.compaction import compact_messages, estimate_tokens
+
+def _conversation(turns: int) -> list[dict]:
+    msgs = [{"role":"system","content":"system prompt"}, {"role":"user","content":"Goal: read things"}]
+    for i in range(turns):
+        msgs.append({"role":"assistant","content":None,"tool_calls":[
+            {"id":f"c{i}","type":"function","function":{"name":"fs_read","arguments":json.dumps({"path":f"f{i}.txt"})}}]})
+        msgs.append({"role":"tool","tool_call_id":f"c{i}","name":"fs_read","content":json.dumps(
+            {"tool":"fs_read","args":{"path":f"f{i}.txt"},"observation":{"ok":True,"content":"x"*4000}})})
+    return msgs
+
+def test_compaction_keeps_head_and_recent_turns():
+    msgs = _conversation(8)
+    stats = compact_messages(msgs, budget_tokens=3000, keep_turns=2)
+    assert stats["est_tokens_after"] < stats["est_tokens_before"]
+    assert msgs[0]["content"] == "system prompt" and msgs[1]["content"] == "Goal: read things"
+    # last two turns untouched
+    assert json.loads(msgs[-1]["content"])["observation"]["content"] == "x"*4000
+    assert json.loads(msgs[-3]["content"])["observation"]["content"] == "x"*4000
+    # every remaining tool answer still follows its assistant turn
+    for i, m in enumerate(msgs):
+        if m["role"] == "tool":
+            assert msgs[i-1]["role"] in ("assistant", "tool")
+
+def test_compaction_noop_under_budget():
+    msgs = _conversation(1)
+    before = json.dumps(msgs)
+    stats = compact_messages(msgs, budget_tokens=estimate_tokens(msgs) + 1)
+    assert stats["summarized"] == 0 and json.dumps(msgs) == before
+
+def test_compaction_keeps_notes_and_hints_added_mid_run():
+    msgs = _conversation(3)
+    msgs.insert(2, {"role": "system", "content": "Calls to fs_write wait for approval."})
+    msgs.insert(5, {"role": "user", "content": "Operator hint: skip f1.txt"})
+    msgs += _conversation(5)[2:]
+    stats = compact_messages(msgs, budget_tokens=1500, keep_turns=1)
+    assert stats["dropped"] > 0
+    contents = [m["content"] for m in msgs]
+    assert "Calls to fs_write wait for approval." in contents and "Operator hint: skip f1.txt" in contents
+    for i, m in enumerate(msgs):
+        if m["role"] == "tool":
+            assert msgs[i-1]["role"] in ("assistant", "tool")
@@ -0,0 +1,47 @@
+# tests/test_executors.py
+from __future__ import annotations
+import asyncio, threading, time
+from apps.orchestrator.dispatch import invoke
+from apps.orchestrator.executors import POOLS, run_in_pool
+from apps.orchestrator.tools.registry import TOOL_REGISTRY
+
+def test_tools_declare_their_pool():
+    assert TOOL_REGISTRY["ui_wait"].pool == "desktop-ui"
+    assert TOOL_REGISTRY["http_request"].pool == "network"
+    assert TOOL_REGISTRY["fs_read"].pool == "io"
+
+def test_stuck_ui_call_does_not_starve_io():
+    release = threading.Event()
+
+    def stuck_ui():
+        release.wait(5)
+        return "ui"
+
+    async def go():
+        ui = asyncio.create_task(run_in_pool("desktop-ui", stuck_ui))
+        await asyncio.sleep(0.02)
+        queued = asyncio.create_task(run_in_pool("desktop-ui", lambda: "ui2"))
+        await asyncio.sleep(0.02)
+        depth = POOLS["desktop-ui"].queue_depth()
+        t0 = time.perf_counter()
+        fast = await run_in_pool("io", lambda: "fs")
+        io_sec = time.perf_counter() - t0
+        release.set()
+        return depth, fast, io_sec, await ui, await queued
+
+    depth, fast, io_sec, ui, ui2 = asyncio.run(go())
+    assert depth == 1 and fast == "fs" and io_sec < 1 and (ui, ui2) == ("ui", "ui2")
+
+def test_invoke_runs_sync_tool_in_declared_pool():
+    seen = []
+    def tool(**kw):
+        seen.append(threading.current_thread().name)
+        return {"ok": True}
+    tool.pool = "network"
+    assert asyncio.run(invoke(tool, {}, 5)) == {"ok": True}
+    assert seen[0].startswith("pool-network")
+
+def test_pool_metrics_exported(client):
+    text = client.get("/metrics").text
+    assert 'executor_queue_depth{pool="desktop-ui"}' in text
+    assert 'executor_utilization{pool="io"}' in text
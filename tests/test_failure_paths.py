@@ -51,3 +51,11 @@ def test_tool_raises_exception(client, monkeypatch):
     # Create a tailored DummyLLM mapping by directly calling /tasks/run with options.allowed_tools to force it?
     # Easier route: call the tool directly through the registry by adding “boom tool” phrase:
     # Since the DummyLLM doesn't know “test.raise”, we cheat: add alias for does.not.exist
+
+def test_tool_index_match_kinds():
+    from apps.orchestrator.tools.registry import lookup_tool
+    assert lookup_tool("fs.listdir").kind == "exact"
+    assert lookup_tool("functions.fs_listdir").kind == "alias"
+    fuzzy = lookup_tool("fs.lstdir")
+    assert fuzzy.kind == "fuzzy" and fuzzy.name == "fs_listdir"
+    assert lookup_tool("does.not.exist").func is None
@@ -0,0 +1,29 @@
+# tests/test_import_time.py
+from __future__ import annotations
+import json, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Stacks a tool only needs once it is actually called
+HEAVY = ["playwright", "selenium", "uiautomation", "pyautogui", "requests",
+         "apps.worker.browser", "apps.worker.ui", "apps.worker.vscode_bridge"]
+
+def test_main_import_is_lazy():
+    code = (
+        "import sys, json, time; t = time.perf_counter();"
+        "import apps.orchestrator.main;"
+        "print(json.dumps({'sec': time.perf_counter() - t, 'loaded': [m for m in %r if m in sys.modules]}))" % HEAVY
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    j = json.loads(out.stdout.strip().splitlines()[-1])
+    assert j["loaded"] == []
+
+def test_tool_resolves_on_first_use(client):
+    from apps.orchestrator.tools.registry import TOOL_REGISTRY
+    j = client.post("/tasks/run", json={"goal": "list the sandbox folder", "dry_run": True}).json()
+    assert j["steps"][0]["obs"]["ok"] is True
+    assert TOOL_REGISTRY["fs_listdir"].loaded
+    report = client.get("/tools/imports").json()
+    assert report["fs_listdir"]["loaded"] is True and report["fs_listdir"]["error"] is None
@@ -0,0 +1,77 @@
+# tests/test_jobs.py
+from __future__ import annotations
+import asyncio, json, time
+from fastapi.testclient import TestClient
+
+from apps.orchestrator.main import app, get_llm
+from apps.orchestrator.tools.registry import TOOL_REGISTRY
+
+def _wait(c, job_id, until=("succeeded", "failed", "cancelled"), timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        j = c.get(f"/tasks/{job_id}").json()
+        if j["status"] in until:
+            return j
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} stuck in {j['status']}")
+
+def test_submit_then_poll_result(dummy_llm):
+    app.dependency_overrides[get_llm] = lambda: dummy_llm
+    with TestClient(app) as c:
+        j = c.post("/tasks/submit", json={"goal": "list the sandbox folder", "dry_run": True}).json()
+        assert j["ok"] is True and j["status"] == "queued"
+        assert _wait(c, j["job_id"])["status"] == "succeeded"
+        r = c.get(f"/tasks/{j['job_id']}/result").json()
+        assert r["result"]["steps"][0]["obs"]["ok"] is True
+    assert c.get("/tasks/nope").status_code == 404
+
+def test_cancel_stops_inflight_tool(dummy_llm):
+    state = {"finished": False}
+    async def slow(**kwargs):
+        await asyncio.sleep(30)
+        state["finished"] = True
+        return {"ok": True}
+    TOOL_REGISTRY["test.slow"] = slow
+    dummy_llm._build_plan_from_goal = lambda goal: [{"name": "test.slow", "arguments": {}}]
+    app.dependency_overrides[get_llm] = lambda: dummy_llm
+    try:
+        with TestClient(app) as c:
+            job_id = c.post("/tasks/submit", json={"goal": "slow", "dry_run": True}).json()["job_id"]
+            _wait(c, job_id, until=("running",))
+            time.sleep(0.1)
+            c.post(f"/tasks/{job_id}/cancel")
+            assert _wait(c, job_id, timeout=2)["status"] == "cancelled"
+        assert state["finished"] is False
+    finally:
+        TOOL_REGISTRY.pop("test.slow", None)
+
+def test_batch_runs_goals_with_its_own_parallelism(dummy_llm):
+    running = {"now": 0, "max": 0}
+    async def nap(goal: str):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.2)
+        running["now"] -= 1
+        return {"ok": True, "goal": goal}
+    TOOL_REGISTRY["test.nap"] = nap
+
+    def make_llm():
+        llm = type(dummy_llm)()
+        llm._build_plan_from_goal = lambda goal: [{"name": "test.nap", "arguments": {"goal": goal}}]
+        return llm
+    app.dependency_overrides[get_llm] = make_llm
+    try:
+        with TestClient(app) as c:
+            goals = [f"check page {n}" for n in range(5)] + [{"goal": "check page 5", "options": {"max_steps": 1}}]
+            b = c.post("/batches", json={"goals": goals, "dry_run": True, "parallelism": 3}).json()
+            assert b["goals"] == 6 and b["parallelism"] == 3
+            events = [json.loads(line[6:]) for line in c.get(b["events"]).text.splitlines() if line.startswith("data: ")]
+            report = c.get(f"/batches/{b['batch_id']}").json()
+            assert c.post("/batches", json={"goals": []}).status_code == 400
+    finally:
+        TOOL_REGISTRY.pop("test.nap", None)
+    assert running["max"] == 3
+    assert [e["evt"] for e in events].count("goal.end") == 6 and events[-1]["evt"] == "batch.end"
+    assert report["status"] == "finished" and report["by_status"] == {"succeeded": 6}
+    assert report["latency_ms"]["p50"] >= 200 and report["throughput_per_min"] > 0
+    assert [it["job_id"] for it in report["items"]] == b["jobs"]
@@ -0,0 +1,83 @@
+# tests/test_leases.py
+from __future__ import annotations
+import asyncio, os
+import pytest
+from apps.orchestrator.leases import LeaseManager, LeaseTimeout
+
+def test_lease_names_follow_resources():
+    lm = LeaseManager({"desktop-ui": 1, "browser": 1, "path": 1})
+    assert lm.names("ui_click", {"x": 1, "y": 2}) == ["desktop-ui"]
+    work = lm.names("browser_open", {"profile": "work"})
+    assert work == lm.names("browser_nav", {"profile": os.path.abspath("data/playwright-profiles/work")})
+    assert lm.names("browser_nav", {}) == lm.names("browser_execute", {"profile": "data/playwright-profiles/default"})
+    assert lm.names("http_request", {"url": "https://example.com"}) == []  # kind not configured
+    assert len(lm.names("fs_copy", {"src": "a.txt", "dst": "b.txt"})) == 2
+
+def test_conflicting_calls_wait_and_report_it():
+    lm = LeaseManager({"desktop-ui": 1})
+    order = []
+
+    async def call(tag, hold_s):
+        async with lm.hold("ui_type", {"text": tag}) as lease:
+            order.append(tag)
+            await asyncio.sleep(hold_s)
+            return lease.wait_ms
+
+    async def go():
+        return await asyncio.gather(call("a", 0.05), call("b", 0))
+
+    wait_a, wait_b = asyncio.run(go())
+    assert order == ["a", "b"] and wait_a < 1 <= wait_b
+    assert lm.snapshot()["waited"] == 1 and lm.snapshot()["held"] == {}
+
+def test_lease_timeout():
+    lm = LeaseManager({"pkg-manager": 1}, acquire_timeout=0.01)
+
+    async def go():
+        async with lm.hold("pkg_install", {"name": "git"}):
+            async with lm.hold("pkg_install", {"name": "node"}):
+                pass
+
+    with pytest.raises(LeaseTimeout):
+        asyncio.run(go())
+    assert lm.stats["timeouts"] == 1
+
+def test_path_leases_cover_ancestors_and_readers_share(tmp_path):
+    lm = LeaseManager({"path": 1}, acquire_timeout=0.05)
+    parent, child = str(tmp_path / "x"), str(tmp_path / "x" / "y.txt")
+
+    async def overlap(outer, inner):
+        async with lm.hold(*outer):
+            try:
+                async with lm.hold(*inner) as lease:
+                    return lease.wait_ms < 1
+            except LeaseTimeout:
+                return False
+
+    async def go():
+        return (await overlap(("fs_write", {"path": parent}), ("fs_delete", {"path": child})),
+                await overlap(("fs_read", {"path": child}), ("fs_listdir", {"path": parent})),
+                await overlap(("fs_read", {"path": child}), ("fs_write", {"path": child})))
+
+    assert asyncio.run(go()) == (False, True, False)  # nested write, shared reads, read vs write
+
+def test_lease_wait_never_outlasts_the_run():
+    lm = LeaseManager({"vscode": 1}, acquire_timeout=300)
+
+    async def go():
+        async with lm.hold("vscode_open", {"path": "a.py"}):
+            t0 = asyncio.get_running_loop().time()
+            with pytest.raises(LeaseTimeout):
+                async with lm.hold("vscode_save_all", {}, timeout=0.05):
+                    pass
+            return asyncio.get_running_loop().time() - t0
+
+    assert asyncio.run(go()) < 1
+
+def test_shell_commands_dont_lock_the_tree_across_runs():
+    from apps.orchestrator.scheduler import build_deps
+    lm = LeaseManager({"path": 1}, acquire_timeout=0.05)
+    assert lm.names("terminal_run", {"cmd": "npm install"}) == []
+    deps = build_deps([{"name": "terminal_run", "arguments": {"cmd": "echo hi > out.txt"}},
+                       {"name": "fs_read", "arguments": {"path": "out.txt"}}])
+    assert deps[1] == {0}  # still ordered within a run
@@ -0,0 +1,70 @@
+# tests/test_llm_cache.py
+from __future__ import annotations
+import asyncio, json, os, time
+from types import SimpleNamespace
+from apps.orchestrator import llm as llm_mod
+from apps.orchestrator.llm import LLM, LLMConfig
+from apps.orchestrator.llm_cache import LLMResponseCache, conversation_key
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = 0
+        self.finish_reason = "tool_calls"
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kw):
+        self.calls += 1
+        fn = SimpleNamespace(name="fs_listdir", arguments='{"path": "."}')
+        msg = SimpleNamespace(content=None, tool_calls=[SimpleNamespace(id="call_1", type="function", function=fn)])
+        usage = SimpleNamespace(prompt_tokens=900, completion_tokens=20, total_tokens=920)
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg, finish_reason=self.finish_reason)], usage=usage)
+
+def test_repeat_conversation_is_answered_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    fake = _FakeClient()
+    monkeypatch.setattr(llm_mod, "get_async_client", lambda key: fake)
+    cfg = LLMConfig()
+
+    def turn():
+        llm = LLM(cfg)
+        messages = llm.bootstrap("List the folder.", True, None)
+        call = asyncio.run(llm.next_tool_call(messages))
+        return llm, call
+
+    first, call1 = turn()
+    second, call2 = turn()
+    assert fake.calls == 1 and call1 == call2 == {"name": "fs_listdir", "arguments": {"path": "."}}
+    assert first.last_raw["cache"]["status"] == "miss" and first.total_tokens == 920
+    assert second.last_raw["cache"]["status"] == "hit" and second.total_tokens == 0
+    assert second.last_raw["cache"]["saved_usage"]["total_tokens"] == 920
+    assert cfg.response_cache.snapshot()["hits"] == 1
+
+    fake.finish_reason = "length"  # truncated: answered, but never stored
+    third = LLM(cfg)
+    asyncio.run(third.next_tool_call(third.bootstrap("List the other folder.", True, None)))
+    again = LLM(cfg)
+    asyncio.run(again.next_tool_call(again.bootstrap("List the other folder.", True, None)))
+    assert fake.calls == 3 and again.last_raw["cache"]["status"] == "miss" and not again.last_raw["cache"]["stored"]
+
+def test_key_is_canonical_and_entries_expire_and_evict(tmp_path):
+    a = conversation_key("m", [{"role": "user", "content": "x"}], [{"b": 1, "a": 2}], 0.2)
+    assert a == conversation_key("m", [{"content": "x", "role": "user"}], [{"a": 2, "b": 1}], 0.2)
+    assert a != conversation_key("m", [{"role": "user", "content": "x"}], [{"b": 1, "a": 2}], 0.7)
+
+    cache = LLMResponseCache(str(tmp_path), ttl_sec=60, max_bytes=20_000)
+    cache.put("aa01", {"content": "old"})
+    stale = tmp_path / "aa" / "aa01.json"
+    stale.write_text(json.dumps({**json.loads(stale.read_text()), "stored_at": time.time() - 120}), encoding="utf-8")
+    assert cache.get("aa01") is None and not stale.exists()
+
+    for n in range(6):
+        cache.put(f"b{n}", {"content": "y" * 3000})
+        t = time.time() - 100 + n
+        os.utime(tmp_path / f"b{n}" / f"b{n}.json", (t, t))
+    cache.get("b0")  # touched: now the most recently used
+    cache.put("c0", {"content": "z" * 3000})
+    left = sorted(p.stem for p in tmp_path.glob("*/*.json"))
+    assert left == ["b0", "b2", "b3", "b4", "b5", "c0"]  # the least recently used one went
+    assert cache.snapshot()["bytes"] <= 20_000 and cache.snapshot()["evictions"] == 1
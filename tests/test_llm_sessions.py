@@ -0,0 +1,34 @@
+# tests/test_llm_sessions.py
+from __future__ import annotations
+import asyncio, json
+
+from apps.orchestrator.main import get_llm
+from apps.orchestrator.llm import LLM, LLMConfig, usage_totals
+from apps.orchestrator.llm_traced import TracedLLM
+
+def test_each_run_gets_its_own_session():
+    a, b = get_llm(), get_llm()
+    assert a is not b and a.inner is not b.inner
+    assert a.inner.config is b.inner.config  # shared, read once
+
+def test_session_state_does_not_leak():
+    cfg = LLMConfig()
+    cfg.api_key = ""  # stub planner, no network
+    a, b = TracedLLM(LLM(cfg)), TracedLLM(LLM(cfg))
+    ma = a.bootstrap("goal a", True, None)
+    b.bootstrap("goal b", True, None)
+    asyncio.run(a.next_tool_call(ma))
+    assert a.inner.last_raw is not None and b.inner.last_raw is None
+    assert [e["evt"] for e in b.dump_trace()] == ["llm.bootstrap.begin", "llm.bootstrap.end"]
+    assert "sessions" in usage_totals.snapshot()
+
+def test_trace_is_bounded_and_compact():
+    cfg = LLMConfig()
+    cfg.api_key = ""
+    t = TracedLLM(LLM(cfg), capacity=5, max_field_chars=50)
+    msgs = t.bootstrap("goal", True, None)
+    for i in range(20):
+        t.observe(msgs, "fs_read", {"path": "x"}, {"ok": True, "content": "y" * 10_000})
+    assert len(t.dump_trace()) == 5 and t.trace.dropped == 17
+    last = t.trace_tail(1)[0]
+    assert last["evt"] == "llm.observe" and len(json.dumps(last)) < 1000
@@ -0,0 +1,23 @@
+# tests/test_plan_cache.py
+from __future__ import annotations
+from apps.orchestrator import main
+from apps.orchestrator.plan_cache import PlanCache, goal_template
+
+def test_goal_template_pulls_out_parameters():
+    t1, p1 = goal_template('Move "report.txt" to data/test_sandbox/out please.')
+    t2, p2 = goal_template("move 'notes.md' to data/test_sandbox/archive please")
+    assert t1 == t2 and p1 == ["report.txt", "data/test_sandbox/out"] and p2[0] == "notes.md"
+
+def test_repeat_goal_skips_planner(client, dummy_llm, monkeypatch):
+    monkeypatch.setattr(main, "plan_cache", PlanCache())
+    body = {"goal": "Write a CSV and then read it back.", "dry_run": True, "options": {"plan_cache": True}}
+    first = client.post("/tasks/run", json=body).json()
+    assert first["plan_cache"]["hit"] is False
+
+    planner_calls = []
+    monkeypatch.setattr(dummy_llm, "next_tool_call", lambda messages: planner_calls.append(1))
+    second = client.post("/tasks/run", json=body).json()
+    assert planner_calls == []
+    assert second["plan_cache"]["hit"] is True and second["plan_cache"]["steps_from_cache"] == 2
+    assert [s["tool"] for s in second["steps"]] == [s["tool"] for s in first["steps"]]
+    assert second["plan_cache"]["stats"]["hit_rate"] == 0.5
@@ -0,0 +1,38 @@
+# tests/test_replay.py
+from __future__ import annotations
+from apps.orchestrator import main, replay
+from apps.orchestrator.plan_cache import PlanCache
+
+def test_record_then_replay_without_tools(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "RECORDING_DIR", tmp_path)
+    body = {"goal": "Fan out in parallel please.", "dry_run": True, "options": {"record": True}}
+    run = client.post("/tasks/run", json=body).json()
+    assert run["recording"].startswith(str(tmp_path))
+    run_id = run["recording"].rsplit("/", 1)[-1].removesuffix(".jsonl.gz")
+
+    calls = []
+    async def must_not_run(*a, **kw):
+        calls.append(a)
+    monkeypatch.setattr("apps.orchestrator.dispatch._run_tool", must_not_run)
+    rep = client.post("/tasks/replay", json={"recording": run_id}).json()
+    assert calls == [] and rep["replay"]["misses"] == 0
+    assert [s["obs"] for s in rep["steps"]] == [s["obs"] for s in run["steps"]]
+
+def test_replay_ignores_the_plan_cache(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "RECORDING_DIR", tmp_path)
+    monkeypatch.setattr(main, "plan_cache", PlanCache())
+    body = {"goal": "Write a CSV and then read it back.", "dry_run": True,
+            "options": {"record": True, "plan_cache": True}}
+    run = client.post("/tasks/run", json=body).json()
+    run_id = run["recording"].rsplit("/", 1)[-1].removesuffix(".jsonl.gz")
+    before = main.plan_cache.snapshot()
+    assert before["entries"] == 1
+
+    rep = client.post("/tasks/replay", json={"recording": run_id}).json()
+    assert "plan_cache" not in rep and main.plan_cache.snapshot() == before
+    assert [s["obs"] for s in rep["steps"]] == [s["obs"] for s in run["steps"]]
+
+def test_replay_unknown_recording(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "RECORDING_DIR", tmp_path)
+    assert client.post("/tasks/replay", json={"recording": "nope"}).status_code == 404
+    assert client.post("/tasks/replay", json={"recording": "/etc/passwd.jsonl"}).status_code == 404
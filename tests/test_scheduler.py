@@ -0,0 +1,60 @@
+# tests/test_scheduler.py
+from __future__ import annotations
+import asyncio
+from apps.orchestrator.scheduler import build_deps, run_dag
+
+def _call(name, **args):
+    return {"name": name, "arguments": args}
+
+def test_deps_follow_shared_resources():
+    calls = [
+        _call("fs_write", path="data/test_sandbox/a.txt", content="x"),
+        _call("fs_read", path="data/test_sandbox/b.txt"),
+        _call("fs_read", path="data/test_sandbox/a.txt"),
+        _call("fs_listdir", path="data/test_sandbox"),
+        _call("browser_open", url="https://example.com"),
+        _call("browser_click", selector="#go"),
+        _call("something_unknown"),
+    ]
+    deps = build_deps(calls)
+    assert deps[1] == set()          # independent read
+    assert deps[2] == {0}            # read after write of the same file
+    assert deps[3] == {0}            # listing a directory that is being written into
+    assert deps[4] == set() and deps[5] == {4}  # one browser profile, in order
+    assert deps[6] == {0, 1, 2, 3, 4, 5}        # unknown tool is a barrier
+
+def test_run_dag_overlaps_independent_calls_and_honours_stop():
+    calls = [_call("fs_read", path="p/a"), _call("fs_read", path="p/b"),
+             _call("fs_write", path="p/a", content=""), _call("fs_read", path="p/c")]
+    running, peak = set(), 0
+
+    async def run_one(idx, call):
+        nonlocal peak
+        running.add(idx)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01 * (idx + 1))
+        running.discard(idx)
+        return {"ok": True, "stop": idx == 2}
+
+    async def go(**kw):
+        return [(k, i) async for k, i, _ in run_dag(calls, run_one, **kw)]
+
+    events = asyncio.run(go(limit=4))
+    done = [i for k, i in events if k == "done"]
+    assert peak >= 2 and done.index(0) < done.index(2)
+    assert set(done) == {0, 1, 2, 3}  # 3 was already running when 2 stopped
+
+    events = asyncio.run(go(limit=1))
+    assert [i for k, i in events if k == "done"] == [0, 1, 2]  # stop at 2 cuts 3 off
+
+def test_run_dag_fail_fast():
+    calls = [_call("fs_write", path="p/a", content=""), _call("fs_read", path="p/a")]
+
+    async def run_one(idx, call):
+        return {"ok": False, "error": "boom"}
+
+    async def go(fail_fast):
+        return [i async for k, i, _ in run_dag(calls, run_one, fail_fast=fail_fast) if k == "done"]
+
+    assert asyncio.run(go(True)) == [0]
+    assert asyncio.run(go(False)) == [0, 1]
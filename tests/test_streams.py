@@ -0,0 +1,107 @@
+# tests/test_streams.py
+from __future__ import annotations
+import asyncio, json
+from fastapi.testclient import TestClient
+from apps.orchestrator.main import app, get_llm
+from apps.orchestrator.streams import RunEventLog, StreamHub, view_event
+
+def _frames(text):
+    out = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "data" in fields:
+            out.append((int(fields["id"]), json.loads(fields["data"])))
+    return out
+
+def test_stream_has_ids_and_resumes_after_last_event_id(dummy_llm):
+    app.dependency_overrides[get_llm] = lambda: dummy_llm
+    with TestClient(app) as c:
+        r = c.post("/tasks/run_stream", json={"goal": "Write a CSV and then read it back.", "dry_run": True})
+        frames = _frames(r.text)
+        run_id = r.headers["x-run-id"]
+        ids = [i for i, _ in frames]
+        assert ids == list(range(1, len(ids) + 1)) and frames[-1][1]["evt"] == "agent.end"
+
+        again = _frames(c.get(f"/tasks/{run_id}/events", headers={"Last-Event-ID": str(ids[3])}).text)
+        assert again == frames[4:]
+        # a reconnect keeps the URL's stale ?after= but sends a newer Last-Event-ID
+        later = _frames(c.get(f"/tasks/{run_id}/events", params={"after": ids[1]},
+                              headers={"Last-Event-ID": str(ids[3])}).text)
+        assert later == frames[4:]
+        assert c.get("/tasks/nope/events").status_code == 404
+
+def test_log_spills_and_viewers_share_it(tmp_path):
+    async def go():
+        hub = StreamHub(capacity=3, spill_dir=str(tmp_path), heartbeat_sec=0.05)
+
+        async def events():
+            for n in range(10):
+                yield {"evt": "tick", "n": n}
+                await asyncio.sleep(0.01)
+
+        log = hub.start("r1", events())
+        seen_a, seen_b, beats = [], [], 0
+
+        async def view(into, after=0):
+            nonlocal beats
+            async for item in hub.watch("r1", after):
+                if item is None:
+                    beats += 1
+                else:
+                    into.append(item[0])
+
+        await asyncio.gather(view(seen_a), view(seen_b, after=5))
+        late = [i for i, _ in log.since(0, 100)]
+        return seen_a, seen_b, late, log.spilled
+
+    a, b, late, spilled = asyncio.run(go())
+    assert a == list(range(1, 11)) and b == list(range(6, 11))
+    assert late == list(range(1, 11)) and spilled == 7  # older events come back from disk
+
+def test_unwatched_stream_is_cancelled_after_grace():
+    async def go():
+        hub = StreamHub(capacity=10, spill_dir=None, reattach_grace_sec=0.05)
+
+        async def events():
+            yield {"evt": "agent.start"}
+            await asyncio.sleep(10)
+            yield {"evt": "agent.end"}
+
+        log = hub.start("r2", events())
+        viewer = hub.watch("r2")
+        await viewer.__anext__()
+        await viewer.aclose()  # viewer drops after the first event
+        await asyncio.sleep(0.2)
+        return [e["evt"] for _, e in log.since(0, 10)], log.closed
+
+    evts, closed = asyncio.run(go())
+    assert evts == ["agent.start", "agent.cancelled"] and closed
+
+def test_summary_and_ids_views_shrink_events():
+    artifact = {"artifact": "sha256:" + "a" * 64, "bytes": 90000, "kind": "text", "preview": {"head": ["x" * 200] * 20}}
+    event = {"evt": "tool.obs", "step": 3, "tool": "http_request",
+             "obs": {"ok": True, "status": 200, "body": artifact, "rows": [[i, "y" * 20] for i in range(500)]}}
+    summary = view_event(event, "summary", "/tasks/r/events/7")
+    assert summary["obs"]["body"] == {"artifact": artifact["artifact"], "bytes": 90000, "kind": "text"}
+    assert summary["obs"]["rows"] == {"list_len": 500} and summary["obs"]["status"] == 200
+    assert summary["ref"] == "/tasks/r/events/7"
+    assert view_event(event, "ids", "/tasks/r/events/7") == {"evt": "tool.obs", "step": 3, "tool": "http_request",
+                                                            "ok": True, "ref": "/tasks/r/events/7"}
+    small = {"evt": "llm.observe", "step": 3}
+    assert view_event(small, "summary", "/tasks/r/events/8") == small  # nothing dropped, no ref
+
+def test_compressed_ids_stream_with_fetch_on_demand(dummy_llm):
+    app.dependency_overrides[get_llm] = lambda: dummy_llm
+    with TestClient(app) as c:
+        r = c.post("/tasks/run_stream", headers={"Accept-Encoding": "gzip"},
+                   json={"goal": "Write a CSV and then read it back.", "dry_run": True,
+                         "options": {"verbosity": "ids", "stream_compress": "gzip"}})
+        assert r.headers["content-encoding"] == "gzip"
+        frames = _frames(r.text)  # decoded by the client
+        run_id = r.headers["x-run-id"]
+        start = frames[0][1]
+        assert start["evt"] == "agent.start" and "goal" not in start
+        full = c.get(start["ref"]).json()
+        assert full["id"] == frames[0][0] and full["event"]["goal"] == "Write a CSV and then read it back."
+        assert c.get(f"/tasks/{run_id}/events/999").status_code == 404
+        assert c.get(f"/tasks/{run_id}/events", params={"verbosity": "loud"}).status_code == 400
@@ -0,0 +1,62 @@
+# tests/test_tool_timeouts.py
+from __future__ import annotations
+import asyncio, time
+from apps.orchestrator.dispatch import RunContext, run_tool
+from apps.orchestrator.tool_timeouts import LatencyHistograms, TimeoutPolicy
+from apps.orchestrator.tools.registry import TOOL_REGISTRY, LazyTool
+
+CFG = {"default_sec": 120, "min_samples": 20, "multiplier": 3.0, "floor_sec": 5, "ceiling_sec": 900,
+       "grace_sec": 5, "tools": {"pkg_install": 660}}
+
+def test_learned_timeouts_follow_history(tmp_path):
+    hist = LatencyHistograms(path=str(tmp_path / "lat.json"), save_every=1000)
+    for _ in range(99):
+        hist.record("fs_listdir", 40)
+    hist.record("fs.listdir", 900)      # aliases share one history
+    for _ in range(30):
+        hist.record("vscode_open", 400_000)
+    pol = TimeoutPolicy(hist, CFG)
+    cold = LazyTool("fs_listdir", TOOL_REGISTRY["fs_listdir"].target)
+    assert pol.timeout_for("fs_listdir", func=cold) == 120.0  # not imported yet: its own limit is unknown
+    TOOL_REGISTRY["fs_listdir"].load(), TOOL_REGISTRY["vscode_open"].load()
+    assert pol.timeout_for("fs_listdir") == 5.0           # p99 x 3 is tiny: floor
+    assert pol.timeout_for("vscode_open") == 900.0        # clamped to the ceiling
+    assert pol.timeout_for("http_request") == 120.0       # no history yet
+    assert pol.timeout_for("pkg_install") == 660.0        # fixed in config
+    assert pol.timeout_for("fs_listdir", {"timeout_sec": 30}) == 35.0
+    assert pol.timeout_for("fs_listdir", overrides={"fs.listdir": 2}) == 2.0
+
+    hist.flush()
+    again = LatencyHistograms(path=str(tmp_path / "lat.json"))
+    assert again.samples("fs_listdir") == 100 and again.quantile_ms("fs_listdir", 0.5) <= 50
+
+def test_run_deadline_caps_tool_timeouts():
+    def slow(**kw):
+        time.sleep(0.5)
+        return {"ok": True}
+    TOOL_REGISTRY["test.slow"] = slow
+    try:
+        ctx = RunContext(options={})
+        ctx.deadline = time.monotonic() + 0.1
+        obs = asyncio.run(run_tool("test.slow", {}, None, ctx))
+        assert obs["ok"] is False and obs["error"].startswith("tool_timeout_0.1")
+        ctx.deadline = time.monotonic() - 1
+        assert asyncio.run(run_tool("test.slow", {}, None, ctx))["error"] == "run_time_budget_exceeded"
+    finally:
+        TOOL_REGISTRY.pop("test.slow", None)
+
+def test_learned_timeout_keeps_the_tools_own_limit_and_recovers(tmp_path):
+    hist = LatencyHistograms(save_every=1000)
+    for _ in range(30):
+        hist.record("terminal_run", 50)                   # echo, echo, echo ...
+    pol = TimeoutPolicy(hist, CFG)
+    TOOL_REGISTRY["terminal_run"].load()
+    assert pol.timeout_for("terminal.run", {"cmd": "npm install"}) == 125.0  # its own 120s default + grace
+
+    for _ in range(30):
+        hist.record("fs_read", 50)
+    TOOL_REGISTRY["fs_read"].load()
+    assert pol.timeout_for("fs_read") == 5.0
+    hist.record_timeout("fs_read", 5000)
+    assert hist.snapshot()["fs_read"]["timeouts"] == 1 and hist.snapshot()["fs_read"]["max_ms"] == 5000
+    assert pol.timeout_for("fs_read") == 15.0                # the timed-out call widened the limit
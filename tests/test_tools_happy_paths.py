@@ -60,3 +60,22 @@ def test_vscode_open_smoke(client):
     body = {"goal":"Open VS Code on a file just to smoke test.","dry_run": True}
     j = client.post("/tasks/run", json=body).json()
     assert any(s["tool"] == "vscode.open" for s in j["steps"])
+
+def test_parallel_batch_keeps_order(client):
+    body = {"goal":"Run a parallel batch of fs calls.","dry_run": True, "options": {"max_parallel_tools": 2}}
+    j = client.post("/tasks/run", json=body).json()
+    obs = j["steps"][0]["obs"]
+    assert obs["parallel"] is True
+    assert [r["tool"] for r in obs["results"]] == [
+        "functions.fs_write", "functions.fs_listdir", "functions.does_not_exist"]
+    assert obs["results"][0]["obs"]["ok"] is True
+    assert "unknown_tool" in obs["results"][2]["obs"]["error"]
+
+def test_tool_cache_hits_on_repeat(client):
+    from apps.orchestrator.tool_cache import tool_cache
+    tool_cache.clear()
+    body = {"goal":"List the sandbox twice.","dry_run": True, "options": {"tool_cache": True}}
+    j = client.post("/tasks/run", json=body).json()
+    assert j["steps"][0]["obs"] == j["steps"][1]["obs"]
+    assert j["cache"]["enabled"] is True
+    assert j["cache"]["hits"] == 1 and j["cache"]["misses"] == 1
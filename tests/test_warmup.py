@@ -0,0 +1,79 @@
+# tests/test_warmup.py
+from __future__ import annotations
+import asyncio
+from apps.orchestrator import warmup
+from apps.orchestrator.warmup import Backend, RunWarmup
+
+def test_warmups_follow_goal_words_and_count_hits_and_misses(monkeypatch):
+    calls = []
+    def backend(name, words):
+        async def warm(options):
+            calls.append((name, options.get("dry_run")))
+            await asyncio.sleep(0.05)
+            return "warmed"
+        return Backend(name, [f"test_{name}_"], words, "io", warm)
+    monkeypatch.setattr(warmup, "BACKENDS", [backend("web", r"\bsite\b"), backend("ide", r"\brepo\b"),
+                                             backend("db", r"\bsql\b")])
+
+    async def go():
+        run = RunWarmup({})
+        run.speculate("check the site and the repo", [], dry_run=True)
+        run.speculate("check the site and the repo", [], dry_run=True)   # once per run
+        await asyncio.sleep(0.1)
+        run.used("test_web_open")
+        run.used("test_web_open")                                        # only the first use counts
+        return run.finish()
+
+    report = asyncio.run(go())
+    assert sorted(calls) == [("ide", True), ("web", True)]
+    assert [h["backend"] for h in report["hits"]] == ["web"] and report["hits"][0]["saved_ms"] >= 50
+    assert report["misses"] == ["ide"]
+    stats = warmup.warmup_stats.snapshot()
+    assert stats["web"]["hits"] == 1 and stats["ide"]["misses"] == 1 and "db" not in stats
+
+def test_recent_calls_predict_the_next_backend(monkeypatch):
+    run = RunWarmup({})
+    names = [b.name for b in run.predict("tidy my notes", ["fs.listdir", "vscode.open"])]
+    assert names == ["vscode"]
+
+def test_warmed_browser_context_is_the_one_browser_nav_reuses(monkeypatch, tmp_path):
+    from apps.orchestrator.tools import browser_tools
+    from apps.worker import browser
+    if browser_tools.BROWSER_METHOD != "playwright_async":
+        return
+    launched = []
+
+    class Page:
+        url = "https://example.com/"
+        async def goto(self, url, **kw):
+            self.url = url
+        async def title(self):
+            return "Example"
+
+    class Ctx:
+        pages = [Page()]
+
+    class PW:
+        class chromium:
+            @staticmethod
+            async def launch_persistent_context(user_data_dir, **kw):
+                launched.append(user_data_dir)
+                return Ctx()
+
+    class Starter:
+        async def start(self):
+            return PW()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(browser, "async_playwright", lambda: Starter())
+    monkeypatch.setattr(browser, "_CTX", {})
+    monkeypatch.setattr(warmup, "_CFG", {"launch_browser": True})
+
+    async def go():
+        did = await warmup._warm_browser({"dry_run": False})
+        obs = await browser_tools.browser_nav_wrapper("https://example.com/")  # the tool's own default profile
+        return did, obs
+
+    did, obs = asyncio.run(go())
+    assert "launched data/playwright-profiles/default" in did and obs["ok"]
+    assert launched == ["data/playwright-profiles/default"]  # nav reused the warmed context